@@ -0,0 +1,151 @@
+"""
+Модуль payloads генерирует синтетические ответы Warframe.market для бенчмарков.
+
+Ответы повторяют структуру настоящих /items и /items/{url_name}/orders: те же поля, вложенный
+объект user и даты в формате ISO с часовым поясом. Генерация детерминирована (зависит только
+от seed), поэтому замеры на разных машинах и в разные дни сравнимы между собой.
+
+Включает:
+- make_items_payload(count, language, seed): Ответ /items.
+- make_orders_payload(count, status_mix, type_mix, start, end, seed): Ответ /items/{url_name}/orders.
+- make_names(count, seed): Названия предметов в стиле игры.
+"""
+
+
+import random
+from datetime import datetime, timedelta, timezone
+
+
+# Примерная доля статусов и типов заказов на популярном предмете Warframe.market
+DEFAULT_STATUS_MIX = {'offline': 0.6, 'online': 0.25, 'ingame': 0.15}
+DEFAULT_TYPE_MIX = {'sell': 0.7, 'buy': 0.3}
+DEFAULT_START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Фиксированная дата, а не текущее время: иначе данные и фильтры по году зависели бы от дня запуска
+DEFAULT_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+WORDS_EN = ('Mirage', 'Rhino', 'Nova', 'Saryn', 'Volt', 'Ash', 'Loki', 'Trinity', 'Ember', 'Frost',
+            'Soma', 'Boltor', 'Braton', 'Latron', 'Akstiletto', 'Nikana', 'Galatine', 'Redeemer',
+            'Vital', 'Sense', 'Blind', 'Rage', 'Primed', 'Flow', 'Continuity', 'Streamline', 'Serration')
+PARTS_EN = ('Prime Set', 'Prime Systems', 'Prime Chassis', 'Prime Neuroptics', 'Prime Blueprint',
+            'Prime Barrel', 'Prime Receiver', 'Prime Stock', 'Prime Blade', 'Prime Handle', 'Mod')
+WORDS_RU = ('Мираж', 'Носорог', 'Нова', 'Сарин', 'Вольт', 'Эш', 'Локи', 'Тринити', 'Эмбер', 'Фрост',
+            'Сома', 'Болтор', 'Братон', 'Латрон', 'Акстилетто', 'Никана', 'Галатин', 'Искупитель',
+            'Жизненное', 'Чутьё', 'Слепая', 'Ярость', 'Основное', 'Поток', 'Живучесть', 'Обтекаемость')
+PARTS_RU = ('Прайм: набор', 'Прайм: системы', 'Прайм: каркас', 'Прайм: нейрооптика', 'Прайм: чертёж',
+            'Прайм: ствол', 'Прайм: приёмник', 'Прайм: приклад', 'Прайм: клинок', 'Прайм: рукоять', 'мод')
+
+
+def _object_id(rng):
+    return '%024x' % rng.getrandbits(96)
+
+
+def _iso(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.000+00:00')
+
+
+def _pick(rng, mix, count):
+    return rng.choices(list(mix), weights=list(mix.values()), k=count)
+
+
+def make_names(count, seed=0, language='en'):
+    """
+    Генерирует уникальные названия предметов в стиле игры.
+
+    Параметры:
+        count (int): Количество названий.
+        seed (int, optional): Зерно генератора. По умолчанию 0.
+        language (str, optional): 'en' или 'ru'. По умолчанию 'en'.
+
+    Возвращает:
+        list: Список названий.
+    """
+    words, parts = (WORDS_RU, PARTS_RU) if language == 'ru' else (WORDS_EN, PARTS_EN)
+    rng = random.Random(seed)
+    names = []
+    for index in range(count):
+        name = f"{words[index % len(words)]} {parts[(index // len(words)) % len(parts)]}"
+        # Когда сочетания слов заканчиваются, добавляем номер, как у вариантов оружия
+        generation = index // (len(words) * len(parts))
+        names.append(f"{name} {generation + 1}" if generation else name)
+    rng.shuffle(names)
+    return names
+
+
+def make_items_payload(count, language='en', seed=0):
+    """
+    Генерирует ответ /items.
+
+    Параметры:
+        count (int): Количество предметов.
+        language (str, optional): Язык названий 'en' или 'ru'. По умолчанию 'en'.
+        seed (int, optional): Зерно генератора. По умолчанию 0.
+
+    Возвращает:
+        dict: {'payload': {'items': [...]}}. id и url_name совпадают для одного seed на обоих языках.
+    """
+    rng = random.Random(seed)
+    names_en = make_names(count, seed=seed, language='en')
+    names = names_en if language == 'en' else make_names(count, seed=seed, language='ru')
+    items = []
+    for name_en, name in zip(names_en, names):
+        url_name = name_en.lower().replace(' ', '_').replace('&', 'and')
+        items.append({
+            'id': _object_id(rng),
+            'url_name': url_name,
+            'item_name': name,
+            'thumb': f"items/images/{language}/thumbs/{url_name}.128x128.png",
+            'vaulted': rng.random() < 0.3,
+        })
+    return {'payload': {'items': items}}
+
+
+def make_orders_payload(count, status_mix=None, type_mix=None, start=DEFAULT_START, end=DEFAULT_END, seed=0,
+                        platform='pc'):
+    """
+    Генерирует ответ /items/{url_name}/orders.
+
+    Параметры:
+        count (int): Количество заказов.
+        status_mix (dict, optional): Доли статусов пользователей. По умолчанию DEFAULT_STATUS_MIX.
+        type_mix (dict, optional): Доли типов заказов. По умолчанию DEFAULT_TYPE_MIX.
+        start (datetime, optional): Самая ранняя дата last_update. По умолчанию DEFAULT_START.
+        end (datetime, optional): Самая поздняя дата last_update. По умолчанию DEFAULT_END.
+        seed (int, optional): Зерно генератора. По умолчанию 0.
+        platform (str, optional): Платформа заказов. По умолчанию 'pc'.
+
+    Возвращает:
+        dict: {'payload': {'orders': [...]}}.
+    """
+    rng = random.Random(seed)
+    span = max(1, int((end - start).total_seconds()))
+    statuses = _pick(rng, status_mix or DEFAULT_STATUS_MIX, count)
+    order_types = _pick(rng, type_mix or DEFAULT_TYPE_MIX, count)
+    # Цены продажи выше цен покупки, разброс — логнормальный, как на настоящем рынке
+    base_price = rng.uniform(5, 300)
+
+    orders = []
+    for status, order_type in zip(statuses, order_types):
+        created = start + timedelta(seconds=rng.randrange(span))
+        updated = created + timedelta(seconds=rng.randrange(max(1, int((end - created).total_seconds()))))
+        factor = rng.lognormvariate(0.1 if order_type == 'sell' else -0.1, 0.25)
+        orders.append({
+            'id': _object_id(rng),
+            'platinum': max(1, round(base_price * factor)),
+            'quantity': rng.choice((1, 1, 1, 2, 3, 5, 10)),
+            'order_type': order_type,
+            'platform': platform,
+            'region': 'en',
+            'visible': True,
+            'creation_date': _iso(created),
+            'last_update': _iso(updated),
+            'user': {
+                'id': _object_id(rng),
+                'ingame_name': f"Tenno{rng.randrange(10 ** 6)}",
+                'status': status,
+                'reputation': rng.randrange(200),
+                'region': 'en',
+                'last_seen': _iso(updated),
+                'avatar': None,
+            },
+        })
+    return {'payload': {'orders': orders}}
@@ -0,0 +1,254 @@
+"""
+Модуль run запускает бенчмарки горячих путей проекта на синтетических данных.
+
+Для каждого сценария и размера данных измеряется медианное время нескольких повторов,
+пропускная способность (элементов в секунду) и пик выделенной памяти (tracemalloc, отдельным
+прогоном, чтобы трассировка не искажала время). Результаты сравниваются с сохранённым
+базовым замером: если медиана выросла больше допустимого, сценарий помечается как регрессия,
+а команда завершается с кодом 1. Без файла базовых замеров команда тоже завершается с кодом 1,
+чтобы проверка не проходила молча.
+
+В репозитории хранится benchmarks/baseline.json, снятый с --quick. После намеренного изменения
+производительности или при переходе на другую машину его нужно обновить и закоммитить:
+    python -m benchmarks.run --quick --save-baseline
+
+Пример запуска:
+    python -m benchmarks.run --quick           # сравнить с benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline   # сохранить текущие замеры как базовые
+    python -m benchmarks.run --quick --only analyze_orders,name_match
+"""
+
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.payloads import make_items_payload, make_names, make_orders_payload
+from services.business_logic import analyze_orders
+from services.catalog import Catalog, build_catalog, save_catalog
+from services.name_matcher import NameMatcher
+from services.warframe_wiki_api import find_common_elements, save_sorted_unique_elements
+
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = (100, 1_000, 10_000)
+QUICK_SIZES = (100, 1_000)
+# Минимальная длительность одного замера: быстрые сценарии повторяются в цикле, иначе шум таймера
+# и планировщика сравним с самим временем и сравнение с базой срабатывает случайно
+MIN_SAMPLE_SECONDS = 0.02
+
+
+def _typo(name, index):
+    # Ошибка OCR: пропущенная буква и лишний пробел
+    position = 1 + index % max(1, len(name) - 2)
+    return (name[:position] + name[position + 1:]).replace(' ', '  ', 1)
+
+
+def _scenario_analyze_orders(size, workdir):
+    orders = make_orders_payload(size, seed=size)['payload']['orders']
+
+    def run():
+        analyze_orders(orders, status='ingame', order_type='sell', current_year_only=False)
+    return run, size
+
+
+def _scenario_find_common_elements(size, workdir):
+    items_path = os.path.join(workdir, f"items_{size}")
+    items = make_names(size, seed=1)
+    with open(items_path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(items) + '\n')
+    mods = items[::2] + make_names(size // 2, seed=2, language='ru')
+
+    def run():
+        find_common_elements(mods, items_path)
+    return run, size
+
+
+def _scenario_save_sorted_unique_elements(size, workdir):
+    elements = make_names(size, seed=3) * 2
+    # Повторы чередуют два набора, иначе сработает пропуск неизменённого содержимого;
+    # файл один и тот же, чтобы папка не разрасталась от тысяч повторов
+    variants = itertools.cycle((elements, elements + ['~']))
+    path = os.path.join(workdir, f"unique_{size}")
+
+    def run():
+        save_sorted_unique_elements(path, next(variants))
+    return run, size
+
+
+def _scenario_catalog_open(size, workdir):
+    items_en = make_items_payload(size, 'en', seed=size)['payload']['items']
+    items_ru = make_items_payload(size, 'ru', seed=size)['payload']['items']
+    path = os.path.join(workdir, f"catalog_{size}.bin")
+    save_catalog(build_catalog(items_en, items_ru), path)
+    queries = [item['url_name'] for item in items_en[:100]]
+
+    def run():
+        catalog = Catalog.open(path)
+        for url_name in queries:
+            catalog.get(url_name)
+    return run, len(queries)
+
+
+def _scenario_name_match(size, workdir):
+    names = [(name, 'en') for name in make_names(size, seed=4)]
+    names += [(name, 'ru') for name in make_names(size, seed=4, language='ru')]
+    matcher = NameMatcher(names)
+    queries = [_typo(name, index) for index, (name, _) in enumerate(names[:100])]
+
+    def run():
+        for query in queries:
+            matcher.match(query)
+    return run, len(queries)
+
+
+# Каждый сценарий готовит данные и возвращает (функция замера, количество обрабатываемых элементов)
+SCENARIOS = {
+    'analyze_orders': _scenario_analyze_orders,
+    'find_common_elements': _scenario_find_common_elements,
+    'save_sorted_unique_elements': _scenario_save_sorted_unique_elements,
+    'catalog_open': _scenario_catalog_open,
+    'name_match': _scenario_name_match,
+}
+
+
+def measure(run, repeat=7):
+    """
+    Измеряет функцию: медиану и минимум времени одного вызова по повторам и пик памяти отдельного прогона.
+
+    Каждый повтор вызывает функцию столько раз, чтобы он длился не меньше MIN_SAMPLE_SECONDS.
+
+    Возвращает:
+        dict: {'median_s', 'min_s', 'peak_bytes'}.
+    """
+    # Прогрев (ленивые импорты, кэши файловой системы) заодно показывает, сколько вызовов нужно на замер
+    started = time.perf_counter()
+    run()
+    number = max(1, int(MIN_SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-9)))
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                run()
+            times.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'peak_bytes': peak}
+
+
+def run_benchmarks(names=None, sizes=SIZES, repeat=7):
+    """
+    Запускает сценарии на всех размерах данных.
+
+    Параметры:
+        names (iterable, optional): Имена сценариев из SCENARIOS. По умолчанию все.
+        sizes (tuple, optional): Размеры данных. По умолчанию SIZES.
+        repeat (int, optional): Количество повторов для замера времени. По умолчанию 7.
+
+    Возвращает:
+        dict: {"сценарий/размер": {'median_s', 'min_s', 'peak_bytes', 'throughput'}}.
+              throughput — обработанных элементов (заказов, строк, запросов) в секунду.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="wfi-bench-") as workdir:
+        for name in names or SCENARIOS:
+            for size in sizes:
+                run, units = SCENARIOS[name](size, workdir)
+                result = measure(run, repeat=repeat)
+                result['throughput'] = units / result['median_s'] if result['median_s'] else float('inf')
+                results[f"{name}/{size}"] = result
+    return results
+
+
+def compare(results, baseline):
+    """
+    Сравнивает замеры с базовыми.
+
+    Параметры:
+        results (dict): Результат run_benchmarks.
+        baseline (dict): Сохранённые базовые замеры того же формата.
+
+    Возвращает:
+        dict: {"сценарий/размер": отношение медианы к базовой} для сценариев, которые есть в базовых замерах.
+    """
+    return {key: result['median_s'] / baseline[key]['median_s']
+            for key, result in results.items()
+            if key in baseline and baseline[key]['median_s'] > 0}
+
+
+def _format_report(results, ratios, tolerance):
+    lines = [f"{'сценарий':<40}{'медиана, мс':>14}{'элем./с':>14}{'пик памяти, КБ':>17}{'к базе':>10}"]
+    for key, result in results.items():
+        ratio = ratios.get(key)
+        mark = '' if ratio is None else f"{ratio:.2f}x" + (' !' if ratio > 1 + tolerance else '')
+        lines.append(f"{key:<40}{result['median_s'] * 1000:>14.3f}{result['throughput']:>14.0f}"
+                     f"{result['peak_bytes'] / 1024:>17.1f}{mark:>10}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей Warframe Insights")
+    parser.add_argument('--only', help="сценарии через запятую: " + ', '.join(SCENARIOS))
+    parser.add_argument('--quick', action='store_true', help="только малые размеры данных")
+    parser.add_argument('--repeat', type=int, default=7, help="количество повторов (по умолчанию 7)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="файл базовых замеров")
+    parser.add_argument('--save-baseline', action='store_true', help="сохранить замеры как базовые")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="допустимый рост медианы (0.25 = 25%%)")
+    parser.add_argument('--output', help="сохранить замеры в JSON")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.only.split(',') if name] if args.only else None
+    unknown = set(names or ()) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(names, QUICK_SIZES if args.quick else SIZES, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+    ratios = compare(results, baseline)
+    print(_format_report(results, ratios, args.tolerance))
+
+    report = {'python': sys.version.split()[0], 'machine': platform.machine(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"Базовые замеры сохранены в {args.baseline}")
+        return 0
+
+    regressions = sorted(key for key, ratio in ratios.items() if ratio > 1 + args.tolerance)
+    if regressions:
+        print("Регрессии: " + ', '.join(regressions), file=sys.stderr)
+        return 1
+    if not baseline:
+        print(f"Базовые замеры не найдены ({args.baseline}); запустите с --save-baseline", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Модуль startup измеряет время запуска лёгких команд cli.py.
+
+Каждая проверка выполняется в новом процессе интерпретатора: импортируются cli и модули,
+которые нужны команде, после чего процесс сообщает, какие тяжёлые библиотеки (TensorFlow,
+OpenCV, Tesseract, захват экрана) оказались загружены. Если медиана времени превышает
+бюджет или загрузилась тяжёлая библиотека, команда завершается с кодом 1.
+
+Пример запуска:
+    python -m benchmarks.startup --budget 0.5
+"""
+
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('tensorflow', 'keras', 'cv2', 'pytesseract', 'pyautogui', 'pygetwindow', 'aiogram')
+
+# Команда -> код, который импортирует то же, что и команда до первого сетевого запроса
+LIGHT_COMMANDS = {
+    'help': "import cli; cli.build_parser()",
+    'prices': "import cli, services.business_logic, services.catalog, services.market_service, "
+              "services.name_matcher, services.warframe_market_api",
+    'refresh': "import cli, main",
+    'ocr': "import cli, services.batch_ocr, services.eyes",
+}
+
+_REPORT = "; import json, sys; print(json.dumps(sorted({name.split('.')[0] for name in sys.modules} & set(%r))))"
+
+
+def measure(code, repeat=5):
+    """
+    Запускает код в новых процессах и измеряет время от запуска до завершения.
+
+    Параметры:
+        code (str): Код для python -c.
+        repeat (int, optional): Количество запусков. По умолчанию 5.
+
+    Возвращает:
+        dict: {'median_s', 'min_s', 'heavy': загруженные тяжёлые модули}.
+    """
+    times = []
+    heavy = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code + _REPORT % (HEAVY_MODULES,)], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - started)
+        heavy = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'heavy': heavy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время запуска лёгких команд cli.py")
+    parser.add_argument('--budget', type=float, default=0.5, help="допустимая медиана в секундах (по умолчанию 0.5)")
+    parser.add_argument('--repeat', type=int, default=5, help="количество запусков (по умолчанию 5)")
+    args = parser.parse_args(argv)
+
+    baseline = measure("pass", args.repeat)['median_s']
+    print(f"{'команда':<10}{'медиана, с':>12}{'минимум, с':>12}  тяжёлые модули")
+    print(f"{'python':<10}{baseline:>12.3f}{'':>12}")
+    failed = False
+    for name, code in LIGHT_COMMANDS.items():
+        result = measure(code, args.repeat)
+        over_budget = result['median_s'] > args.budget
+        failed |= over_budget or bool(result['heavy'])
+        mark = '  ПРЕВЫШЕН БЮДЖЕТ' if over_budget else ''
+        print(f"{name:<10}{result['median_s']:>12.3f}{result['min_s']:>12.3f}  "
+              f"{', '.join(result['heavy']) or '-'}{mark}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Единая точка входа Warframe Insights.
+
+Каждая подкоманда импортирует свои зависимости только при запуске, поэтому справочные
+и лёгкие команды (prices, refresh) не загружают TensorFlow, OpenCV и Tesseract,
+а на сервере без экрана не падают на импорте pyautogui. Время запуска лёгких команд
+проверяет `python cli.py bench --startup`.
+
+Подкоманды:
+- refresh: Обновить списки предметов, модов и каталог в other_from_game.
+- prices: Цены предметов по названию на английском или русском.
+- download-images: Скачать изображения модов с вики и записать mod_images_list.txt.
+- train: Обучить автокодировщик на изображениях модов.
+- ocr: Распознать текст на скриншотах (папка или архив) или, с --live, в окне игры.
+- bench: Бенчмарки горячих путей, с --startup — время запуска команд.
+
+Пример запуска:
+    python cli.py prices "Mirage Prime Systems" "Мираж Прайм: Система"
+    python cli.py ocr screenshots.zip --lang eng,rus
+    python cli.py bench --startup --budget 0.5
+"""
+
+
+import argparse
+import sys
+
+
+DEFAULT_MARKET_URL = 'https://api.warframe.market/v1'
+
+
+def _refresh(args, extra):
+    from main import update_all_files
+
+    update_all_files(base_dir=args.base_dir, cookie_auth=args.cookie_auth)
+
+
+def _format_side(stats, price_key):
+    if not stats:
+        return "нет заказов"
+    return (f"{stats[price_key]:g} пл. (медиана {stats['median_platinum']:g}, "
+            f"заказов {stats['depth']})")
+
+
+def _prices(args, extra):
+    import os
+
+    from services.business_logic import analyze_orders
+    from services.catalog import DEFAULT_CATALOG_PATH, Catalog
+    from services.market_service import resolve_url_name
+    from services.name_matcher import NameMatcher
+    from services.warframe_market_api import get_items_orders_bulk
+
+    catalog = Catalog.open(DEFAULT_CATALOG_PATH) if os.path.exists(DEFAULT_CATALOG_PATH) else None
+    matcher = NameMatcher.load_or_build()
+
+    url_names = {}
+    for query in args.names:
+        url_name = resolve_url_name(query, catalog, matcher)
+        if url_name is None:
+            print(f"{query}: предмет не найден")
+        else:
+            url_names[url_name] = query
+    if not url_names:
+        return 1
+
+    for url_name, orders in get_items_orders_bulk(args.url, list(url_names), args.cookie_auth, language='en',
+                                                  platform=args.platform):
+        if orders is None:
+            print(f"{url_names[url_name]}: не удалось загрузить заказы")
+            continue
+        sell = analyze_orders(orders, status=args.status, order_type='sell', current_year_only=False)
+        buy = analyze_orders(orders, status=args.status, order_type='buy', current_year_only=False)
+        print(f"{url_names[url_name]} ({url_name})")
+        print(f"  продажа: {_format_side(sell, 'min_platinum')}")
+        print(f"  покупка: {_format_side(buy, 'max_platinum')}")
+    return 0
+
+
+def _download_images(args, extra):
+    import training_data
+
+    training_data.main()
+
+
+def _train(args, extra):
+    from bot import train
+
+    train(data_file=args.data_file, model_path=args.model, epochs=args.epochs, batch_size=args.batch_size)
+
+
+def _ocr(args, extra):
+    if args.live:
+        from services import eyes
+
+        return eyes.main(extra)
+    from services import batch_ocr
+
+    return batch_ocr.main(extra)
+
+
+def _bench(args, extra):
+    if args.startup:
+        from benchmarks import startup
+
+        return startup.main(extra)
+    from benchmarks import run
+
+    return run.main(extra)
+
+
+def build_parser():
+    """
+    Создаёт парсер аргументов со всеми подкомандами.
+
+    Возвращает:
+        argparse.ArgumentParser: Парсер; обработчик выбранной подкоманды — в атрибуте handler.
+    """
+    parser = argparse.ArgumentParser(prog='cli.py', description="Warframe Insights")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    refresh = commands.add_parser('refresh', help="обновить списки предметов, модов и каталог")
+    refresh.add_argument('--base-dir', default='other_from_game', help="папка с файлами данных")
+    refresh.add_argument('--cookie-auth', default='seefalert', help="значение Cookie_Auth")
+    refresh.set_defaults(handler=_refresh)
+
+    prices = commands.add_parser('prices', help="цены предметов по названию")
+    prices.add_argument('names', nargs='+', help="названия предметов на английском или русском")
+    prices.add_argument('--platform', default='pc', help="платформа (по умолчанию pc)")
+    prices.add_argument('--status', default='ingame', help="статус продавцов (по умолчанию ingame)")
+    prices.add_argument('--url', default=DEFAULT_MARKET_URL, help="базовый URL Warframe.market API")
+    prices.add_argument('--cookie-auth', default='seefalert', help="значение Cookie_Auth")
+    prices.set_defaults(handler=_prices)
+
+    download = commands.add_parser('download-images', help="скачать изображения модов с вики")
+    download.set_defaults(handler=_download_images)
+
+    train = commands.add_parser('train', help="обучить автокодировщик")
+    train.add_argument('--data-file', default='mod_images_list.txt', help="файл разметки изображений")
+    train.add_argument('--model', default='autoencoder_model.keras', help="куда сохранить модель")
+    train.add_argument('--epochs', type=int, default=50, help="количество эпох (по умолчанию 50)")
+    train.add_argument('--batch-size', type=int, default=32, help="размер пакета (по умолчанию 32)")
+    train.set_defaults(handler=_train)
+
+    # Остальные аргументы ocr и bench передаются модулям как есть, включая --help
+    ocr = commands.add_parser('ocr', add_help=False, help="распознать текст (аргументы services.batch_ocr "
+                                                         "или, с --live, services.eyes)")
+    ocr.add_argument('--live', action='store_true', help="распознавать окно игры, а не скриншоты")
+    ocr.set_defaults(handler=_ocr, forward=True)
+
+    bench = commands.add_parser('bench', add_help=False, help="бенчмарки (аргументы benchmarks.run "
+                                                             "или, с --startup, benchmarks.startup)")
+    bench.add_argument('--startup', action='store_true', help="измерить время запуска команд")
+    bench.set_defaults(handler=_bench, forward=True)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and not getattr(args, 'forward', False):
+        parser.error(f"неизвестные аргументы: {' '.join(extra)}")
+    return args.handler(args, extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
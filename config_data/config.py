@@ -9,19 +9,39 @@ class Authentication:
     password: str
 
 
+@dataclass
+class TgBot:
+    token: str | None
+    # Адрес Bot API; можно указать локальный сервер или заглушку для тестов
+    api_url: str | None
+
+
+@dataclass
+class Market:
+    api_url: str
+
+
 @dataclass
 class Config:
     auth: Authentication
+    tg_bot: TgBot
+    market: Market
 
 
 # Создаем функцию, которая будет читать файл .env и возвращать
-# экземпляр класса Config с заполненными полями token и admin_ids
+# экземпляр класса Config с заполненными полями auth, tg_bot и market
 def load_config(path: str | None = None):
     env = Env()
     env.read_env(path)
-    return Config(auth=Authentication(
-        email=env('email'),
-        password=env('password')))
+    return Config(
+        auth=Authentication(
+            email=env('email'),
+            password=env('password')),
+        tg_bot=TgBot(
+            token=env('BOT_TOKEN', None),
+            api_url=env('TELEGRAM_API_URL', None)),
+        market=Market(
+            api_url=env('MARKET_API_URL', 'https://api.warframe.market/v1')))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,214 @@
+"""
+Модуль database предоставляет локальное хранилище снимков заказов Warframe.market на базе SQLite.
+
+Каждая загрузка заказов предмета сохраняется как снимок (snapshot), привязанный к предмету,
+платформе и моменту загрузки. Индексы позволяют за миллисекунды получать последний снимок
+предмета и диапазон цен за период, не обращаясь к API повторно.
+
+Включает:
+- OrderStore: Хранилище снимков заказов.
+"""
+
+
+import sqlite3
+import time
+
+
+DEFAULT_DB_PATH = "database/orders.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    url_name TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    order_id TEXT,
+    order_type TEXT NOT NULL,
+    platinum INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    status TEXT,
+    last_update TEXT
+);
+
+-- Последний снимок предмета и выборка снимков за период
+CREATE INDEX IF NOT EXISTS idx_snapshots_item_time
+    ON snapshots (url_name, platform, fetched_at DESC);
+
+-- Покрывающий индекс для агрегатов цен по снимку и типу заказа
+CREATE INDEX IF NOT EXISTS idx_orders_snapshot_type_price
+    ON orders (snapshot_id, order_type, platinum, quantity);
+"""
+
+
+class OrderStore:
+    """
+    Хранилище снимков заказов в SQLite.
+
+    Параметры:
+        path (str, optional): Путь к файлу базы данных. По умолчанию DEFAULT_DB_PATH.
+
+    Пример использования:
+        with OrderStore() as store:
+            store.save_snapshots(get_items_orders_bulk(base_url, url_names, 'seefalert'))
+            orders = store.get_latest_orders('mirage_prime_systems')
+            results = analyze_orders(orders, status='ingame', order_type='sell')
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Закрывает соединение с базой данных.
+        """
+        self.connection.close()
+
+    def save_snapshots(self, results, platform='pc', fetched_at=None):
+        """
+        Сохраняет результаты загрузки заказов одной транзакцией.
+
+        Параметры:
+            results (iterable): Пары (url_name, список заказов), например результат get_items_orders_bulk.
+                                Пары с заказами None пропускаются.
+            platform (str, optional): Платформа заказов. По умолчанию 'pc'.
+            fetched_at (int, optional): Время загрузки (Unix time). По умолчанию текущее время.
+
+        Возвращает:
+            int: Количество сохранённых снимков.
+        """
+        if fetched_at is None:
+            fetched_at = int(time.time())
+
+        saved = 0
+        with self.connection:
+            for url_name, orders in results:
+                if orders is None:
+                    continue
+                cursor = self.connection.execute(
+                    "INSERT INTO snapshots (url_name, platform, fetched_at) VALUES (?, ?, ?)",
+                    (url_name, platform, fetched_at))
+                snapshot_id = cursor.lastrowid
+                self.connection.executemany(
+                    "INSERT INTO orders (snapshot_id, order_id, order_type, platinum, quantity, status, last_update) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((snapshot_id, order.get('id'), order['order_type'], order['platinum'], order['quantity'],
+                      order['user']['status'], order['last_update']) for order in orders))
+                saved += 1
+        return saved
+
+    def save_snapshot(self, url_name, orders, platform='pc', fetched_at=None):
+        """
+        Сохраняет снимок заказов одного предмета.
+
+        Возвращает:
+            int: Количество сохранённых снимков (0 или 1).
+        """
+        return self.save_snapshots([(url_name, orders)], platform=platform, fetched_at=fetched_at)
+
+    def _latest_snapshot(self, url_name, platform):
+        return self.connection.execute(
+            "SELECT id, fetched_at FROM snapshots WHERE url_name = ? AND platform = ? "
+            "ORDER BY fetched_at DESC, id DESC LIMIT 1",
+            (url_name, platform)).fetchone()
+
+    def get_latest_snapshot_time(self, url_name, platform='pc'):
+        """
+        Возвращает время последнего снимка предмета.
+
+        Возвращает:
+            int | None: Время загрузки (Unix time) или None, если снимков нет.
+        """
+        row = self._latest_snapshot(url_name, platform)
+        return row[1] if row else None
+
+    def get_latest_orders(self, url_name, platform='pc', order_type=None):
+        """
+        Возвращает заказы из последнего снимка предмета в формате ответа API,
+        пригодном для analyze_orders.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+            order_type (str, optional): Фильтр по типу заказа ('sell' или 'buy'). По умолчанию None.
+
+        Возвращает:
+            list | None: Список словарей с заказами или None, если снимков нет.
+        """
+        row = self._latest_snapshot(url_name, platform)
+        if row is None:
+            return None
+
+        query = ("SELECT order_id, order_type, platinum, quantity, status, last_update "
+                 "FROM orders WHERE snapshot_id = ?")
+        params = [row[0]]
+        if order_type:
+            query += " AND order_type = ?"
+            params.append(order_type)
+
+        return [
+            {
+                'id': order_id,
+                'order_type': kind,
+                'platinum': platinum,
+                'quantity': quantity,
+                'platform': platform,
+                'last_update': last_update,
+                'user': {'status': status},
+            }
+            for order_id, kind, platinum, quantity, status, last_update in self.connection.execute(query, params)
+        ]
+
+    def get_price_range(self, url_name, order_type='sell', platform='pc', since=None, until=None):
+        """
+        Возвращает диапазон цен предмета по каждому снимку за период.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            order_type (str, optional): Тип заказа ('sell' или 'buy'). По умолчанию 'sell'.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+            since (int, optional): Начало периода (Unix time). По умолчанию без ограничения.
+            until (int, optional): Конец периода (Unix time). По умолчанию без ограничения.
+
+        Возвращает:
+            list: Кортежи (fetched_at, min_platinum, max_platinum, average_platinum) в порядке времени.
+        """
+        query = ("SELECT s.fetched_at, MIN(o.platinum), MAX(o.platinum), "
+                 "CAST(SUM(o.platinum * o.quantity) AS REAL) / SUM(o.quantity) "
+                 "FROM snapshots s JOIN orders o ON o.snapshot_id = s.id "
+                 "WHERE s.url_name = ? AND s.platform = ? AND o.order_type = ?")
+        params = [url_name, platform, order_type]
+        if since is not None:
+            query += " AND s.fetched_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND s.fetched_at <= ?"
+            params.append(until)
+        query += " GROUP BY s.id ORDER BY s.fetched_at"
+
+        return self.connection.execute(query, params).fetchall()
+
+    def delete_older_than(self, timestamp):
+        """
+        Удаляет снимки, загруженные раньше указанного времени.
+
+        Возвращает:
+            int: Количество удалённых снимков.
+        """
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM snapshots WHERE fetched_at < ?", (timestamp,))
+        return cursor.rowcount
@@ -0,0 +1,460 @@
+"""
+Модуль order_deltas хранит историю книг заказов Warframe.market в виде изменений между опросами.
+
+Соседние опросы /items/{url_name}/orders почти совпадают, поэтому вместо полных снимков
+сохраняются только изменения: новые заказы (вставка), заказы с другими ценой, количеством,
+статусом продавца или last_update (изменение) и исчезнувшие заказы (удаление). Заказы
+сопоставляются по id; сравнение двух книг выполняется векторно через сортировку id.
+
+Журнал предмета состоит из двух файлов, в которые только дописываются записи: строки изменений
+(DELTA_DTYPE) и опросы (POLL_DTYPE — время опроса, конец его строк и признак ключевого кадра).
+Время от времени вместо изменений записывается вся книга (ключевой кадр), поэтому для
+восстановления книги на любой момент достаточно прочитать строки от ближайшего ключевого кадра.
+Запись опроса и пересчёт статистики по изменениям (IncrementalOrderStats) зависят от числа
+изменений, а не от размера книги.
+
+Включает:
+- DELTA_DTYPE, POLL_DTYPE: Форматы строк журнала.
+- diff_books(old, new): Изменения между двумя книгами заказов.
+- apply_deltas(book, records): Применение изменений к книге.
+- OrderDeltaStore: Журнал изменений книг заказов.
+- IncrementalOrderStats: Статистика цен, обновляемая по изменениям.
+"""
+
+
+import os
+import re
+import time
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from services.business_logic import DEFAULT_PERCENTILES, ORDER_TYPE_CODES, STATUS_CODES, UNKNOWN_CODE
+from services.orders import OrderBook
+
+
+DEFAULT_DELTAS_DIR = "database/deltas"
+
+# Операции в строках журнала; строки ключевого кадра записываются как вставки
+INSERT, UPDATE, DELETE = 0, 1, 2
+
+DELTA_DTYPE = np.dtype([
+    ('op', 'i1'),
+    ('id', 'S24'),           # id заказа Warframe.market (24 шестнадцатеричных символа)
+    ('platinum', '<f4'),     # целые цены до 2**24 хранятся в float32 без потерь
+    ('quantity', '<i4'),
+    ('status', 'i1'),
+    ('order_type', 'i1'),
+    ('platform', 'i1'),
+    ('last_update', '<i8'),
+])
+
+POLL_DTYPE = np.dtype([
+    ('fetched_at', '<i8'),   # время опроса, Unix time
+    ('end', '<i8'),          # номер строки журнала после последней строки опроса
+    ('size', '<i4'),         # размер книги после опроса
+    ('keyframe', 'i1'),      # 1, если строки опроса — вся книга
+])
+
+_VALUE_COLUMNS = ('platinum', 'quantity', 'status', 'order_type', 'platform', 'last_update')
+
+
+def _to_records(book, op, index=None):
+    """
+    Переводит строки книги (все или выбранные index) в строки журнала с операцией op.
+    """
+    index = slice(None) if index is None else index
+    ids = book.ids[index]
+    records = np.zeros(len(ids), dtype=DELTA_DTYPE)
+    records['op'] = op
+    records['id'] = ids
+    if op != DELETE:
+        for column in _VALUE_COLUMNS:
+            records[column] = getattr(book, column)[index]
+    return records
+
+
+def _to_book(records):
+    return OrderBook(
+        ids=records['id'].copy(),
+        platinum=records['platinum'].astype(np.float64),
+        quantity=records['quantity'].astype(np.int64),
+        status=records['status'].copy(),
+        order_type=records['order_type'].copy(),
+        platform=records['platform'].copy(),
+        last_update=records['last_update'].astype(np.int64),
+    )
+
+
+def _replay(records):
+    """
+    Собирает книгу из строк журнала: для каждого id берётся последняя строка, удалённые отбрасываются.
+    """
+    # np.unique возвращает первое вхождение — в развёрнутом массиве это последнее в исходном
+    _, first = np.unique(records['id'][::-1], return_index=True)
+    latest = records[::-1][first]
+    return _to_book(latest[latest['op'] != DELETE])
+
+
+def diff_books(old, new):
+    """
+    Находит изменения между двумя книгами заказов одного предмета.
+
+    Параметры:
+        old (OrderBook | None): Предыдущая книга (None — пустая).
+        new (OrderBook): Новая книга.
+
+    Возвращает:
+        np.ndarray: Строки DELTA_DTYPE: удаления (только id), затем изменения и вставки с новыми значениями.
+
+    Пример использования:
+        delta = diff_books(previous, get_item_orders(base_url, 'mirage_prime_systems', 'seefalert'))
+        print((delta['op'] == INSERT).sum(), (delta['op'] == DELETE).sum())
+    """
+    new = OrderBook.from_records(new)
+    if old is None or not len(old):
+        return _to_records(new, INSERT)
+    old = OrderBook.from_records(old)
+
+    new_ids = new.ids.astype(DELTA_DTYPE['id'])
+    order = np.argsort(old.ids, kind='stable')
+    sorted_ids = old.ids[order].astype(DELTA_DTYPE['id'])
+    positions = np.minimum(np.searchsorted(sorted_ids, new_ids), len(sorted_ids) - 1)
+    found = sorted_ids[positions] == new_ids
+    old_index = order[positions]
+
+    changed = np.zeros(len(new), dtype=bool)
+    for column in _VALUE_COLUMNS:
+        changed |= getattr(old, column)[old_index] != getattr(new, column)
+    kept = np.zeros(len(old), dtype=bool)
+    kept[old_index[found]] = True
+
+    return np.concatenate([
+        _to_records(old, DELETE, np.flatnonzero(~kept)),
+        _to_records(new, UPDATE, np.flatnonzero(found & changed)),
+        _to_records(new, INSERT, np.flatnonzero(~found)),
+    ])
+
+
+def apply_deltas(book, records):
+    """
+    Применяет строки журнала к книге заказов.
+
+    Параметры:
+        book (OrderBook | None): Исходная книга (None — пустая).
+        records (np.ndarray): Строки DELTA_DTYPE, например результат diff_books.
+
+    Возвращает:
+        OrderBook: Новая книга; заказы упорядочены по id.
+    """
+    base = np.empty(0, dtype=DELTA_DTYPE) if book is None else _to_records(OrderBook.from_records(book), INSERT)
+    return _replay(np.concatenate([base, records]))
+
+
+class OrderDeltaStore:
+    """
+    Журнал изменений книг заказов, по паре файлов на предмет и платформу.
+
+    Ключевой кадр записывается при первом опросе, каждые keyframe_interval опросов и тогда,
+    когда строк изменений после последнего кадра стало больше keyframe_ratio размеров книги —
+    так восстановление книги никогда не читает намного больше строк, чем в самой книге.
+
+    Параметры:
+        root (str, optional): Папка журналов. По умолчанию DEFAULT_DELTAS_DIR.
+        keyframe_interval (int, optional): Наибольшее число опросов между ключевыми кадрами. По умолчанию 100.
+        keyframe_ratio (float, optional): Допустимый объём изменений после кадра в размерах книги. По умолчанию 2.0.
+
+    Пример использования:
+        store = OrderDeltaStore()
+        stats = IncrementalOrderStats(store.book_at('mirage_prime_systems'))
+        delta = store.record('mirage_prime_systems', get_item_orders(base_url, 'mirage_prime_systems', 'seefalert'))
+        stats.apply(delta)
+        print(stats.summary(status='ingame', order_type='sell'))
+        yesterday = store.book_at('mirage_prime_systems', when=time.time() - 86400)
+    """
+
+    def __init__(self, root=DEFAULT_DELTAS_DIR, keyframe_interval=100, keyframe_ratio=2.0):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_ratio = keyframe_ratio
+        # Последняя книга и положение журнала для каждого (url_name, platform), чтобы не читать файлы при записи
+        self._books = {}
+        self._tails = {}
+
+    def _paths(self, url_name, platform):
+        base = os.path.join(self.root, platform, re.sub(r'[^\w\-]', '_', url_name))
+        return base + '.deltas', base + '.polls'
+
+    def polls(self, url_name, platform='pc'):
+        """
+        Возвращает опросы предмета.
+
+        Возвращает:
+            np.ndarray: Массив POLL_DTYPE в порядке времени.
+        """
+        _, polls_path = self._paths(url_name, platform)
+        if not os.path.exists(polls_path):
+            return np.empty(0, dtype=POLL_DTYPE)
+        return np.fromfile(polls_path, dtype=POLL_DTYPE)
+
+    def _read(self, url_name, platform, start, end):
+        records_path, _ = self._paths(url_name, platform)
+        if end <= start:
+            return np.empty(0, dtype=DELTA_DTYPE)
+        # Читаются только нужные строки, а не весь журнал
+        return np.array(np.memmap(records_path, dtype=DELTA_DTYPE, mode='r',
+                                  offset=start * DELTA_DTYPE.itemsize, shape=(end - start,)))
+
+    def _tail(self, url_name, platform):
+        key = (url_name, platform)
+        tail = self._tails.get(key)
+        if tail is None:
+            polls = self.polls(url_name, platform)
+            if len(polls):
+                keyframe = int(np.flatnonzero(polls['keyframe'])[-1])
+                tail = {'fetched_at': int(polls['fetched_at'][-1]), 'end': int(polls['end'][-1]),
+                        'keyframe_end': int(polls['end'][keyframe]), 'since_keyframe': len(polls) - 1 - keyframe}
+            else:
+                tail = {'fetched_at': None, 'end': 0, 'keyframe_end': 0, 'since_keyframe': 0}
+            self._tails[key] = tail
+        return tail
+
+    def book_at(self, url_name, when=None, platform='pc'):
+        """
+        Восстанавливает книгу заказов на момент последнего опроса не позже when.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            when (float, optional): Момент времени (Unix time). По умолчанию последний опрос.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+
+        Возвращает:
+            OrderBook | None: Книга или None, если опросов до when не было. Книга, восстановленная
+                              из журнала, упорядочена по id.
+        """
+        if when is None and (url_name, platform) in self._books:
+            return self._books[(url_name, platform)]
+        polls = self.polls(url_name, platform)
+        target = len(polls) - 1 if when is None else int(np.searchsorted(polls['fetched_at'], when, side='right')) - 1
+        if target < 0:
+            return None
+        keyframe = int(np.flatnonzero(polls['keyframe'][:target + 1])[-1])
+        start = int(polls['end'][keyframe - 1]) if keyframe else 0
+        return _replay(self._read(url_name, platform, start, int(polls['end'][target])))
+
+    def record(self, url_name, book, platform='pc', fetched_at=None):
+        """
+        Записывает новый опрос книги заказов.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            book (OrderBook | list): Заказы предмета, например результат get_item_orders.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+            fetched_at (float, optional): Время опроса (Unix time). По умолчанию time.time().
+
+        Возвращает:
+            np.ndarray: Изменения относительно прошлого опроса (см. diff_books) — даже если записан ключевой кадр.
+        """
+        book = OrderBook.from_records(book)
+        fetched_at = int(time.time() if fetched_at is None else fetched_at)
+        tail = self._tail(url_name, platform)
+        if tail['fetched_at'] is not None and fetched_at < tail['fetched_at']:
+            raise ValueError(f"Опрос {url_name} от {fetched_at} раньше последнего записанного ({tail['fetched_at']})")
+
+        delta = diff_books(self.book_at(url_name, platform=platform), book)
+        keyframe = (tail['fetched_at'] is None
+                    or tail['since_keyframe'] + 1 >= self.keyframe_interval
+                    or tail['end'] - tail['keyframe_end'] + len(delta) > self.keyframe_ratio * max(len(book), 1))
+        records = _to_records(book, INSERT) if keyframe else delta
+
+        records_path, polls_path = self._paths(url_name, platform)
+        os.makedirs(os.path.dirname(records_path), exist_ok=True)
+        with open(records_path, 'ab') as file:
+            # Строки, дописанные до сбоя без записи опроса, отбрасываются
+            if file.tell() != tail['end'] * DELTA_DTYPE.itemsize:
+                file.truncate(tail['end'] * DELTA_DTYPE.itemsize)
+            file.write(records.tobytes())
+        end = tail['end'] + len(records)
+        poll = np.array([(fetched_at, end, len(book), keyframe)], dtype=POLL_DTYPE)
+        with open(polls_path, 'ab') as file:
+            file.write(poll.tobytes())
+
+        tail.update(fetched_at=fetched_at, end=end)
+        if keyframe:
+            tail.update(keyframe_end=end, since_keyframe=0)
+        else:
+            tail['since_keyframe'] += 1
+        self._books[(url_name, platform)] = book
+        return delta
+
+    def record_many(self, results, platform='pc', fetched_at=None):
+        """
+        Записывает опросы множества предметов, например из get_items_orders_bulk.
+
+        Параметры:
+            results (iterable): Пары (url_name, книга заказов или None).
+
+        Возвращает:
+            dict: Словарь {url_name: изменения} для записанных предметов.
+        """
+        return {url_name: self.record(url_name, book, platform=platform, fetched_at=fetched_at)
+                for url_name, book in results if book is not None}
+
+    def deltas(self, url_name, since=None, until=None, platform='pc'):
+        """
+        Перебирает изменения опросов с since < fetched_at <= until.
+
+        Возвращает:
+            generator: Тройки (fetched_at, строки DELTA_DTYPE, keyframe). Строки ключевого кадра — вся книга.
+        """
+        polls = self.polls(url_name, platform)
+        first = 0 if since is None else int(np.searchsorted(polls['fetched_at'], since, side='right'))
+        last = len(polls) if until is None else int(np.searchsorted(polls['fetched_at'], until, side='right'))
+        for index in range(first, last):
+            start = int(polls['end'][index - 1]) if index else 0
+            yield (int(polls['fetched_at'][index]), self._read(url_name, platform, start, int(polls['end'][index])),
+                   bool(polls['keyframe'][index]))
+
+    def compact(self, url_name, keep_since, platform='pc'):
+        """
+        Удаляет опросы до последнего ключевого кадра не позже keep_since; книги с keep_since остаются доступны.
+
+        Возвращает:
+            int: Количество удалённых строк журнала.
+        """
+        polls = self.polls(url_name, platform)
+        keyframes = np.flatnonzero(polls['keyframe'] & (polls['fetched_at'] <= keep_since))
+        if not len(keyframes) or keyframes[-1] == 0:
+            return 0
+        first = int(keyframes[-1])
+        start = int(polls['end'][first - 1])
+        records = self._read(url_name, platform, start, int(polls['end'][-1]))
+        polls = polls[first:].copy()
+        polls['end'] -= start
+
+        records_path, polls_path = self._paths(url_name, platform)
+        for path, data in ((records_path, records), (polls_path, polls)):
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as file:
+                file.write(data.tobytes())
+            os.replace(temp_path, path)
+        self._tails.pop((url_name, platform), None)
+        return start
+
+
+class IncrementalOrderStats:
+    """
+    Статистика цен книги заказов, обновляемая по изменениям.
+
+    Для каждой пары (тип заказа, статус продавца) хранится лестница цен: количество и число
+    заказов на каждом уровне цены. Изменение заказа обновляет один-два уровня, поэтому apply
+    работает за время, пропорциональное числу изменений, а summary — числу уровней цен.
+    Результат summary совпадает с analyze_orders(..., current_year_only=False).
+
+    Параметры:
+        book (OrderBook, optional): Начальная книга. По умолчанию пустая.
+
+    Пример использования:
+        stats = IncrementalOrderStats(store.book_at('mirage_prime_systems'))
+        for fetched_at, records, keyframe in store.deltas('mirage_prime_systems', since=last_seen):
+            stats.apply(records, keyframe=keyframe)
+        print(stats.summary(status='ingame', order_type='sell')['min_platinum'])
+    """
+
+    def __init__(self, book=None):
+        self._orders = {}
+        self._levels = {}
+        self._prices = {}
+        if book is not None:
+            self.apply(_to_records(OrderBook.from_records(book), INSERT))
+
+    def __len__(self):
+        return len(self._orders)
+
+    def _add(self, order_id, group, platinum, quantity):
+        self._orders[order_id] = (group, platinum, quantity)
+        if quantity <= 0:
+            return
+        levels = self._levels.setdefault(group, {})
+        level = levels.get(platinum)
+        if level is None:
+            levels[platinum] = [quantity, 1]
+            insort(self._prices.setdefault(group, []), platinum)
+        else:
+            level[0] += quantity
+            level[1] += 1
+
+    def _remove(self, order_id):
+        previous = self._orders.pop(order_id, None)
+        if previous is None or previous[2] <= 0:
+            return
+        group, platinum, quantity = previous
+        level = self._levels[group][platinum]
+        level[0] -= quantity
+        level[1] -= 1
+        if not level[1]:
+            del self._levels[group][platinum]
+            prices = self._prices[group]
+            del prices[bisect_left(prices, platinum)]
+
+    def apply(self, records, keyframe=False):
+        """
+        Применяет строки журнала.
+
+        Параметры:
+            records (np.ndarray): Строки DELTA_DTYPE (результат diff_books или OrderDeltaStore.deltas).
+            keyframe (bool, optional): Строки — вся книга: статистика считается заново. По умолчанию False.
+        """
+        if keyframe:
+            self._orders.clear()
+            self._levels.clear()
+            self._prices.clear()
+        columns = (records[name].tolist() for name in ('op', 'id', 'order_type', 'status', 'platinum', 'quantity'))
+        for op, order_id, order_type, status, platinum, quantity in zip(*columns):
+            if op != INSERT:
+                self._remove(order_id)
+            if op != DELETE:
+                self._add(order_id, (order_type, status), platinum, quantity)
+
+    def summary(self, status=None, order_type=None, percentiles=DEFAULT_PERCENTILES):
+        """
+        Считает статистику по текущему состоянию книги.
+
+        Параметры:
+            status (str, optional): Фильтр по статусу продавца. По умолчанию None.
+            order_type (str, optional): Фильтр по типу заказа. По умолчанию None.
+            percentiles (tuple, optional): Перцентили цены, взвешенные по количеству. По умолчанию DEFAULT_PERCENTILES.
+
+        Возвращает:
+            dict | None: Статистика с ключами как в analyze_orders или None, если подходящих заказов нет.
+        """
+        status_code = STATUS_CODES.get(status, UNKNOWN_CODE) if status else None
+        type_code = ORDER_TYPE_CODES.get(order_type, UNKNOWN_CODE) if order_type else None
+        groups = [group for group in self._prices
+                  if self._prices[group] and (type_code is None or group[0] == type_code)
+                  and (status_code is None or group[1] == status_code)]
+        if not groups:
+            return None
+
+        platinum = np.concatenate([np.array(self._prices[group], dtype=np.float64) for group in groups])
+        levels = [self._levels[group][price] for group in groups for price in self._prices[group]]
+        quantity = np.array([level[0] for level in levels], dtype=np.int64)
+        counts = np.array([level[1] for level in levels], dtype=np.int64)
+        if len(groups) > 1:
+            order = np.argsort(platinum, kind='stable')
+            platinum, quantity, counts = platinum[order], quantity[order], counts[order]
+
+        depth = quantity.sum()
+        cumulative = np.cumsum(quantity)
+        quantiles = {q: float(platinum[min(int(np.searchsorted(cumulative, depth * (q / 100), side='left')),
+                                           len(platinum) - 1)])
+                     for q in (50, *percentiles)}
+        return {
+            "min_platinum": float(platinum[0]),
+            "max_platinum": float(platinum[-1]),
+            "average_platinum": float((platinum * quantity).sum() / depth),
+            "median_platinum": quantiles[50],
+            "percentiles": {q: quantiles[q] for q in percentiles},
+            "depth": int(depth),
+            "orders_count": int(counts.sum()),
+        }
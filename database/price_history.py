@@ -0,0 +1,365 @@
+"""
+Модуль price_history хранит историю цен закрытых сделок Warframe.market (/items/{url_name}/statistics).
+
+История каждого предмета лежит в отдельном файле .npy со структурированным массивом
+записей HISTORY_DTYPE (строки отсортированы по рангу мода и дню). API отдаёт почасовой ряд
+за 48 часов и дневной ряд за 90 дней; при записи почасовые строки сворачиваются в дневные,
+новые данные сливаются с уже сохранёнными, а строки старше срока хранения удаляются.
+Поэтому регулярная загрузка каталога постепенно накапливает многолетнюю дневную историю.
+
+Чтение файла занимает доли миллисекунды, диапазон дней выбирается бинарным поиском,
+а скользящие агрегаты считаются через накопленные суммы. Год истории 3000 предметов
+занимает десятки мегабайт и целиком помещается в кэш в памяти.
+
+Включает:
+- HISTORY_DTYPE: Формат строки истории.
+- downsample_daily(rows): Сворачивает строки статистики в дневные.
+- PriceHistoryStore: Хранилище истории цен.
+"""
+
+
+import os
+import re
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULT_HISTORY_DIR = "database/history"
+DEFAULT_RETENTION_DAYS = 400
+SECONDS_PER_DAY = 86400
+NO_RANK = -1
+
+HISTORY_DTYPE = np.dtype([
+    ('day', '<i4'),          # дней с 1970-01-01 (UTC)
+    ('mod_rank', 'i1'),      # ранг мода или NO_RANK для предметов без рангов
+    ('volume', '<i4'),
+    ('min_price', '<f4'),
+    ('max_price', '<f4'),
+    ('open_price', '<f4'),
+    ('closed_price', '<f4'),
+    ('avg_price', '<f4'),
+    ('median', '<f4'),
+])
+PRICE_FIELDS = ('min_price', 'max_price', 'open_price', 'closed_price', 'avg_price', 'median')
+
+
+def _to_day(value):
+    """
+    Переводит дату (строку ISO, date, datetime, datetime64 или номер дня) в номер дня с 1970-01-01.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = value[:10]
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def _sort_key(data):
+    # Ранг сдвигается на 1, чтобы NO_RANK давал неотрицательный ключ
+    return (data['mod_rank'].astype(np.int64) + 1) << 32 | data['day'].astype(np.int64)
+
+
+def downsample_daily(rows):
+    """
+    Сворачивает строки статистики (почасовые или дневные) в дневные строки HISTORY_DTYPE.
+
+    Объём суммируется, минимум и максимум берутся по дню, цена открытия — первая за день,
+    закрытия — последняя, средняя цена и медиана усредняются с весом по объёму
+    (медиана дня по почасовым медианам — приближённая).
+
+    Параметры:
+        rows (list): Строки статистики (см. services.market_json.decode_statistics).
+
+    Возвращает:
+        np.ndarray: Массив HISTORY_DTYPE, отсортированный по рангу и дню.
+    """
+    if not rows:
+        return np.empty(0, dtype=HISTORY_DTYPE)
+
+    count = len(rows)
+    timestamps = np.array([row['datetime'][:19] for row in rows], dtype='datetime64[s]').astype(np.int64)
+    ranks = np.fromiter((NO_RANK if row.get('mod_rank') is None else row['mod_rank'] for row in rows),
+                        dtype=np.int8, count=count)
+    volume = np.fromiter((row.get('volume') or 0 for row in rows), dtype=np.int64, count=count)
+    prices = {field: np.fromiter((np.nan if row.get(field) is None else row[field] for row in rows),
+                                 dtype=np.float64, count=count)
+              for field in PRICE_FIELDS}
+
+    order = np.lexsort((timestamps, ranks))
+    timestamps, ranks, volume = timestamps[order], ranks[order], volume[order]
+    prices = {field: values[order] for field, values in prices.items()}
+    days = timestamps // SECONDS_PER_DAY
+
+    boundary = np.empty(count, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (days[1:] != days[:-1]) | (ranks[1:] != ranks[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], count) - 1
+
+    result = np.empty(len(starts), dtype=HISTORY_DTYPE)
+    result['day'] = days[starts]
+    result['mod_rank'] = ranks[starts]
+    result['volume'] = np.add.reduceat(volume, starts)
+    result['min_price'] = np.fmin.reduceat(prices['min_price'], starts)
+    result['max_price'] = np.fmax.reduceat(prices['max_price'], starts)
+    result['open_price'] = prices['open_price'][starts]
+    result['closed_price'] = prices['closed_price'][ends]
+
+    # Среднее с весом по объёму; для дней без сделок — простое среднее
+    weights = volume.astype(np.float64)
+    for field in ('avg_price', 'median'):
+        values = prices[field]
+        known = ~np.isnan(values)
+        weighted = np.add.reduceat(np.where(known, values * weights, 0.0), starts)
+        known_weight = np.add.reduceat(np.where(known, weights, 0.0), starts)
+        plain = np.add.reduceat(np.where(known, values, 0.0), starts)
+        known_count = np.add.reduceat(known.astype(np.int64), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[field] = np.where(known_weight > 0, weighted / known_weight, plain / known_count)
+    return result
+
+
+def _merge(*parts):
+    """
+    Объединяет массивы истории; для совпадающих (ранг, день) остаётся строка из более позднего массива.
+    """
+    combined = np.concatenate(parts)
+    if not len(combined):
+        return combined
+    reversed_keys = _sort_key(combined)[::-1]
+    # np.unique возвращает первое вхождение — в развёрнутом массиве это последнее в исходном
+    _, first = np.unique(reversed_keys, return_index=True)
+    return combined[::-1][first]
+
+
+class PriceHistoryStore:
+    """
+    Хранилище дневной истории цен в файлах .npy, по файлу на предмет и платформу.
+
+    Параметры:
+        root (str, optional): Папка хранилища. По умолчанию DEFAULT_HISTORY_DIR.
+        retention_days (int, optional): Сколько дней истории хранить. По умолчанию DEFAULT_RETENTION_DAYS.
+        cache_size (int, optional): Сколько историй предметов держать в памяти. По умолчанию 4096.
+
+    Пример использования:
+        store = PriceHistoryStore()
+        store.ingest_many(get_items_statistics_bulk(base_url, url_names, 'seefalert'))
+        rows = store.query('mirage_prime_systems', since='2024-01-01')
+        weekly = store.rolling('mirage_prime_systems', window=7)
+        print(weekly['day'][-1], weekly['vwap'][-1])
+    """
+
+    def __init__(self, root=DEFAULT_HISTORY_DIR, retention_days=DEFAULT_RETENTION_DAYS, cache_size=4096):
+        self.root = root
+        self.retention_days = retention_days
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _path(self, url_name, platform):
+        safe_name = re.sub(r'[^\w\-]', '_', url_name)
+        return os.path.join(self.root, platform, safe_name + '.npy')
+
+    def load(self, url_name, platform='pc'):
+        """
+        Загружает всю историю предмета.
+
+        Возвращает:
+            np.ndarray: Массив HISTORY_DTYPE (только для чтения), отсортированный по рангу и дню.
+        """
+        path = self._path(url_name, platform)
+        try:
+            modified = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == modified:
+            self._cache.move_to_end(path)
+            return cached[1]
+
+        data = np.load(path)
+        data.flags.writeable = False
+        self._cache[path] = (modified, data)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def _save(self, url_name, platform, data):
+        path = self._path(url_name, platform)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            np.save(file, data)
+        os.replace(temp_path, path)
+        self._cache.pop(path, None)
+
+    def _cutoff(self, now):
+        return int((time.time() if now is None else now) // SECONDS_PER_DAY) - self.retention_days
+
+    def ingest(self, url_name, statistics, platform='pc', now=None):
+        """
+        Добавляет статистику предмета в историю.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            statistics (dict): Результат decode_statistics ({'48hours': [...], '90days': [...]}).
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+            now (float, optional): Текущее время (Unix time) для срока хранения. По умолчанию time.time().
+
+        Возвращает:
+            int: Количество строк в истории предмета после записи.
+        """
+        # Порядок важен: дневной ряд API точнее свёрнутого почасового, а почасовой — свежее сохранённого
+        data = _merge(self.load(url_name, platform),
+                      downsample_daily(statistics.get('48hours', ())),
+                      downsample_daily(statistics.get('90days', ())))
+        data = data[data['day'] >= self._cutoff(now)]
+        self._save(url_name, platform, data)
+        return len(data)
+
+    def ingest_many(self, results, platform='pc', now=None):
+        """
+        Добавляет статистику множества предметов, например из get_items_statistics_bulk.
+
+        Параметры:
+            results (iterable): Пары (url_name, статистика или None).
+
+        Возвращает:
+            int: Количество обновлённых предметов.
+        """
+        updated = 0
+        for url_name, statistics in results:
+            if statistics is not None:
+                self.ingest(url_name, statistics, platform=platform, now=now)
+                updated += 1
+        return updated
+
+    def apply_retention(self, platform='pc', now=None):
+        """
+        Удаляет из всех историй платформы строки старше срока хранения.
+
+        Возвращает:
+            int: Количество удалённых строк.
+        """
+        directory = os.path.join(self.root, platform)
+        if not os.path.isdir(directory):
+            return 0
+        cutoff = self._cutoff(now)
+        removed = 0
+        for name in os.listdir(directory):
+            if not name.endswith('.npy'):
+                continue
+            url_name = name[:-len('.npy')]
+            data = self.load(url_name, platform)
+            keep = data['day'] >= cutoff
+            if not keep.all():
+                removed += int((~keep).sum())
+                self._save(url_name, platform, data[keep])
+        return removed
+
+    def _rank_rows(self, data, mod_rank):
+        if not len(data):
+            return data
+        if mod_rank is None:
+            # Без явного ранга берём наименьший: NO_RANK у обычных предметов, 0 у модов
+            mod_rank = int(data['mod_rank'][0])
+        keys = _sort_key(data)
+        low = np.searchsorted(keys, (mod_rank + 1) << 32)
+        high = np.searchsorted(keys, (mod_rank + 2) << 32)
+        return data[low:high]
+
+    def query(self, url_name, since=None, until=None, platform='pc', mod_rank=None):
+        """
+        Возвращает дневные строки истории за период.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            since, until (str | date | datetime | int, optional): Границы периода включительно. По умолчанию вся история.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+            mod_rank (int, optional): Ранг мода. По умолчанию наименьший из сохранённых.
+
+        Возвращает:
+            np.ndarray: Срез массива HISTORY_DTYPE по возрастанию дня.
+        """
+        rows = self._rank_rows(self.load(url_name, platform), mod_rank)
+        low = 0 if since is None else np.searchsorted(rows['day'], _to_day(since), side='left')
+        high = len(rows) if until is None else np.searchsorted(rows['day'], _to_day(until), side='right')
+        return rows[low:high]
+
+    def rolling(self, url_name, window=7, since=None, until=None, platform='pc', mod_rank=None):
+        """
+        Считает скользящие агрегаты по календарным дням (дни без сделок учитываются как пустые).
+
+        Параметры:
+            window (int, optional): Ширина окна в днях. По умолчанию 7.
+            Остальные параметры — как у query.
+
+        Возвращает:
+            dict: {'day': даты (datetime64[D]), 'volume': объём за окно,
+                   'vwap': средняя цена за окно с весом по объёму,
+                   'closed_sma': среднее цен закрытия за окно}. Пустые окна дают NaN.
+        """
+        start = None if since is None else _to_day(since) - window + 1
+        rows = self.query(url_name, start, until, platform=platform, mod_rank=mod_rank)
+        # Пустой диапазон (until раньше since) тоже даёт пустой результат, а не дни разогрева
+        if not len(rows) or (since is not None and until is not None and _to_day(until) < _to_day(since)):
+            empty = np.empty(0)
+            return {'day': empty.astype('datetime64[D]'), 'volume': empty, 'vwap': empty, 'closed_sma': empty}
+
+        first = rows['day'][0] if start is None else start
+        last = rows['day'][-1] if until is None else _to_day(until)
+        length = last - first + 1
+        position = rows['day'] - first
+
+        volume = np.zeros(length)
+        turnover = np.zeros(length)
+        closed = np.zeros(length)
+        closed_count = np.zeros(length)
+        volume[position] = rows['volume']
+        turnover[position] = np.nan_to_num(rows['avg_price'].astype(np.float64)) * rows['volume']
+        has_closed = ~np.isnan(rows['closed_price'])
+        closed[position[has_closed]] = rows['closed_price'][has_closed]
+        closed_count[position[has_closed]] = 1
+
+        def window_sum(values):
+            totals = np.concatenate(([0.0], np.cumsum(values)))
+            indices = np.arange(1, length + 1)
+            return totals[indices] - totals[np.maximum(indices - window, 0)]
+
+        volume_sum = window_sum(volume)
+        closed_sum, closed_days = window_sum(closed), window_sum(closed_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = np.where(volume_sum > 0, window_sum(turnover) / volume_sum, np.nan)
+            closed_sma = np.where(closed_days > 0, closed_sum / closed_days, np.nan)
+
+        # Дни разогрева перед since в результат не попадают
+        skip = 0 if since is None else window - 1
+        days = np.arange(first, last + 1).astype('datetime64[D]')
+        return {'day': days[skip:], 'volume': volume_sum[skip:], 'vwap': vwap[skip:], 'closed_sma': closed_sma[skip:]}
+
+    def panel(self, url_names, field='avg_price', since=None, until=None, platform='pc', mod_rank=None):
+        """
+        Собирает одно поле истории множества предметов в матрицу «предмет × день».
+
+        Параметры:
+            url_names (list): Имена предметов.
+            field (str, optional): Поле HISTORY_DTYPE. По умолчанию 'avg_price'.
+            Остальные параметры — как у query.
+
+        Возвращает:
+            tuple: (даты datetime64[D], матрица float32 формы (len(url_names), число дней); пропуски — NaN).
+        """
+        histories = [self.query(url_name, since, until, platform=platform, mod_rank=mod_rank)
+                     for url_name in url_names]
+        known = [rows['day'] for rows in histories if len(rows)]
+        if not known:
+            return np.empty(0, dtype='datetime64[D]'), np.empty((len(url_names), 0), dtype=np.float32)
+
+        first = _to_day(since) if since is not None else min(days[0] for days in known)
+        last = _to_day(until) if until is not None else max(days[-1] for days in known)
+        matrix = np.full((len(url_names), last - first + 1), np.nan, dtype=np.float32)
+        for row, rows in enumerate(histories):
+            matrix[row, rows['day'] - first] = rows[field]
+        return np.arange(first, last + 1).astype('datetime64[D]'), matrix
@@ -0,0 +1,19 @@
+from aiogram import Router
+from aiogram.filters import Command, CommandStart
+from aiogram.types import Message
+
+from lexicon.lexicon import LEXICON_RU
+
+router = Router()
+
+
+# Этот хэндлер срабатывает на команду /start
+@router.message(CommandStart())
+async def process_start_command(message: Message):
+    await message.answer(LEXICON_RU['/start'])
+
+
+# Этот хэндлер срабатывает на команду /help
+@router.message(Command(commands='help'))
+async def process_help_command(message: Message):
+    await message.answer(LEXICON_RU['/help'])
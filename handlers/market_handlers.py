@@ -0,0 +1,57 @@
+from html import escape
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from lexicon.lexicon import LEXICON_RU
+from services.market_service import MarketPriceService, resolve_url_name
+
+router = Router()
+
+
+def format_summary(name: str, summary: dict) -> str:
+    lines = [LEXICON_RU['price_title'].format(name=escape(name))]
+    for side in ('sell', 'buy'):
+        stats = summary[side]
+        if stats:
+            lines.append(LEXICON_RU[side].format(
+                min=stats['min_platinum'], max=stats['max_platinum'], median=stats['median_platinum'],
+                average=stats['average_platinum'], depth=stats['depth']))
+        else:
+            lines.append(LEXICON_RU[f'no_{side}'])
+    return '\n'.join(lines)
+
+
+# Бот работает с parse_mode='HTML', поэтому запрос пользователя и названия предметов экранируются
+async def answer_price(message: Message, query: str, price_service: MarketPriceService, catalog=None, matcher=None):
+    url_name = resolve_url_name(query, catalog, matcher)
+    if url_name is None:
+        await message.answer(LEXICON_RU['not_found'].format(query=escape(query)))
+        return
+
+    # Одинаковые одновременные запросы объединяются в один, результат кэшируется
+    summary = await price_service.get_summary(url_name)
+    if summary is None:
+        await message.answer(LEXICON_RU['fetch_error'])
+        return
+
+    names = catalog.names_for(url_name) if catalog is not None else None
+    name = names[0] if names else url_name.replace('_', ' ').title()
+    await message.answer(format_summary(name, summary))
+
+
+# Этот хэндлер срабатывает на команду /price <название>
+@router.message(Command(commands='price'))
+async def process_price_command(message: Message, command: CommandObject, price_service: MarketPriceService,
+                                catalog=None, matcher=None):
+    if not command.args:
+        await message.answer(LEXICON_RU['price_usage'])
+        return
+    await answer_price(message, command.args, price_service, catalog, matcher)
+
+
+# Этот хэндлер срабатывает на любое текстовое сообщение без команды и ищет цену предмета
+@router.message(F.text & ~F.text.startswith('/'))
+async def process_item_name(message: Message, price_service: MarketPriceService, catalog=None, matcher=None):
+    await answer_price(message, message.text, price_service, catalog, matcher)
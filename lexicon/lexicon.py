@@ -0,0 +1,23 @@
+LEXICON_RU: dict[str, str] = {
+    '/start': 'Привет! Я помогу узнать цены на предметы Warframe.market.\n\n'
+              'Просто отправь название предмета на русском или английском, '
+              'например <i>Mirage Prime Systems</i>.',
+    '/help': 'Отправь название предмета (можно с опечатками) или команду '
+             '/price &lt;название&gt;, и я покажу цены игроков, которые сейчас в игре.',
+    'price_usage': 'Напиши название предмета после команды, например: /price Mirage Prime Systems',
+    'not_found': 'Не нашёл предмет «{query}». Проверь название.',
+    'fetch_error': 'Не удалось получить заказы с Warframe.market, попробуй позже.',
+    'price_title': '<b>{name}</b>',
+    'sell': 'Продают: от <b>{min:g}</b> до {max:g} платины, медиана {median:g}, '
+            'средняя {average:.1f} ({depth} шт.)',
+    'buy': 'Покупают: от {min:g} до <b>{max:g}</b> платины, медиана {median:g}, '
+           'средняя {average:.1f} ({depth} шт.)',
+    'no_sell': 'Продают: нет заказов от игроков в игре',
+    'no_buy': 'Покупают: нет заказов от игроков в игре',
+}
+
+LEXICON_COMMANDS_RU: dict[str, str] = {
+    '/start': 'Запуск бота',
+    '/price': 'Цена предмета',
+    '/help': 'Справка',
+}
@@ -1,53 +1,99 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from config_data.config import load_config
-from services.warframe_wiki_api import get_mod_names, save_sorted_unique_elements, find_common_elements
+from services.catalog import DEFAULT_CATALOG_PATH, build_catalog, save_catalog
+from services.utils import StageTimer
+from services.warframe_wiki_api import WikiCategoryCrawler, save_sorted_unique_elements
 from services.warframe_market_api import get_items_list
 
-# Загружаем конфиг в переменную config
-config = load_config()
+MODS_URL_EN = "https://warframe.fandom.com/wiki/Category:Mods"
+MODS_URL_RU = "https://warframe.fandom.com/ru/wiki/Категория:Моды"
 
 
-def update_all_files():
+def _result_or_none(future, stage):
     """
-    Актуализирует все файлы в папке "other_from_game" с использованием функций из модуля warframe_wiki_api.
+    Возвращает результат загрузки или None, если она завершилась исключением.
+    """
+    try:
+        return future.result()
+    except Exception as error:
+        print(f"{stage}: загрузка не удалась ({error!r})")
+        return None
+
+
+def update_all_files(base_dir="other_from_game", cookie_auth='seefalert'):
+    """
+    Актуализирует все файлы в папке "other_from_game" с использованием функций из модулей
+    warframe_market_api и warframe_wiki_api.
+
+    Четыре независимые загрузки (предметы EN/RU с Warframe.market и моды EN/RU с вики) выполняются
+    параллельно, поэтому обновление занимает время самой долгой из них. Новые данные сравниваются
+    с текущими файлами, и перезаписываются только изменившиеся файлы — атомарно, через временный
+    файл и переименование. Если какая-либо загрузка не удалась, зависящие от неё файлы не трогаются.
+
+    Параметры:
+        base_dir (str, optional): Папка с файлами данных. По умолчанию "other_from_game".
+        cookie_auth (str, optional): Значение Cookie_Auth для запросов к Warframe.market API.
+
+    Возвращает:
+        dict: Словарь {путь к файлу: True, если файл был перезаписан}.
     """
-    base_dir = "other_from_game"
     items_en_file = os.path.join(base_dir, "items_en")
     items_ru_file = os.path.join(base_dir, "items_ru")
     mods_en_file = os.path.join(base_dir, "mods_en")
     mods_ru_file = os.path.join(base_dir, "mods_ru")
+    catalog_file = os.path.join(base_dir, os.path.basename(DEFAULT_CATALOG_PATH))
+
+    timer = StageTimer()
+    crawler = WikiCategoryCrawler()
+
+    def timed(stage, function, *args, **kwargs):
+        with timer.stage(stage):
+            return function(*args, **kwargs)
 
-    # Получаем списки предметов с API
-    cookie_auth = 'seefalert'
-    items_list_en = get_items_list(cookie_auth, language='en')
-    items_list_ru = get_items_list(cookie_auth, language='ru')
+    started = time.perf_counter()
 
-    items_en = [item['item_name'] for item in items_list_en]
-    items_ru = [item['item_name'] for item in items_list_ru]
+    # Получаем списки предметов с API и списки модов с вики параллельно
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        items_en_future = executor.submit(timed, "items_en", get_items_list, cookie_auth, language='en')
+        items_ru_future = executor.submit(timed, "items_ru", get_items_list, cookie_auth, language='ru')
+        mods_en_future = executor.submit(timed, "mods_en", crawler.crawl, MODS_URL_EN)
+        mods_ru_future = executor.submit(timed, "mods_ru", crawler.crawl, MODS_URL_RU)
 
-    # Сохраняем отсортированные уникальные названия предметов в файлы
-    save_sorted_unique_elements(items_en_file, items_en)
-    save_sorted_unique_elements(items_ru_file, items_ru)
+        items_list_en = _result_or_none(items_en_future, "items_en")
+        items_list_ru = _result_or_none(items_ru_future, "items_ru")
+        mod_names_en = _result_or_none(mods_en_future, "mods_en")
+        mod_names_ru = _result_or_none(mods_ru_future, "mods_ru")
+    crawler.save_state()
 
-    # Получаем список названий модов с различных веб-страниц
-    mods_url_en = "https://warframe.fandom.com/wiki/Category:Mods"
-    mod_names_en = get_mod_names(mods_url_en)
+    changed = {}
+    with timer.stage("write"):
+        items_en = [item['item_name'] for item in items_list_en] if items_list_en else None
+        items_ru = [item['item_name'] for item in items_list_ru] if items_list_ru else None
 
-    mods_url_ru = "https://warframe.fandom.com/ru/wiki/Категория:Моды"
-    mod_names_ru = get_mod_names(mods_url_ru)
+        # Сохраняем отсортированные уникальные названия предметов в файлы
+        if items_en:
+            changed[items_en_file] = save_sorted_unique_elements(items_en_file, items_en)
+        if items_ru:
+            changed[items_ru_file] = save_sorted_unique_elements(items_ru_file, items_ru)
 
-    # Сохраняем отсортированные уникальные названия модов в файлы
-    save_sorted_unique_elements(mods_en_file, mod_names_en)
-    save_sorted_unique_elements(mods_ru_file, mod_names_ru)
+        # В файлы модов попадают только моды, которыми можно торговать (есть в списке предметов)
+        if items_en and mod_names_en:
+            changed[mods_en_file] = save_sorted_unique_elements(mods_en_file, set(mod_names_en) & set(items_en))
+        if items_ru and mod_names_ru:
+            changed[mods_ru_file] = save_sorted_unique_elements(mods_ru_file, set(mod_names_ru) & set(items_ru))
 
-    # Находим общие элементы между списками модов и списками предметов
-    common_elements_en = find_common_elements(mod_names_en, "other_from_game/items_en")
-    common_elements_ru = find_common_elements(mod_names_ru, "other_from_game/items_ru")
+        # Обновляем двуязычный каталог предметов
+        if items_list_en:
+            catalog = build_catalog(items_list_en, items_list_ru, mod_names=set(mod_names_en or ()) | set(mod_names_ru or ()))
+            changed[catalog_file] = save_catalog(catalog, catalog_file)
 
-    # Сохраняем общие элементы в файлы
-    save_sorted_unique_elements(mods_en_file, common_elements_en)
-    save_sorted_unique_elements(mods_ru_file, common_elements_ru)
+    print(timer.report())
+    print(f"Всего: {time.perf_counter() - started:.2f} с")
+    for path, was_changed in changed.items():
+        print(f"{path}: {'обновлён' if was_changed else 'без изменений'}")
+    return changed
 
 
 if __name__ == "__main__":
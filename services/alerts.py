@@ -0,0 +1,256 @@
+"""
+Модуль alerts следит за ценами по правилам пользователей ("сообщи, когда X продают дешевле N платины").
+
+Правила группируются по предметам, поэтому за один цикл каждый предмет загружается не больше
+одного раза, сколько бы пользователей на него ни подписалось. Частота опроса подстраивается
+под предмет: волатильные предметы и предметы, цена которых близка к порогу, опрашиваются чаще
+спокойных, а общее количество запросов ограничено бюджетом. После загрузки статистика всех
+предметов цикла считается одним векторным проходом (analyze_catalog), а сработавшие правила
+находятся бинарным поиском по отсортированным порогам.
+
+Включает:
+- WatchRule: Правило оповещения.
+- AlertEngine: Планировщик опроса и проверки правил.
+"""
+
+
+import heapq
+import itertools
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+
+from services.business_logic import OnlinePriceStats, analyze_catalog
+from services.warframe_market_api import REQUESTS_PER_SECOND, get_items_orders_bulk
+
+
+@dataclass
+class WatchRule:
+    """
+    Правило оповещения.
+
+    Поля:
+        user_id (int): Пользователь, которому отправляется оповещение.
+        url_name (str): Уникальное имя предмета в формате URL.
+        threshold (float): Порог цены в платине.
+        order_type (str): 'sell' — сработать, когда предмет продают по цене не выше порога;
+                          'buy' — когда его покупают по цене не ниже порога.
+        cooldown (float): Минимальная пауза между повторными оповещениями в секундах.
+    """
+    user_id: int
+    url_name: str
+    threshold: float
+    order_type: str = 'sell'
+    cooldown: float = 60 * 60
+    last_notified: float = field(default=None, compare=False)
+    rule_id: int = field(default_factory=itertools.count(1).__next__, compare=False)
+
+
+class _ItemWatch:
+    """
+    Правила одного предмета, отсортированные по порогу отдельно для продажи и покупки.
+    """
+
+    def __init__(self):
+        self.sell = []
+        self.buy = []
+        self.stats = OnlinePriceStats(status='ingame', order_type='sell')
+        self.next_due = 0.0
+        self.generation = None
+
+    def rules(self, order_type):
+        return self.sell if order_type == 'sell' else self.buy
+
+    def add(self, rule):
+        rules = self.rules(rule.order_type)
+        thresholds = [existing.threshold for existing in rules]
+        rules.insert(bisect_right(thresholds, rule.threshold), rule)
+
+    def remove(self, rule):
+        rules = self.rules(rule.order_type)
+        if rule in rules:
+            rules.remove(rule)
+
+    def __bool__(self):
+        return bool(self.sell or self.buy)
+
+
+class AlertEngine:
+    """
+    Планировщик опроса цен и проверки правил оповещений.
+
+    Параметры:
+        notify (callable): Функция notify(rule, price), вызываемая для каждого сработавшего правила.
+        fetch (callable, optional): Функция fetch(url_names), возвращающая пары (url_name, заказы).
+                                    По умолчанию get_items_orders_bulk с официальным адресом API.
+        requests_per_second (float, optional): Бюджет запросов к API. По умолчанию REQUESTS_PER_SECOND.
+        cycle_seconds (float, optional): Длительность цикла в секундах. По умолчанию 30.
+        min_interval (float, optional): Минимальный интервал опроса предмета. По умолчанию 60.
+        max_interval (float, optional): Максимальный интервал опроса спокойного предмета. По умолчанию 1800.
+
+    Пример использования:
+        engine = AlertEngine(notify=lambda rule, price: print(rule.user_id, rule.url_name, price))
+        engine.add_rule(WatchRule(user_id=1, url_name='mirage_prime_systems', threshold=20))
+        engine.run()
+    """
+
+    def __init__(self, notify, fetch=None, requests_per_second=REQUESTS_PER_SECOND, cycle_seconds=30,
+                 min_interval=60, max_interval=30 * 60):
+        self.notify = notify
+        self.fetch = fetch or (lambda url_names: get_items_orders_bulk(
+            'https://api.warframe.market/v1', url_names, 'seefalert', language='en', rate=requests_per_second))
+        self.requests_per_second = requests_per_second
+        self.cycle_seconds = cycle_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.items = {}
+        self._queue = []
+        self._generations = itertools.count()
+        self._lock = threading.Lock()
+
+    def _schedule(self, url_name, watch, next_due):
+        """
+        Ставит предмет в очередь опроса. Вызывается под self._lock.
+
+        Каждая запись очереди получает новое поколение, поэтому прежние записи предмета,
+        в том числе оставшиеся от удалённого и снова добавленного предмета, считаются устаревшими.
+        """
+        watch.next_due = next_due
+        watch.generation = next(self._generations)
+        heapq.heappush(self._queue, (next_due, watch.generation, url_name))
+
+    def add_rule(self, rule):
+        """
+        Добавляет правило. Новый предмет опрашивается в ближайшем цикле.
+        Правило с неположительным порогом отклоняется с ValueError.
+        """
+        if rule.threshold <= 0:
+            raise ValueError("threshold должен быть положительным числом")
+        with self._lock:
+            watch = self.items.get(rule.url_name)
+            if watch is None:
+                watch = self.items[rule.url_name] = _ItemWatch()
+                self._schedule(rule.url_name, watch, watch.next_due)
+            watch.add(rule)
+
+    def remove_rule(self, rule):
+        """
+        Удаляет правило. Предмет без правил перестаёт опрашиваться.
+        """
+        with self._lock:
+            watch = self.items.get(rule.url_name)
+            if watch is None:
+                return
+            watch.remove(rule)
+            if not watch:
+                del self.items[rule.url_name]
+
+    def _interval(self, watch, summaries):
+        """
+        Подбирает интервал опроса: чем ближе цена к ближайшему порогу и чем выше волатильность,
+        тем чаще опрос.
+        """
+        distances = []
+        sell, buy = summaries
+        if sell and watch.sell and sell['min_platinum'] > 0:
+            distances.append((sell['min_platinum'] - watch.sell[-1].threshold) / sell['min_platinum'])
+        if buy and watch.buy:
+            distances.append((watch.buy[0].threshold - buy['max_platinum']) / watch.buy[0].threshold)
+        # Относительное расстояние до порога: 0 — у порога, 0.25 и больше — далеко
+        proximity = min(1.0, max(0.0, min(distances) / 0.25)) if distances else 1.0
+        interval = self.max_interval * proximity / (1 + 20 * watch.stats.volatility)
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _due_items(self, now):
+        budget = max(1, int(self.requests_per_second * self.cycle_seconds))
+        due = []
+        with self._lock:
+            while self._queue and len(due) < budget and self._queue[0][0] <= now:
+                _, generation, url_name = heapq.heappop(self._queue)
+                watch = self.items.get(url_name)
+                # Пропускаем удалённые предметы и устаревшие записи очереди
+                if watch is not None and watch.generation == generation:
+                    due.append(url_name)
+        return due
+
+    def evaluate(self, orders_by_item, now=None):
+        """
+        Проверяет правила по загруженным заказам и отправляет оповещения.
+
+        Параметры:
+            orders_by_item (dict): Словарь {url_name: список заказов}.
+            now (float, optional): Текущее время (Unix time). По умолчанию time.time().
+
+        Возвращает:
+            list: Пары (правило, цена) для отправленных оповещений.
+        """
+        now = time.time() if now is None else now
+        sell = analyze_catalog(orders_by_item, status='ingame', order_type='sell', current_year_only=False,
+                               percentiles=())
+        buy = analyze_catalog(orders_by_item, status='ingame', order_type='buy', current_year_only=False,
+                              percentiles=())
+
+        fired = []
+        with self._lock:
+            for url_name in orders_by_item:
+                watch = self.items.get(url_name)
+                if watch is None:
+                    continue
+                sell_summary, buy_summary = sell.get(url_name), buy.get(url_name)
+
+                if sell_summary and watch.sell:
+                    price = sell_summary['min_platinum']
+                    start = bisect_left([rule.threshold for rule in watch.sell], price)
+                    fired.extend((rule, price) for rule in watch.sell[start:])
+                if buy_summary and watch.buy:
+                    price = buy_summary['max_platinum']
+                    end = bisect_right([rule.threshold for rule in watch.buy], price)
+                    fired.extend((rule, price) for rule in watch.buy[:end])
+
+                watch.stats.update_summary(sell_summary, timestamp=now)
+                self._schedule(url_name, watch, now + self._interval(watch, (sell_summary, buy_summary)))
+
+        sent = []
+        for rule, price in fired:
+            if rule.last_notified is None or now - rule.last_notified >= rule.cooldown:
+                rule.last_notified = now
+                self.notify(rule, price)
+                sent.append((rule, price))
+        return sent
+
+    def run_cycle(self, now=None):
+        """
+        Выполняет один цикл: загружает предметы, срок опроса которых наступил (в пределах бюджета),
+        и проверяет их правила.
+
+        Возвращает:
+            list: Пары (правило, цена) для отправленных оповещений.
+        """
+        now = time.time() if now is None else now
+        due = self._due_items(now)
+        if not due:
+            return []
+
+        orders_by_item = {}
+        for url_name, orders in self.fetch(due):
+            if orders is not None:
+                orders_by_item[url_name] = orders
+
+        # Предметы, которые не удалось загрузить, повторяем в следующем цикле
+        with self._lock:
+            for url_name in due:
+                watch = self.items.get(url_name)
+                if url_name not in orders_by_item and watch is not None:
+                    self._schedule(url_name, watch, now + self.cycle_seconds)
+        return self.evaluate(orders_by_item, now=now)
+
+    def run(self, stop_event=None):
+        """
+        Запускает бесконечный цикл опроса до установки stop_event.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            started = time.time()
+            self.run_cycle(started)
+            stop_event.wait(max(0.0, self.cycle_seconds - (time.time() - started)))
@@ -0,0 +1,265 @@
+"""
+Модуль arbitrage ищет выгодные сделки с прайм-наборами по всему каталогу.
+
+Граф «набор → части» строится один раз по названиям предметов каталога: набор называется
+"X Set", его части — предметы, название которых начинается с "X " (например, "Mirage Prime Set"
+и "Mirage Prime Systems"). Заказы всех наборов и частей загружаются одной пакетной загрузкой
+без повторов, статистика цен считается одним проходом analyze_catalog, а стоимость частей
+каждого набора — одним взвешенным np.bincount по рёбрам графа.
+
+Для каждого набора считаются две сделки:
+- собрать набор: купить части по минимальной цене продажи и продать набор по лучшей цене покупки;
+- разобрать набор: купить набор по минимальной цене продажи и продать части по лучшим ценам покупки.
+
+Включает:
+- SetGraph, build_set_graph(items): Граф наборов и частей.
+- SetOpportunity: Результат по одному набору.
+- analyze_sets(graph, orders_by_item): Расчёт спредов по уже загруженным заказам.
+- scan_sets(items, ...): Загрузка заказов и расчёт спредов по всему каталогу.
+"""
+
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from services.business_logic import analyze_catalog, catalog_to_arrays
+from services.warframe_market_api import REQUESTS_PER_SECOND, get_items_orders_bulk
+
+
+DEFAULT_MARKET_URL = 'https://api.warframe.market/v1'
+SET_SUFFIX = ' Set'
+
+
+@dataclass
+class SetGraph:
+    """
+    Граф наборов и частей в виде массивов рёбер.
+
+    Поля:
+        sets (list): url_name наборов.
+        parts (list): url_name частей.
+        edge_set (np.ndarray): Номер набора для каждого ребра (int32).
+        edge_part (np.ndarray): Номер части для каждого ребра (int32).
+        edge_quantity (np.ndarray): Сколько частей нужно для набора (int32).
+        ducats (np.ndarray): Стоимость частей в дукатах (float64, NaN — неизвестно).
+    """
+    sets: list
+    parts: list
+    edge_set: np.ndarray
+    edge_part: np.ndarray
+    edge_quantity: np.ndarray
+    ducats: np.ndarray
+
+    def parts_of(self, set_index):
+        """
+        Возвращает пары (url_name части, количество) для набора.
+        """
+        mask = self.edge_set == set_index
+        return [(self.parts[part], int(quantity))
+                for part, quantity in zip(self.edge_part[mask], self.edge_quantity[mask])]
+
+    @property
+    def url_names(self):
+        """
+        Все url_name наборов и частей — то, что нужно загрузить.
+        """
+        return self.sets + self.parts
+
+
+@dataclass
+class SetOpportunity:
+    """
+    Спреды по одному набору. Цены в платине; NaN, если по набору или одной из частей нет заказов.
+
+    Поля:
+        set_name (str): url_name набора.
+        parts (list): Пары (url_name части, количество).
+        set_sell (float): Минимальная цена продажи набора.
+        set_buy (float): Лучшая цена покупки набора.
+        parts_sell (float): Сумма минимальных цен продажи частей.
+        parts_buy (float): Сумма лучших цен покупки частей.
+        assemble_profit (float): set_buy - parts_sell — собрать набор из частей и продать.
+        split_profit (float): parts_buy - set_sell — купить набор и продать части.
+        ducats (float): Сумма дукатов за части (NaN, если неизвестна).
+        ducats_per_platinum (float): Дукаты за платину при покупке частей.
+    """
+    set_name: str
+    parts: list
+    set_sell: float
+    set_buy: float
+    parts_sell: float
+    parts_buy: float
+    assemble_profit: float
+    split_profit: float
+    ducats: float
+    ducats_per_platinum: float
+
+    @property
+    def best_profit(self):
+        return np.nanmax([self.assemble_profit, self.split_profit, -np.inf])
+
+
+def _fields(item):
+    if isinstance(item, dict):
+        return item['url_name'], item['item_name'], item.get('ducats')
+    return item.url_name, item.name_en, getattr(item, 'ducats', None)
+
+
+def build_set_graph(items, quantities=None, ducats=None):
+    """
+    Строит граф «набор → части» по названиям предметов.
+
+    Параметры:
+        items (iterable): Предметы каталога: Catalog / CatalogItem или словари /items
+                          (url_name, item_name на английском, необязательно ducats).
+        quantities (dict, optional): Количество части в наборе {(url_name набора, url_name части): n}.
+                                     По умолчанию 1 для всех частей.
+        ducats (dict, optional): Стоимость частей в дукатах {url_name: дукаты}, дополняет поле ducats предметов.
+
+    Возвращает:
+        SetGraph: Граф наборов и частей. Наборы без найденных частей пропускаются.
+    """
+    quantities = quantities or {}
+    records = [_fields(item) for item in items]
+    known_ducats = {url_name: value for url_name, _, value in records if value is not None}
+    known_ducats.update(ducats or {})
+
+    # Префикс названия набора ("Mirage Prime ") -> url_name набора
+    set_prefixes = {name[:-len(SET_SUFFIX)] + ' ': url_name
+                    for url_name, name, _ in records if name.endswith(SET_SUFFIX)}
+    # Запасной префикс до слова Prime включительно: части "Kavasa Prime Kubrow Collar Set"
+    # называются "Kavasa Prime Band" и "Kavasa Prime Buckle". Неоднозначные префиксы не используются.
+    base_prefixes = {}
+    for prefix, set_name in set_prefixes.items():
+        position = prefix.find(' Prime ')
+        if position != -1:
+            base = prefix[:position + len(' Prime ')]
+            base_prefixes[base] = None if base in base_prefixes else set_name
+
+    edges = {}
+    for url_name, name, _ in records:
+        if name.endswith(SET_SUFFIX):
+            continue
+        words = name.split(' ')
+        # Самый длинный подходящий префикс набора, а если его нет — запасной префикс "X Prime "
+        for prefixes in (set_prefixes, base_prefixes):
+            set_name = next((prefixes[prefix] for prefix in
+                             (' '.join(words[:length]) + ' ' for length in range(len(words) - 1, 0, -1))
+                             if prefixes.get(prefix)), None)
+            if set_name is not None:
+                edges.setdefault(set_name, []).append(url_name)
+                break
+
+    sets = sorted(edges)
+    parts = sorted({part for set_parts in edges.values() for part in set_parts})
+    part_index = {url_name: index for index, url_name in enumerate(parts)}
+
+    edge_set, edge_part, edge_quantity = [], [], []
+    for set_index, set_name in enumerate(sets):
+        for part in edges[set_name]:
+            edge_set.append(set_index)
+            edge_part.append(part_index[part])
+            edge_quantity.append(quantities.get((set_name, part), 1))
+
+    return SetGraph(
+        sets=sets,
+        parts=parts,
+        edge_set=np.array(edge_set, dtype=np.int32),
+        edge_part=np.array(edge_part, dtype=np.int32),
+        edge_quantity=np.array(edge_quantity, dtype=np.int32),
+        ducats=np.array([known_ducats.get(part, np.nan) for part in parts], dtype=np.float64),
+    )
+
+
+def _column(stats, names, key):
+    return np.array([stats[name][key] if stats.get(name) else np.nan for name in names], dtype=np.float64)
+
+
+def _sum_parts(graph, part_values):
+    """
+    Суммирует значения частей по наборам с учётом количества; NaN, если хотя бы одно значение неизвестно.
+    """
+    values = part_values[graph.edge_part] * graph.edge_quantity
+    missing = np.isnan(values)
+    totals = np.bincount(graph.edge_set, weights=np.where(missing, 0.0, values), minlength=len(graph.sets))
+    incomplete = np.bincount(graph.edge_set, weights=missing, minlength=len(graph.sets)) > 0
+    totals[incomplete] = np.nan
+    return totals
+
+
+def analyze_sets(graph, orders_by_item, status='ingame', current_year_only=False):
+    """
+    Считает спреды всех наборов по уже загруженным заказам.
+
+    Параметры:
+        graph (SetGraph): Граф наборов и частей.
+        orders_by_item (dict): Словарь {url_name: заказы} для наборов и частей.
+        status (str, optional): Учитывать заказы пользователей с этим статусом. По умолчанию 'ingame'.
+        current_year_only (bool, optional): Учитывать только заказы текущего года. По умолчанию False.
+
+    Возвращает:
+        list: SetOpportunity, отсортированные по убыванию лучшей из двух сделок.
+    """
+    arrays = catalog_to_arrays({name: orders_by_item.get(name) for name in graph.url_names})
+    sell = analyze_catalog(arrays, status=status, order_type='sell', current_year_only=current_year_only,
+                           percentiles=())
+    buy = analyze_catalog(arrays, status=status, order_type='buy', current_year_only=current_year_only,
+                          percentiles=())
+
+    set_sell = _column(sell, graph.sets, 'min_platinum')
+    set_buy = _column(buy, graph.sets, 'max_platinum')
+    parts_sell = _sum_parts(graph, _column(sell, graph.parts, 'min_platinum'))
+    parts_buy = _sum_parts(graph, _column(buy, graph.parts, 'max_platinum'))
+    ducats = _sum_parts(graph, graph.ducats)
+
+    assemble = set_buy - parts_sell
+    split = parts_buy - set_sell
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ducats_per_platinum = ducats / parts_sell
+    best = np.fmax(assemble, split)
+    # Наборы без цен — в конце списка
+    order = np.argsort(np.where(np.isnan(best), np.inf, -best), kind='stable')
+
+    return [
+        SetOpportunity(
+            set_name=graph.sets[index],
+            parts=graph.parts_of(index),
+            set_sell=float(set_sell[index]),
+            set_buy=float(set_buy[index]),
+            parts_sell=float(parts_sell[index]),
+            parts_buy=float(parts_buy[index]),
+            assemble_profit=float(assemble[index]),
+            split_profit=float(split[index]),
+            ducats=float(ducats[index]),
+            ducats_per_platinum=float(ducats_per_platinum[index]),
+        )
+        for index in order
+    ]
+
+
+def scan_sets(items, url=DEFAULT_MARKET_URL, cookie_auth='seefalert', platform='pc', rate=REQUESTS_PER_SECOND,
+              graph=None, status='ingame'):
+    """
+    Загружает заказы всех наборов и частей одной пакетной загрузкой и считает спреды.
+
+    Параметры:
+        items (iterable): Предметы каталога (см. build_set_graph). Не используется, если передан graph.
+        url (str, optional): Базовый URL Warframe.market API. По умолчанию DEFAULT_MARKET_URL.
+        cookie_auth (str, optional): Значение Cookie_Auth. По умолчанию 'seefalert'.
+        platform (str, optional): Платформа. По умолчанию 'pc'.
+        rate (float, optional): Максимальная частота запросов. По умолчанию REQUESTS_PER_SECOND.
+        graph (SetGraph, optional): Готовый граф. По умолчанию строится по items.
+        status (str, optional): Статус пользователей заказов. По умолчанию 'ingame'.
+
+    Возвращает:
+        list: SetOpportunity, отсортированные по убыванию лучшей из двух сделок.
+
+    Пример использования:
+        for opportunity in scan_sets(Catalog.open())[:10]:
+            print(opportunity.set_name, opportunity.assemble_profit, opportunity.split_profit)
+    """
+    graph = graph or build_set_graph(items)
+    orders_by_item = dict(get_items_orders_bulk(url, graph.url_names, cookie_auth, language='en',
+                                                platform=platform, rate=rate))
+    return analyze_sets(graph, orders_by_item, status=status)
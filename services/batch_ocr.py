@@ -0,0 +1,208 @@
+"""
+Модуль batch_ocr распознаёт текст на большом количестве скриншотов без живого окна игры.
+
+Источником служит папка (со вложенными папками) или архив .zip / .tar / .tar.gz со скриншотами.
+Каждое изображение обрабатывается в пуле процессов на всех ядрах: перевод в оттенки серого,
+вырезание области интереса (ROI), пороговая бинаризация и Tesseract. Результаты выводятся
+по мере готовности в формате JSON Lines вместе с временем каждого этапа.
+
+Пример запуска:
+    python -m services.batch_ocr screenshots.zip --lang eng,rus --roi 0,0,1920,400 --output results.jsonl
+"""
+
+
+import argparse
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from services import metrics
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def iter_images(source):
+    """
+    Перебирает изображения из папки или архива.
+
+    Параметры:
+        source (str): Путь к папке, архиву .zip или архиву .tar (.tar.gz, .tgz).
+
+    Возвращает:
+        generator: Пары (имя файла, байты изображения) в порядке имён.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS))
+        for path in sorted(paths):
+            with open(path, 'rb') as file:
+                yield os.path.relpath(path, source), file.read()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield name, archive.read(name)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            # Порядок членов tar сохраняется: архив читается последовательно, без повторных проходов
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"Неподдерживаемый источник скриншотов: {source}")
+
+
+def preprocess(gray, roi=None, threshold='otsu'):
+    """
+    Готовит изображение в оттенках серого к распознаванию.
+
+    Параметры:
+        gray (np.ndarray): Изображение в оттенках серого.
+        roi (tuple, optional): Область интереса (x, y, ширина, высота). По умолчанию всё изображение.
+        threshold (str | int, optional): 'otsu' — порог Оцу, число — фиксированный порог,
+                                         None — без бинаризации. По умолчанию 'otsu'.
+
+    Возвращает:
+        np.ndarray: Подготовленное изображение.
+    """
+    import cv2
+
+    if roi:
+        x, y, width, height = roi
+        gray = gray[y:y + height, x:x + width]
+    if threshold == 'otsu':
+        _, gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    elif threshold is not None:
+        _, gray = cv2.threshold(gray, int(threshold), 255, cv2.THRESH_BINARY)
+    return gray
+
+
+def process_image(name, data, languages=('eng', 'rus'), roi=None, threshold='otsu', tesseract_cmd=None):
+    """
+    Распознаёт текст на одном изображении. Выполняется в процессе пула.
+
+    Возвращает:
+        dict: {"file", "texts": {язык: текст}, "timings_ms": {этап: мс}} или {"file", "error"}.
+    """
+    # cv2 и pytesseract нужны только процессам пула, а не каждому, кто импортирует модуль
+    import cv2
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    timings = {}
+    started = time.perf_counter()
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return {"file": name, "error": "не удалось декодировать изображение"}
+    timings["decode"] = (time.perf_counter() - started) * 1000
+
+    step = time.perf_counter()
+    image = preprocess(gray, roi=roi, threshold=threshold)
+    timings["preprocess"] = (time.perf_counter() - step) * 1000
+
+    texts = {}
+    for lang in languages:
+        step = time.perf_counter()
+        texts[lang] = pytesseract.image_to_string(image, lang=lang)
+        timings[f"ocr_{lang}"] = (time.perf_counter() - step) * 1000
+
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return {"file": name, "texts": texts, "timings_ms": {key: round(value, 2) for key, value in timings.items()}}
+
+
+def run_batch(source, languages=('eng', 'rus'), roi=None, threshold='otsu', tesseract_cmd=None, max_workers=None):
+    """
+    Распознаёт текст на всех скриншотах источника в пуле процессов.
+
+    Одновременно в работе держится не больше двух изображений на процесс, поэтому
+    даже большой архив не загружается в память целиком.
+
+    Параметры:
+        source (str): Папка или архив со скриншотами.
+        languages (tuple, optional): Языки Tesseract. По умолчанию ('eng', 'rus').
+        roi (tuple, optional): Область интереса (x, y, ширина, высота). По умолчанию None.
+        threshold (str | int, optional): Способ бинаризации, см. preprocess. По умолчанию 'otsu'.
+        tesseract_cmd (str, optional): Путь к исполняемому файлу Tesseract. По умолчанию из pytesseract.
+        max_workers (int, optional): Количество процессов. По умолчанию по числу ядер.
+
+    Возвращает:
+        generator: Словари с результатами (см. process_image) в порядке завершения.
+    """
+    max_workers = max_workers or os.cpu_count()
+    images = iter_images(source)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        names = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < 2 * max_workers:
+                try:
+                    name, data = next(images)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(process_image, name, data, languages, roi, threshold, tesseract_cmd)
+                names[future] = name
+                pending.append(future)
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                name = names.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"file": name, "error": str(e)}
+                # Этапы выполняются в процессах пула, поэтому их время берём из результата
+                for stage, milliseconds in result.get("timings_ms", {}).items():
+                    metrics.observe('batch_ocr_stage_seconds', milliseconds / 1000, stage=stage)
+                metrics.inc('batch_ocr_images_total', result='error' if "error" in result else 'ok')
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетное распознавание текста на скриншотах")
+    parser.add_argument('source', help="папка или архив (.zip, .tar, .tar.gz) со скриншотами")
+    parser.add_argument('--lang', default='eng,rus', help="языки через запятую, например eng,rus или eng+rus")
+    parser.add_argument('--roi', help="область интереса x,y,ширина,высота")
+    parser.add_argument('--threshold', default='otsu', help="otsu, число от 0 до 255 или none")
+    parser.add_argument('--workers', type=int, help="количество процессов (по умолчанию по числу ядер)")
+    parser.add_argument('--tesseract', help="путь к исполняемому файлу tesseract")
+    parser.add_argument('--output', help="файл для результатов JSON Lines (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    roi = tuple(int(value) for value in args.roi.split(',')) if args.roi else None
+    threshold = None if args.threshold == 'none' else args.threshold
+    languages = tuple(lang for lang in args.lang.split(',') if lang)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    started = time.perf_counter()
+    count = 0
+    try:
+        for result in run_batch(args.source, languages, roi, threshold, args.tesseract, args.workers):
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            output.flush()
+            count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Обработано изображений: {count} за {elapsed:.1f} с", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,239 @@
-def analyze_orders(orders, status=None, order_type=None, current_year_only=True):
+"""
+Модуль business_logic содержит функции для анализа заказов Warframe.market.
+
+Заказы один раз переводятся в столбцовый вид (массивы NumPy), после чего фильтры
+и статистика считаются векторно — как для одного предмета, так и для тысяч предметов сразу.
+
+Включает функции:
+- orders_to_arrays(orders): Преобразует список заказов в столбцовые массивы.
+- analyze_orders(orders, ...): Вычисляет статистику цен по заказам одного предмета.
+- analyze_catalog(orders_by_item, ...): Вычисляет статистику цен сразу для множества предметов.
+
+Включает классы:
+- P2Quantile: Потоковая оценка квантиля алгоритмом P² с фиксированным объёмом памяти.
+- OnlinePriceStats: Инкрементальная статистика цен предмета для долгого мониторинга.
+"""
+
+
+import logging
+import math
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+# Коды статусов пользователей и типов заказов в столбцовом представлении
+STATUS_CODES = {'offline': 0, 'online': 1, 'ingame': 2}
+ORDER_TYPE_CODES = {'sell': 0, 'buy': 1}
+UNKNOWN_CODE = -1
+
+# Перцентили, которые возвращаются по умолчанию
+DEFAULT_PERCENTILES = (10, 25, 75, 90)
+
+
+@dataclass
+class OrderArrays:
+    """
+    Столбцовое представление заказов.
+
+    Поля:
+        platinum (np.ndarray): Цена в платине (float64).
+        quantity (np.ndarray): Количество единиц (int64).
+        status (np.ndarray): Код статуса пользователя из STATUS_CODES (int8).
+        order_type (np.ndarray): Код типа заказа из ORDER_TYPE_CODES (int8).
+        last_update (np.ndarray): Время последнего обновления заказа, Unix time (int64).
+        item (np.ndarray): Номер предмета, к которому относится заказ (int32).
+        item_names (list): Имена предметов по номерам из поля item.
+    """
+    platinum: np.ndarray
+    quantity: np.ndarray
+    status: np.ndarray
+    order_type: np.ndarray
+    last_update: np.ndarray
+    item: np.ndarray
+    item_names: list
+
+    def __len__(self):
+        return len(self.platinum)
+
+
+def _parse_timestamps(values):
+    """
+    Векторно переводит ISO-даты вида '2023-07-30T12:34:56.000+00:00' в Unix time.
+    Warframe.market отдаёт время в UTC, поэтому часовой пояс отбрасывается.
+    """
+    if not values:
+        return np.empty(0, dtype=np.int64)
+    return np.array([value[:19] for value in values], dtype='datetime64[s]').astype(np.int64)
+
+
+@metrics.timed('analysis_seconds', function='orders_to_arrays')
+def orders_to_arrays(orders, item_name=None):
+    """
+    Преобразует список заказов в столбцовые массивы.
+
+    Параметры:
+        orders (list | OrderBook): Список словарей с информацией о заказах или книга заказов (ответ get_item_orders).
+        item_name (str, optional): Имя предмета, к которому относятся заказы. По умолчанию None.
+
+    Возвращает:
+        OrderArrays: Столбцовое представление заказов.
+    """
+    if isinstance(orders, OrderArrays):
+        return orders
+    # Книга заказов (services.orders.OrderBook) уже хранит готовые столбцы
+    to_arrays = getattr(orders, 'to_arrays', None)
+    if to_arrays is not None:
+        return to_arrays(item_name)
+
+    count = len(orders)
+    return OrderArrays(
+        platinum=np.fromiter((order['platinum'] for order in orders), dtype=np.float64, count=count),
+        quantity=np.fromiter((order['quantity'] for order in orders), dtype=np.int64, count=count),
+        status=np.fromiter((STATUS_CODES.get(order['user']['status'], UNKNOWN_CODE) for order in orders),
+                           dtype=np.int8, count=count),
+        order_type=np.fromiter((ORDER_TYPE_CODES.get(order['order_type'], UNKNOWN_CODE) for order in orders),
+                               dtype=np.int8, count=count),
+        last_update=_parse_timestamps([order['last_update'] for order in orders]),
+        item=np.zeros(count, dtype=np.int32),
+        item_names=[item_name],
+    )
+
+
+@metrics.timed('analysis_seconds', function='catalog_to_arrays')
+def catalog_to_arrays(orders_by_item):
+    """
+    Объединяет заказы множества предметов в одно столбцовое представление.
+
+    Параметры:
+        orders_by_item (dict): Словарь {url_name: список заказов}. Значения None пропускаются.
+
+    Возвращает:
+        OrderArrays: Столбцовое представление, в котором поле item указывает номер предмета.
+    """
+    parts = []
+    item_names = []
+    for url_name, orders in orders_by_item.items():
+        if orders is None:
+            continue
+        # Копия с новым полем item: массивы вызывающего кода (например, OrderBook.to_arrays) не меняются
+        arrays = orders_to_arrays(orders)
+        arrays = replace(arrays, item=np.full(len(arrays), len(item_names), dtype=np.int32))
+        item_names.append(url_name)
+        parts.append(arrays)
+
+    if not parts:
+        return replace(orders_to_arrays([]), item_names=[])
+
+    return OrderArrays(
+        platinum=np.concatenate([part.platinum for part in parts]),
+        quantity=np.concatenate([part.quantity for part in parts]),
+        status=np.concatenate([part.status for part in parts]),
+        order_type=np.concatenate([part.order_type for part in parts]),
+        last_update=np.concatenate([part.last_update for part in parts]),
+        item=np.concatenate([part.item for part in parts]),
+        item_names=item_names,
+    )
+
+
+def _select_mask(arrays, status, order_type, current_year_only):
+    """
+    Строит булеву маску заказов, подходящих под фильтры.
+    """
+    mask = arrays.quantity > 0
+    if status:
+        mask &= arrays.status == STATUS_CODES.get(status, UNKNOWN_CODE)
+    if order_type:
+        mask &= arrays.order_type == ORDER_TYPE_CODES.get(order_type, UNKNOWN_CODE)
+    if current_year_only:
+        year_start = datetime(datetime.now(timezone.utc).year, 1, 1, tzinfo=timezone.utc)
+        year_end = datetime(year_start.year + 1, 1, 1, tzinfo=timezone.utc)
+        mask &= (arrays.last_update >= int(year_start.timestamp())) & (arrays.last_update < int(year_end.timestamp()))
+    return mask
+
+
+def _summarize(arrays, mask, percentiles):
+    """
+    Считает статистику по отфильтрованным заказам для всех предметов за один проход.
+
+    Заказы сортируются по (предмет, цена), после чего минимумы, максимумы, суммы и
+    взвешенные по количеству перцентили находятся через смещения групп и searchsorted.
+
+    Возвращает:
+        dict: Словарь {номер предмета: словарь со статистикой} для предметов, у которых есть заказы.
+    """
+    item = arrays.item[mask]
+    platinum = arrays.platinum[mask]
+    quantity = arrays.quantity[mask]
+    if not len(item):
+        return {}
+
+    order = np.lexsort((platinum, item))
+    item, platinum, quantity = item[order], platinum[order], quantity[order]
+
+    # Границы групп (предметов) в отсортированном массиве
+    starts = np.flatnonzero(np.r_[True, item[1:] != item[:-1]])
+    ends = np.r_[starts[1:], len(item)] - 1
+
+    depth = np.add.reduceat(quantity, starts)
+    total_platinum = np.add.reduceat(platinum * quantity, starts)
+    counts = ends - starts + 1
+
+    # Взвешенные перцентили: наименьшая цена, на которой накопленное количество достигает доли q
+    cumulative = np.cumsum(quantity)
+    group_offset = cumulative[starts] - quantity[starts]
+    quantiles = {}
+    for q in (50, *percentiles):
+        target = group_offset + depth * (q / 100)
+        positions = np.searchsorted(cumulative, target, side='left')
+        quantiles[q] = platinum[np.clip(positions, starts, ends)]
+
+    results = {}
+    for group, item_index in enumerate(item[starts]):
+        results[int(item_index)] = {
+            "min_platinum": float(platinum[starts[group]]),
+            "max_platinum": float(platinum[ends[group]]),
+            "average_platinum": float(total_platinum[group] / depth[group]),
+            "median_platinum": float(quantiles[50][group]),
+            "percentiles": {q: float(quantiles[q][group]) for q in percentiles},
+            "depth": int(depth[group]),
+            "orders_count": int(counts[group]),
+        }
+    return results
+
+
+@metrics.timed('analysis_seconds', function='analyze_orders')
+def analyze_orders(orders, status=None, order_type=None, current_year_only=True, percentiles=DEFAULT_PERCENTILES):
     """
     analyze_orders
     Анализирует список заказов и вычисляет некоторые статистические данные.
 
     Параметры:
-        orders (list): Список словарей с информацией о заказах.
+        orders (list | OrderArrays): Список словарей с информацией о заказах или их столбцовое представление.
         status (str, optional): Фильтр по статусу пользователя заказов. По умолчанию None.
                                 Возможные значения: 'ingame', 'online', 'offline'.
         order_type (str, optional): Фильтр по типу заказа (покупка/продажа). По умолчанию None.
                                     Возможные значения: 'sell', 'buy'.
         current_year_only (bool, optional): Флаг, определяющий, нужно ли учитывать заказы только из текущего года.
                                             По умолчанию True.
+        percentiles (tuple, optional): Перцентили цены, взвешенные по количеству. По умолчанию DEFAULT_PERCENTILES.
 
     Возвращает:
-        dict: Словарь с некоторыми статистическими данными о заказах.
-              Возможные ключи:
+        dict | None: Словарь с некоторыми статистическими данными о заказах или None, если подходящих
+                     заказов нет. Возможные ключи:
               - "min_platinum": Самое дешёвое значение platinum.
               - "max_platinum": Самое дорогое значение platinum.
-              - "average_platinum": Средняя стоимость platinum.
+              - "average_platinum": Средняя стоимость platinum, взвешенная по количеству.
+              - "median_platinum": Медианная стоимость platinum, взвешенная по количеству.
+              - "percentiles": Словарь {перцентиль: стоимость platinum}.
+              - "depth": Суммарное количество единиц в заказах (глубина рынка).
+              - "orders_count": Количество подходящих заказов.
 
     Пример использования:
         orders_list = get_item_orders("mirage_prime_systems")
@@ -27,43 +243,314 @@ def analyze_orders(orders, status=None, order_type=None, current_year_only=True)
             print(f"Самое дорогое значение platinum: {results['max_platinum']}")
             print(f"Средняя стоимость platinum: {results['average_platinum']}")
     """
-    # Внутренняя функция для фильтрации заказов
-    def filter_orders(order):
-        if status and order['user']['status'] != status:
-            return False
-        if order_type and order['order_type'] != order_type:
-            return False
-        if current_year_only and int(order['last_update'][:4]) != datetime.now().year:
+    arrays = orders_to_arrays(orders)
+    mask = _select_mask(arrays, status, order_type, current_year_only)
+    results = _summarize(arrays, mask, percentiles)
+
+    # Если нет выбранных заказов, возвращаем None; пустая сторона рынка — обычная ситуация, поэтому только debug
+    if not results:
+        logger.debug("Нет заказов с параметрами: status=%r, order_type=%r, current_year_only=%s",
+                     status, order_type, current_year_only)
+        return None
+
+    return next(iter(results.values()))
+
+
+@metrics.timed('analysis_seconds', function='analyze_catalog')
+def analyze_catalog(orders_by_item, status=None, order_type=None, current_year_only=True,
+                    percentiles=DEFAULT_PERCENTILES):
+    """
+    Вычисляет статистику цен сразу для множества предметов за один векторный проход.
+
+    Параметры:
+        orders_by_item (dict | OrderArrays): Словарь {url_name: список заказов} или результат catalog_to_arrays.
+        status (str, optional): Фильтр по статусу пользователя заказов. По умолчанию None.
+        order_type (str, optional): Фильтр по типу заказа. По умолчанию None.
+        current_year_only (bool, optional): Учитывать только заказы текущего года. По умолчанию True.
+        percentiles (tuple, optional): Перцентили цены, взвешенные по количеству. По умолчанию DEFAULT_PERCENTILES.
+
+    Возвращает:
+        dict: Словарь {url_name: статистика как в analyze_orders или None, если подходящих заказов нет}.
+
+    Пример использования:
+        orders_by_item = dict(get_items_orders_bulk(base_url, url_names, 'seefalert'))
+        summary = analyze_catalog(orders_by_item, status='ingame', order_type='sell')
+        print(summary['mirage_prime_systems']['median_platinum'])
+    """
+    arrays = orders_by_item if isinstance(orders_by_item, OrderArrays) else catalog_to_arrays(orders_by_item)
+    mask = _select_mask(arrays, status, order_type, current_year_only)
+    results = _summarize(arrays, mask, percentiles)
+    summary = {name: results.get(index) for index, name in enumerate(arrays.item_names)}
+    if isinstance(orders_by_item, OrderArrays):
+        return summary
+    # Предметы, заказы которых не загрузились (None), тоже попадают в ответ со значением None
+    return {name: summary.get(name) for name in orders_by_item}
+
+
+class P2Quantile:
+    """
+    Потоковая оценка квантиля алгоритмом P² (Jain, Chlamtac, 1985).
+
+    Хранит всего пять маркеров независимо от количества наблюдений.
+
+    Параметры:
+        p (float): Доля квантиля в диапазоне (0, 1), например 0.5 для медианы.
+
+    Пример использования:
+        median = P2Quantile(0.5)
+        for price in prices:
+            median.add(price)
+        print(median.value())
+    """
+
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError("p должен лежать в диапазоне (0, 1)")
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        """
+        Добавляет наблюдение.
+        """
+        self.count += 1
+        heights = self.heights
+
+        # Первые пять наблюдений просто накапливаем
+        if self.count <= 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+
+        positions = self.positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Корректируем положение трёх средних маркеров
+        for i in range(1, 4):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self):
+        """
+        Возвращает текущую оценку квантиля.
+
+        Возвращает:
+            float | None: Оценка квантиля или None, если наблюдений ещё не было.
+        """
+        if not self.heights:
+            return None
+        if self.count <= 5:
+            index = min(len(self.heights) - 1, max(0, math.ceil(self.p * len(self.heights)) - 1))
+            return self.heights[index]
+        return self.heights[2]
+
+    def to_dict(self):
+        """
+        Возвращает состояние в виде словаря, пригодного для JSON.
+        """
+        return {"p": self.p, "count": self.count, "heights": list(self.heights),
+                "positions": list(self.positions), "desired": list(self.desired)}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Восстанавливает оценку из словаря, полученного методом to_dict.
+        """
+        sketch = cls(state["p"])
+        sketch.count = state["count"]
+        sketch.heights = list(state["heights"])
+        sketch.positions = list(state["positions"])
+        sketch.desired = list(state["desired"])
+        return sketch
+
+
+class OnlinePriceStats:
+    """
+    Инкрементальная статистика цен одного предмета для долгого мониторинга.
+
+    При каждом новом снимке заказов обновляет минимум и максимум цены, среднюю цену,
+    взвешенную по количеству, потоковые квантили опорной цены (P²) и волатильность
+    как экспоненциально взвешенное стандартное отклонение логарифмических доходностей (EWMA).
+    История снимков не хранится, поэтому объём состояния постоянен.
+
+    Опорная цена снимка — медиана цен подходящих заказов, взвешенная по количеству.
+
+    Параметры:
+        status (str, optional): Фильтр по статусу пользователя. По умолчанию 'ingame'.
+        order_type (str, optional): Фильтр по типу заказа. По умолчанию 'sell'.
+        quantiles (tuple, optional): Отслеживаемые квантили опорной цены. По умолчанию (0.1, 0.5, 0.9).
+        decay (float, optional): Коэффициент затухания EWMA (λ). По умолчанию 0.94.
+
+    Пример использования:
+        stats = OnlinePriceStats()
+        for orders in snapshots:
+            stats.update(orders)
+        print(stats.summary())
+        state = json.dumps(stats.to_dict())
+    """
+
+    def __init__(self, status='ingame', order_type='sell', quantiles=(0.1, 0.5, 0.9), decay=0.94):
+        self.status = status
+        self.order_type = order_type
+        self.decay = decay
+        self.snapshots = 0
+        self.min_platinum = None
+        self.max_platinum = None
+        self.total_platinum = 0.0
+        self.total_quantity = 0
+        self.last_price = None
+        self.last_timestamp = None
+        self.ewma_price = None
+        self.ewma_variance = 0.0
+        self.quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def update(self, orders, timestamp=None):
+        """
+        Учитывает новый снимок заказов.
+
+        Параметры:
+            orders (list | OrderArrays): Заказы предмета из снимка.
+            timestamp (int, optional): Время снимка (Unix time). По умолчанию текущее время.
+
+        Возвращает:
+            bool: True, если в снимке нашлись подходящие заказы.
+        """
+        arrays = orders_to_arrays(orders)
+        mask = _select_mask(arrays, self.status, self.order_type, current_year_only=False)
+        results = _summarize(arrays, mask, percentiles=())
+        if not results:
             return False
-        return True
+        summary = next(iter(results.values()))
+        return self.update_summary(summary, timestamp)
 
-    # Фильтруем заказы
-    selected_orders = filter(filter_orders, orders)
+    def update_summary(self, summary, timestamp=None):
+        """
+        Учитывает снимок, уже сведённый к статистике analyze_orders.
 
-    # Если нет выбранных заказов, выводим сообщение и возвращаем None
-    if not selected_orders:
-        print(f"Нет заказов с параметрами: status='{status}', order_type='{order_type}', current_year_only={current_year_only}")
-        return None
+        Параметры:
+            summary (dict): Результат analyze_orders для снимка.
+            timestamp (int, optional): Время снимка (Unix time). По умолчанию текущее время.
 
-    # Вычисляем суммарное количество единиц (quantity) и суммарное количество платины
-    total_quantity = sum(order['quantity'] for order in selected_orders)
-    total_platinum = sum(order['platinum'] * order['quantity'] for order in selected_orders)
+        Возвращает:
+            bool: True, если статистика обновлена.
+        """
+        if not summary:
+            return False
 
-    # Вычисляем среднюю стоимость platinum
-    average_platinum = total_platinum / total_quantity
+        self.snapshots += 1
+        self.last_timestamp = int(timestamp if timestamp is not None else datetime.now(timezone.utc).timestamp())
+        self.min_platinum = summary["min_platinum"] if self.min_platinum is None \
+            else min(self.min_platinum, summary["min_platinum"])
+        self.max_platinum = summary["max_platinum"] if self.max_platinum is None \
+            else max(self.max_platinum, summary["max_platinum"])
+        self.total_platinum += summary["average_platinum"] * summary["depth"]
+        self.total_quantity += summary["depth"]
+
+        price = summary["median_platinum"]
+        for sketch in self.quantiles.values():
+            sketch.add(price)
+
+        if self.last_price is None:
+            self.ewma_price = price
+        else:
+            log_return = math.log(price / self.last_price) if price > 0 and self.last_price > 0 else 0.0
+            self.ewma_variance = self.decay * self.ewma_variance + (1 - self.decay) * log_return ** 2
+            self.ewma_price = self.decay * self.ewma_price + (1 - self.decay) * price
+        self.last_price = price
+        return True
 
-    # Получение самого дешевого и самого дорогое значения platinum
-    min_platinum = min(order['platinum'] for order in selected_orders)
-    max_platinum = max(order['platinum'] for order in selected_orders)
+    @property
+    def volatility(self):
+        """
+        EWMA-волатильность логарифмических доходностей опорной цены между снимками.
+        """
+        return math.sqrt(self.ewma_variance)
 
-    # Возвращаем результаты в виде словаря
-    result = {
-        "min_platinum": min_platinum,
-        "max_platinum": max_platinum,
-        "average_platinum": average_platinum
-    }
+    @property
+    def average_platinum(self):
+        """
+        Средняя цена за всё время наблюдения, взвешенная по количеству.
+        """
+        return self.total_platinum / self.total_quantity if self.total_quantity else None
 
-    return result
+    def summary(self):
+        """
+        Возвращает текущую статистику.
 
+        Возвращает:
+            dict: Словарь с ключами "min_platinum", "max_platinum", "average_platinum", "last_platinum",
+                  "ewma_platinum", "volatility", "quantiles" и "snapshots".
+        """
+        return {
+            "min_platinum": self.min_platinum,
+            "max_platinum": self.max_platinum,
+            "average_platinum": self.average_platinum,
+            "last_platinum": self.last_price,
+            "ewma_platinum": self.ewma_price,
+            "volatility": self.volatility,
+            "quantiles": {q: sketch.value() for q, sketch in self.quantiles.items()},
+            "snapshots": self.snapshots,
+        }
 
+    def to_dict(self):
+        """
+        Возвращает состояние в виде словаря, пригодного для JSON.
+        """
+        return {
+            "status": self.status,
+            "order_type": self.order_type,
+            "decay": self.decay,
+            "snapshots": self.snapshots,
+            "min_platinum": self.min_platinum,
+            "max_platinum": self.max_platinum,
+            "total_platinum": self.total_platinum,
+            "total_quantity": self.total_quantity,
+            "last_price": self.last_price,
+            "last_timestamp": self.last_timestamp,
+            "ewma_price": self.ewma_price,
+            "ewma_variance": self.ewma_variance,
+            "quantiles": [sketch.to_dict() for sketch in self.quantiles.values()],
+        }
 
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Восстанавливает статистику из словаря, полученного методом to_dict.
+        """
+        sketches = [P2Quantile.from_dict(sketch) for sketch in state["quantiles"]]
+        stats = cls(state["status"], state["order_type"], quantiles=(), decay=state["decay"])
+        stats.quantiles = {sketch.p: sketch for sketch in sketches}
+        for key in ("snapshots", "min_platinum", "max_platinum", "total_platinum", "total_quantity",
+                    "last_price", "last_timestamp", "ewma_price", "ewma_variance"):
+            setattr(stats, key, state[key])
+        return stats
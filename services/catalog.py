@@ -0,0 +1,323 @@
+"""
+Модуль catalog объединяет английские и русские названия предметов Warframe.market в единый каталог.
+
+Каталог строится по ответам /items (get_items_list) на двух языках, связанным по id предмета,
+и сохраняется в компактный двоичный снимок. Снимок открывается через mmap за миллисекунды
+и позволяет за O(1) находить url_name по названию на любом языке и названия по url_name,
+не разбирая файл целиком.
+
+Формат снимка (все числа — uint32, little-endian):
+- заголовок: сигнатура, версия, количество записей и строк, размер блока строк, размеры трёх хеш-таблиц;
+- смещения строк в блоке строк (string_count + 1 значений);
+- записи по RECORD_FIELDS значений: номера строк id, url_name, name_en, name_ru, tags и флаги;
+- хеш-таблицы с открытой адресацией по id, по url_name и по названиям (номер записи + 1, 0 — пусто);
+- блок строк в UTF-8.
+
+Включает:
+- CatalogItem: Запись каталога.
+- build_catalog(items_en, items_ru, mod_names): Собирает записи каталога из ответов API.
+- save_catalog(items, path): Сохраняет записи в двоичный снимок.
+- Catalog: Чтение снимка и поиск по нему.
+"""
+
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections import namedtuple
+
+from services.utils import atomic_write_bytes
+
+
+DEFAULT_CATALOG_PATH = "other_from_game/catalog.bin"
+
+MAGIC = b'WFIC'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIIIII')
+RECORD_FIELDS = 6
+TAG_SEPARATOR = '\x1f'
+
+# Флаги записи
+FLAG_MOD = 1
+
+CatalogItem = namedtuple("CatalogItem", ["id", "url_name", "name_en", "name_ru", "tags", "is_mod"])
+
+
+def _hash(key):
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def _name_key(name):
+    return name.casefold()
+
+
+def build_catalog(items_en, items_ru=None, mod_names=()):
+    """
+    Собирает записи каталога из ответов /items на двух языках.
+
+    Параметры:
+        items_en (list): Список предметов на английском (результат get_items_list(..., language='en')).
+        items_ru (list, optional): Список предметов на русском. По умолчанию None.
+        mod_names (iterable, optional): Названия модов на любом языке для установки флага is_mod. По умолчанию ().
+
+    Возвращает:
+        list: Список CatalogItem, отсортированный по url_name.
+
+    Пример использования:
+        items = build_catalog(get_items_list(cookie_auth, 'en'), get_items_list(cookie_auth, 'ru'),
+                              mod_names=get_mod_names_from_file("other_from_game/mods_en"))
+        save_catalog(items)
+    """
+    names_ru = {item['id']: item['item_name'] for item in items_ru or ()}
+    mod_names = set(mod_names)
+
+    catalog = []
+    for item in items_en:
+        name_ru = names_ru.get(item['id'], '')
+        catalog.append(CatalogItem(
+            id=item['id'],
+            url_name=item['url_name'],
+            name_en=item['item_name'],
+            name_ru=name_ru,
+            tags=tuple(item.get('tags', ())),
+            is_mod=item['item_name'] in mod_names or name_ru in mod_names,
+        ))
+    catalog.sort(key=lambda record: record.url_name)
+    return catalog
+
+
+def _table_size(count):
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+
+def _fill_table(size, entries):
+    """
+    Заполняет хеш-таблицу с линейным пробированием. entries — пары (ключ, значение > 0).
+    """
+    table = array('I', bytes(4 * size))
+    mask = size - 1
+    for key, value in entries:
+        slot = _hash(key) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = value
+    return table
+
+
+def pack_catalog(items):
+    """
+    Упаковывает записи каталога в двоичный снимок.
+
+    Параметры:
+        items (list): Список CatalogItem.
+
+    Возвращает:
+        bytes: Содержимое снимка.
+    """
+    strings = {}
+
+    def string_id(value):
+        return strings.setdefault(value, len(strings))
+
+    records = array('I')
+    for item in items:
+        records.extend((string_id(item.id), string_id(item.url_name), string_id(item.name_en),
+                        string_id(item.name_ru), string_id(TAG_SEPARATOR.join(item.tags)),
+                        FLAG_MOD if item.is_mod else 0))
+
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets = array('I', [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    blob = b''.join(encoded)
+
+    id_table = _fill_table(_table_size(len(items)), ((item.id, i + 1) for i, item in enumerate(items)))
+    url_table = _fill_table(_table_size(len(items)), ((item.url_name, i + 1) for i, item in enumerate(items)))
+    # В таблице названий значение кодирует номер записи и язык: (номер + 1) * 2 + (1 для русского)
+    name_entries = []
+    for i, item in enumerate(items):
+        name_entries.append((_name_key(item.name_en), (i + 1) * 2))
+        if item.name_ru:
+            name_entries.append((_name_key(item.name_ru), (i + 1) * 2 + 1))
+    name_table = _fill_table(_table_size(len(name_entries)), name_entries)
+
+    arrays = [offsets, records, id_table, url_table, name_table]
+    if sys.byteorder != 'little':
+        for values in arrays:
+            values.byteswap()
+
+    header = HEADER.pack(MAGIC, VERSION, len(items), len(strings), len(blob),
+                         len(id_table), len(url_table), len(name_table))
+    return header + b''.join(values.tobytes() for values in arrays) + blob
+
+
+def save_catalog(items, path=DEFAULT_CATALOG_PATH):
+    """
+    Сохраняет записи каталога в двоичный снимок.
+
+    Параметры:
+        items (list): Список CatalogItem.
+        path (str, optional): Путь к файлу снимка. По умолчанию DEFAULT_CATALOG_PATH.
+
+    Возвращает:
+        bool: True, если файл был перезаписан (снимок с тем же содержимым не перезаписывается).
+    """
+    return atomic_write_bytes(path, pack_catalog(items))
+
+
+class Catalog:
+    """
+    Каталог предметов поверх двоичного снимка.
+
+    Разбирается только заголовок; строки и записи читаются из буфера по мере обращения.
+
+    Параметры:
+        buffer (bytes | mmap.mmap): Содержимое снимка.
+
+    Пример использования:
+        catalog = Catalog.open()
+        url_name = catalog.url_name_for("Мираж Прайм: Система")
+        print(catalog.names_for(url_name))
+    """
+
+    def __init__(self, buffer):
+        if sys.byteorder != 'little':
+            raise RuntimeError("Снимок каталога поддерживается только на little-endian платформах")
+
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, self._count, string_count, blob_size, id_size, url_size, name_size = \
+            HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Неизвестный формат снимка каталога")
+
+        position = HEADER.size
+
+        def take(length):
+            nonlocal position
+            part = view[position:position + 4 * length].cast('I')
+            position += 4 * length
+            return part
+
+        self._offsets = take(string_count + 1)
+        self._records = take(self._count * RECORD_FIELDS)
+        self._id_table = take(id_size)
+        self._url_table = take(url_size)
+        self._name_table = take(name_size)
+        self._blob = view[position:position + blob_size]
+
+    @classmethod
+    def open(cls, path=DEFAULT_CATALOG_PATH):
+        """
+        Открывает снимок каталога через mmap.
+
+        Параметры:
+            path (str, optional): Путь к файлу снимка. По умолчанию DEFAULT_CATALOG_PATH.
+
+        Возвращает:
+            Catalog: Каталог.
+        """
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped)
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Создаёт каталог в памяти из списка CatalogItem.
+        """
+        return cls(pack_catalog(items))
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._record(index)
+
+    def _string(self, string_id):
+        return str(self._blob[self._offsets[string_id]:self._offsets[string_id + 1]], 'utf-8')
+
+    def _field(self, index, field):
+        return self._string(self._records[index * RECORD_FIELDS + field])
+
+    def _record(self, index):
+        base = index * RECORD_FIELDS
+        tags = self._string(self._records[base + 4])
+        return CatalogItem(
+            id=self._string(self._records[base]),
+            url_name=self._string(self._records[base + 1]),
+            name_en=self._string(self._records[base + 2]),
+            name_ru=self._string(self._records[base + 3]),
+            tags=tuple(tags.split(TAG_SEPARATOR)) if tags else (),
+            is_mod=bool(self._records[base + 5] & FLAG_MOD),
+        )
+
+    def _lookup(self, table, key, field):
+        mask = len(table) - 1
+        slot = _hash(key) & mask
+        while table[slot]:
+            index = table[slot] - 1
+            if self._field(index, field) == key:
+                return index
+            slot = (slot + 1) & mask
+        return None
+
+    def get(self, url_name):
+        """
+        Возвращает запись каталога по url_name.
+
+        Возвращает:
+            CatalogItem | None: Запись или None, если предмета нет в каталоге.
+        """
+        index = self._lookup(self._url_table, url_name, 1)
+        return None if index is None else self._record(index)
+
+    def get_by_id(self, item_id):
+        """
+        Возвращает запись каталога по id предмета Warframe.market.
+
+        Возвращает:
+            CatalogItem | None: Запись или None, если предмета нет в каталоге.
+        """
+        index = self._lookup(self._id_table, item_id, 0)
+        return None if index is None else self._record(index)
+
+    def __contains__(self, url_name):
+        return self._lookup(self._url_table, url_name, 1) is not None
+
+    def names_for(self, url_name):
+        """
+        Возвращает названия предмета на английском и русском языках.
+
+        Возвращает:
+            tuple | None: Пара (name_en, name_ru) или None, если предмета нет в каталоге.
+        """
+        index = self._lookup(self._url_table, url_name, 1)
+        if index is None:
+            return None
+        return self._field(index, 2), self._field(index, 3)
+
+    def url_name_for(self, name):
+        """
+        Находит url_name по названию предмета на любом языке (без учёта регистра).
+
+        Возвращает:
+            str | None: url_name или None, если название не найдено.
+        """
+        key = _name_key(name)
+        table = self._name_table
+        mask = len(table) - 1
+        slot = _hash(key) & mask
+        while table[slot]:
+            index, is_ru = divmod(table[slot], 2)
+            index -= 1
+            if _name_key(self._field(index, 3 if is_ru else 2)) == key:
+                return self._field(index, 1)
+            slot = (slot + 1) & mask
+        return None
@@ -1,48 +1,332 @@
-from time import sleep
+"""
+Модуль eyes захватывает изображение окна игры и распознаёт на нём текст с помощью Tesseract OCR.
+
+Кадр делится на сетку фрагментов, для каждого фрагмента считается перцептивный хеш (average hash).
+Распознаются только области, хеш которых изменился с прошлого кадра, причём английский и русский
+языки распознаются параллельно в пуле процессов, а результаты кэшируются по хешу пикселей области.
+Поэтому статичный экран почти ничего не стоит.
+
+Источник кадров подменяемый: окно игры (WindowFrameSource, требует pygetwindow и pyautogui)
+или папка со скриншотами (DirectoryFrameSource), что позволяет запускать распознавание без экрана.
+
+Включает:
+- recognize_text_from_window(window_title, lang): Распознаёт текст во всём окне.
+- WindowFrameSource, DirectoryFrameSource: Источники кадров.
+- ChangeDetector: Поиск изменившихся областей кадра.
+- CaptureEngine: Распознавание текста только в изменившихся областях.
+"""
+
+
+import argparse
+import glob
+import hashlib
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter, sleep
 
-import cv2
-import pytesseract
-import pygetwindow as gw
-import pyautogui
 import numpy as np
 from PIL import Image
 
+from services import metrics
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+RegionText = namedtuple("RegionText", ["region", "texts"])
+
+
+def _capture_window(window_title):
+    # pygetwindow и pyautogui нужны только для захвата живого окна и недоступны на сервере без экрана.
+    # cv2 и pytesseract тоже импортируются в функциях, чтобы импорт модуля оставался быстрым
+    import pygetwindow as gw
+    import pyautogui
+
+    window = gw.getWindowsWithTitle(window_title)[0]
+    x, y, width, height = window.left, window.top, window.width, window.height
+    return np.array(pyautogui.screenshot(region=(x, y, width, height)))
+
+
 def recognize_text_from_window(window_title, lang='eng'):
+    import cv2
+    import pytesseract
+
     try:
-        window = gw.getWindowsWithTitle(window_title)[0]
-        x, y, width, height = window.left, window.top, window.width, window.height
-        screenshot = pyautogui.screenshot(region=(x, y, width, height))
-        image_np = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        image_np = cv2.cvtColor(_capture_window(window_title), cv2.COLOR_RGB2BGR)
         gray = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
-        text = pytesseract.image_to_string(gray, lang=lang)
+        with metrics.timer('ocr_seconds', lang=lang):
+            text = pytesseract.image_to_string(gray, lang=lang)
         return text
     except IndexError:
         print(f"Окно с заголовком '{window_title}' не найдено.")
         return None
 
 
-def main():
-    # Загрузка модели Tesseract OCR
-    pytesseract.pytesseract.tesseract_cmd = 'C:/Program Files/Tesseract-OCR/tesseract.exe'
+class WindowFrameSource:
+    """
+    Источник кадров из окна игры.
+
+    Параметры:
+        window_title (str): Заголовок окна.
+    """
+
+    def __init__(self, window_title):
+        self.window_title = window_title
+
+    def read(self):
+        """
+        Возвращает снимок окна в RGB или None, если окно не найдено.
+        """
+        try:
+            return _capture_window(self.window_title)
+        except IndexError:
+            print(f"Окно с заголовком '{self.window_title}' не найдено.")
+            return None
+
+
+class DirectoryFrameSource:
+    """
+    Источник кадров из папки со скриншотами (по порядку имён файлов).
+
+    Параметры:
+        directory (str): Папка с изображениями.
+        loop (bool, optional): Начинать заново после последнего файла. По умолчанию False.
+    """
+
+    def __init__(self, directory, loop=False):
+        self.paths = sorted(path for path in glob.glob(os.path.join(directory, '*'))
+                            if path.lower().endswith(IMAGE_EXTENSIONS))
+        self.loop = loop
+        self.position = 0
+
+    def read(self):
+        """
+        Возвращает следующий кадр в RGB или None, если файлы закончились.
+        """
+        if self.position >= len(self.paths):
+            if not self.loop or not self.paths:
+                return None
+            self.position = 0
+        path = self.paths[self.position]
+        self.position += 1
+        with Image.open(path) as image:
+            return np.array(image.convert('RGB'))
+
+
+class ChangeDetector:
+    """
+    Находит области кадра, изменившиеся с прошлого кадра, по перцептивному хешу фрагментов сетки.
+
+    Кадр в оттенках серого уменьшается до grid * hash_size точек, после чего для каждого фрагмента
+    строится average hash (бит на точку: ярче ли она среднего по фрагменту). Фрагмент считается
+    изменившимся, если расстояние Хэмминга между хешами больше threshold. Соседние изменившиеся
+    фрагменты объединяются в прямоугольные области.
+
+    Параметры:
+        grid (tuple, optional): Количество фрагментов по горизонтали и вертикали. По умолчанию (8, 8).
+        hash_size (int, optional): Сторона хеша фрагмента в точках. По умолчанию 8.
+        threshold (int, optional): Допустимое число различающихся бит. По умолчанию 3.
+    """
+
+    def __init__(self, grid=(8, 8), hash_size=8, threshold=3):
+        self.grid = grid
+        self.hash_size = hash_size
+        self.threshold = threshold
+        self.previous = None
+        self.previous_shape = None
+
+    def _tile_hashes(self, gray):
+        import cv2
+
+        columns, rows = self.grid
+        size = self.hash_size
+        small = cv2.resize(gray, (columns * size, rows * size), interpolation=cv2.INTER_AREA).astype(np.float32)
+        tiles = small.reshape(rows, size, columns, size).transpose(0, 2, 1, 3).reshape(rows, columns, size * size)
+        return tiles > tiles.mean(axis=2, keepdims=True)
+
+    def changed_regions(self, gray):
+        """
+        Возвращает изменившиеся области кадра.
+
+        Параметры:
+            gray (np.ndarray): Кадр в оттенках серого.
+
+        Возвращает:
+            list: Прямоугольники (x, y, ширина, высота). Для первого кадра — весь кадр.
+        """
+        hashes = self._tile_hashes(gray)
+        height, width = gray.shape[:2]
+        if self.previous is None or self.previous_shape != gray.shape:
+            self.previous, self.previous_shape = hashes, gray.shape
+            return [(0, 0, width, height)]
+
+        distances = np.count_nonzero(hashes != self.previous, axis=2)
+        changed = (distances > self.threshold).astype(np.uint8)
+        self.previous = hashes
+        if not changed.any():
+            return []
+
+        import cv2
+
+        columns, rows = self.grid
+        count, _, stats, _ = cv2.connectedComponentsWithStats(changed, connectivity=8)
+        regions = []
+        for left, top, tiles_wide, tiles_high, _ in stats[1:count]:
+            x0, y0 = left * width // columns, top * height // rows
+            x1, y1 = (left + tiles_wide) * width // columns, (top + tiles_high) * height // rows
+            regions.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+        return regions
+
+
+def _ocr_region(region, lang, tesseract_cmd):
+    # Выполняется в отдельном процессе, поэтому путь к Tesseract передаётся явно,
+    # а время распознавания возвращается вместе с текстом для метрик основного процесса
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    started = perf_counter()
+    text = pytesseract.image_to_string(region, lang=lang)
+    return text, perf_counter() - started
+
+
+class CaptureEngine:
+    """
+    Распознаёт текст только в изменившихся областях кадров.
+
+    Параметры:
+        source: Источник кадров с методом read() (WindowFrameSource или DirectoryFrameSource).
+        languages (tuple, optional): Языки Tesseract. По умолчанию ('eng', 'rus').
+        detector (ChangeDetector, optional): Детектор изменений. По умолчанию ChangeDetector().
+        tesseract_cmd (str, optional): Путь к исполняемому файлу Tesseract. По умолчанию из pytesseract.
+        cache_size (int, optional): Сколько результатов OCR хранить в кэше. По умолчанию 1024.
+        max_workers (int, optional): Количество процессов для OCR. По умолчанию по числу языков.
+
+    Пример использования:
+        with CaptureEngine(DirectoryFrameSource("screenshots")) as engine:
+            while (results := engine.process_next()) is not None:
+                for region, texts in results:
+                    print(region, texts['eng'])
+    """
+
+    def __init__(self, source, languages=('eng', 'rus'), detector=None, tesseract_cmd=None,
+                 cache_size=1024, max_workers=None):
+        import pytesseract
+
+        self.source = source
+        self.languages = languages
+        self.detector = detector or ChangeDetector()
+        self.tesseract_cmd = tesseract_cmd or pytesseract.pytesseract.tesseract_cmd
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.executor = ProcessPoolExecutor(max_workers=max_workers or len(languages))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def _cached(self, key):
+        texts = self.cache.get(key)
+        if texts is not None:
+            self.cache.move_to_end(key)
+        return texts
+
+    def _remember(self, key, texts):
+        self.cache[key] = texts
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def process_frame(self, frame):
+        """
+        Распознаёт текст в изменившихся областях кадра.
+
+        Параметры:
+            frame (np.ndarray): Кадр в RGB.
+
+        Возвращает:
+            list: Список RegionText(region, {язык: текст}) для изменившихся областей.
+        """
+        import cv2
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        with metrics.timer('change_detection_seconds'):
+            regions = self.detector.changed_regions(gray)
+
+        # Одинаковые области кадра (один и тот же ключ) распознаются одним заданием на язык
+        pending = {}
+        results = []
+        for region in regions:
+            x, y, width, height = region
+            crop = np.ascontiguousarray(gray[y:y + height, x:x + width])
+            key = hashlib.sha1(crop.tobytes() + str(crop.shape).encode()).hexdigest()
+            texts = self._cached(key)
+            if texts is None and key not in pending:
+                metrics.inc('ocr_regions_total', result='recognized')
+                futures = {lang: self.executor.submit(_ocr_region, crop, lang, self.tesseract_cmd)
+                           for lang in self.languages}
+                pending[key] = (futures, [])
+            else:
+                metrics.inc('ocr_regions_total', result='cached')
+            if texts is None:
+                pending[key][1].append(len(results))
+            results.append(RegionText(region, texts))
+
+        for key, (futures, positions) in pending.items():
+            texts = {}
+            for lang, future in futures.items():
+                texts[lang], seconds = future.result()
+                metrics.observe('ocr_seconds', seconds, lang=lang)
+            self._remember(key, texts)
+            for position in positions:
+                results[position] = RegionText(results[position].region, texts)
+        return results
+
+    def process_next(self):
+        """
+        Читает следующий кадр из источника и распознаёт его.
+
+        Возвращает:
+            list | None: Результат process_frame или None, если кадров больше нет.
+        """
+        frame = self.source.read()
+        if frame is None:
+            return None
+        return self.process_frame(frame)
 
-    while True:
-        # Распознавание текста на английском языке
-        window_title = "Завершение_Начатого_вики.png"  # Замените на заголовок окна, которое нужно сканировать
-        text = recognize_text_from_window(window_title, lang='eng')
 
-        # Вывод распознанного текста в консоль
-        if text:
-            print(f"Распознанный текст (английский): {text}")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Распознавание текста с экрана Warframe")
+    parser.add_argument('--window', default="Завершение_Начатого_вики.png",
+                        help="заголовок окна, которое нужно сканировать")
+    parser.add_argument('--frames', help="папка со скриншотами вместо живого окна")
+    parser.add_argument('--interval', type=float, default=5, help="пауза между кадрами в секундах")
+    parser.add_argument('--tesseract', help="путь к tesseract, например C:/Program Files/Tesseract-OCR/tesseract.exe "
+                                            "(по умолчанию tesseract из PATH)")
+    args = parser.parse_args(argv)
 
-        # Распознавание текста на русском языке
-        window_title_ru = "Завершение_Начатого_вики.png"  # Замените на заголовок окна с русским текстом
-        text_ru = recognize_text_from_window(window_title_ru, lang='rus')
+    source = DirectoryFrameSource(args.frames) if args.frames else WindowFrameSource(args.window)
+    with CaptureEngine(source, tesseract_cmd=args.tesseract) as engine:
+        while True:
+            print('Ищу текст...')
+            results = engine.process_next()
+            if results is None:
+                if args.frames:
+                    break
+            else:
+                for region, texts in results:
+                    # Вывод распознанного текста в консоль
+                    if texts['eng'].strip():
+                        print(f"Распознанный текст (английский) {region}: {texts['eng']}")
+                    if texts['rus'].strip():
+                        print(f"Распознанный текст (русский) {region}: {texts['rus']}")
+            if not args.frames:
+                sleep(args.interval)
 
-        # Вывод распознанного текста на русском в консоль
-        if text_ru:
-            print(f"Распознанный текст (русский): {text_ru}")
-        print('Ищу текст...')
-        sleep(5)
 
 if __name__ == "__main__":
     main()
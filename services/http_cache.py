@@ -0,0 +1,294 @@
+"""
+Модуль http_cache предоставляет общий дисковый кэш HTTP-ответов для запросов к Warframe.market и Warframe Wiki.
+
+Возможности:
+- время жизни (TTL) ответа задаётся правилами для каждого типа адресов;
+- устаревшие ответы перепроверяются условными запросами (ETag / Last-Modified), ответ 304 не скачивает тело заново;
+- тела ответов хранятся на диске по адресу содержимого (sha256), одинаковые тела хранятся один раз;
+- при превышении размера кэша удаляются давно не использованные записи (LRU).
+
+Включает:
+- HttpCache: Дисковый HTTP-кэш.
+- CachedResponse: Ответ, совместимый с requests.Response в части status_code, content, text, headers и json().
+- get_default_cache(): Возвращает общий для проекта экземпляр кэша.
+"""
+
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from services import metrics
+
+
+DEFAULT_CACHE_DIR = "cache/http"
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+# Правила времени жизни ответов (регулярное выражение по URL, TTL в секундах); применяется первое совпавшее
+DEFAULT_TTL_RULES = (
+    (r'api\.warframe\.market/v1/items/[^/]+/orders', 60),
+    (r'api\.warframe\.market/v1/items/[^/]+/statistics', 60 * 60),
+    (r'api\.warframe\.market/v1/items$', 6 * 60 * 60),
+    (r'fandom\.com/.*(Category|Категория):', 12 * 60 * 60),
+    (r'static\.wikia\.nocookie\.net', 30 * 24 * 60 * 60),
+    (r'fandom\.com/', 24 * 60 * 60),
+)
+DEFAULT_TTL = 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_body_hash ON entries (body_hash);
+"""
+
+
+class CachedResponse:
+    """
+    Ответ из кэша или из сети в формате, совместимом с requests.Response.
+
+    Поля:
+        url (str): Адрес запроса.
+        status_code (int): Код ответа.
+        content (bytes): Тело ответа.
+        headers (dict): Заголовки ответа.
+        from_cache (bool): True, если тело не скачивалось заново (свежая запись или ответ 304).
+    """
+
+    def __init__(self, url, status_code, content, headers, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    """
+    Дисковый HTTP-кэш с TTL, условной перепроверкой и вытеснением LRU.
+
+    Параметры:
+        cache_dir (str, optional): Папка кэша. По умолчанию DEFAULT_CACHE_DIR.
+        max_size (int, optional): Максимальный суммарный размер тел в байтах. По умолчанию DEFAULT_MAX_SIZE.
+        ttl_rules (tuple, optional): Правила времени жизни (регулярное выражение, TTL). По умолчанию DEFAULT_TTL_RULES.
+        default_ttl (int, optional): TTL для адресов без правила. По умолчанию DEFAULT_TTL.
+        session (requests.Session, optional): Сессия для запросов. По умолчанию создаётся новая.
+
+    Пример использования:
+        cache = HttpCache()
+        response = cache.get('https://api.warframe.market/v1/items', headers={'Language': 'en'})
+        if response.status_code == 200:
+            items = response.json()['payload']['items']
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE, ttl_rules=DEFAULT_TTL_RULES,
+                 default_ttl=DEFAULT_TTL, session=None):
+        self.cache_dir = cache_dir
+        self.bodies_dir = os.path.join(cache_dir, "bodies")
+        self.max_size = max_size
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in ttl_rules]
+        self.default_ttl = default_ttl
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def ttl_for(self, url):
+        """
+        Возвращает время жизни ответа для указанного адреса.
+        """
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def _key(url, headers):
+        # Заголовки запроса (язык, платформа) влияют на ответ, поэтому входят в ключ
+        raw = url + "\n" + json.dumps(sorted((headers or {}).items()))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.bodies_dir, body_hash[:2], body_hash)
+
+    def _read_body(self, body_hash):
+        try:
+            with open(self._body_path(body_hash), 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_body(self, content):
+        """
+        Сохраняет тело ответа под его sha256. Вызывается под блокировкой вместе со вставкой записи,
+        иначе _evict другого потока мог бы удалить общее тело между записью файла и вставкой строки.
+        """
+        body_hash = hashlib.sha256(content).hexdigest()
+        path = self._body_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as file:
+                file.write(content)
+            os.replace(temp_path, path)
+        return body_hash
+
+    def get(self, url, headers=None, ttl=None, timeout=30):
+        """
+        Выполняет GET-запрос через кэш.
+
+        Свежая запись возвращается без обращения к сети. Устаревшая запись перепроверяется
+        условным запросом; при ответе 304 используется сохранённое тело. Если сеть недоступна,
+        возвращается устаревшая запись.
+
+        Параметры:
+            url (str): Адрес запроса.
+            headers (dict, optional): Заголовки запроса. По умолчанию None.
+            ttl (int, optional): Время жизни ответа в секундах. По умолчанию по правилам ttl_rules.
+            timeout (float, optional): Таймаут запроса в секундах. По умолчанию 30.
+
+        Возвращает:
+            CachedResponse: Ответ. Неуспешные ответы (кроме 304) не кэшируются.
+        """
+        key = self._key(url, headers)
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT body_hash, etag, last_modified, headers, expires_at FROM entries WHERE key = ?",
+                (key,)).fetchone()
+
+        cached_body = self._read_body(row[0]) if row else None
+        if cached_body is not None:
+            body_hash, etag, last_modified, cached_headers, expires_at = row
+            if now < expires_at:
+                self._touch(key, now)
+                metrics.inc('http_cache_requests_total', result='hit')
+                return CachedResponse(url, 200, cached_body, json.loads(cached_headers), from_cache=True)
+        else:
+            etag = last_modified = None
+
+        request_headers = dict(headers or {})
+        if etag:
+            request_headers['If-None-Match'] = etag
+        if last_modified:
+            request_headers['If-Modified-Since'] = last_modified
+
+        try:
+            with metrics.timer('http_request_seconds', host=urlsplit(url).hostname):
+                response = self.session.get(url, headers=request_headers, timeout=timeout)
+        except requests.RequestException:
+            if cached_body is None:
+                raise
+            metrics.inc('http_cache_requests_total', result='stale')
+            return CachedResponse(url, 200, cached_body, json.loads(row[3]), from_cache=True)
+
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        if response.status_code == 304 and cached_body is not None:
+            metrics.inc('http_cache_requests_total', result='revalidated')
+            with self._lock, self.connection:
+                self.connection.execute(
+                    "UPDATE entries SET expires_at = ?, last_access = ? WHERE key = ?", (now + ttl, now, key))
+            return CachedResponse(url, 200, cached_body, json.loads(row[3]), from_cache=True)
+
+        if response.status_code != 200:
+            return CachedResponse(url, response.status_code, response.content, dict(response.headers),
+                                  from_cache=False)
+
+        content = response.content
+        metrics.inc('http_cache_requests_total', result='miss')
+        metrics.inc('http_response_bytes_total', len(content), host=urlsplit(url).hostname)
+        response_headers = {name: value for name, value in response.headers.items()
+                            if name.lower() in ('content-type', 'etag', 'last-modified')}
+        with self._lock, self.connection:
+            body_hash = self._write_body(content)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, body_hash, size, etag, last_modified, headers, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body_hash, len(content), response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), json.dumps(response_headers), now + ttl, now))
+            self._evict()
+        return CachedResponse(url, 200, content, response_headers, from_cache=False)
+
+    def _touch(self, key, now):
+        with self._lock, self.connection:
+            self.connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+
+    def _evict(self):
+        """
+        Удаляет давно не использованные записи, пока размер кэша превышает max_size.
+        Вызывается под блокировкой внутри транзакции.
+        """
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        for key, body_hash, size in self.connection.execute(
+                "SELECT key, body_hash, size FROM entries ORDER BY last_access").fetchall():
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            still_used = self.connection.execute(
+                "SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone()
+            if not still_used:
+                try:
+                    os.remove(self._body_path(body_hash))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        """
+        Полностью очищает кэш.
+        """
+        with self._lock, self.connection:
+            hashes = [row[0] for row in self.connection.execute("SELECT DISTINCT body_hash FROM entries")]
+            self.connection.execute("DELETE FROM entries")
+            for body_hash in hashes:
+                try:
+                    os.remove(self._body_path(body_hash))
+                except FileNotFoundError:
+                    pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Возвращает общий для проекта экземпляр HttpCache, создавая его при первом обращении.
+
+    Папку кэша можно переопределить переменной окружения WFI_HTTP_CACHE_DIR.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache(os.environ.get("WFI_HTTP_CACHE_DIR", DEFAULT_CACHE_DIR))
+        return _default_cache
@@ -0,0 +1,188 @@
+"""
+Модуль image_dataset готовит изображения модов для обучения автокодировщика.
+
+Изображения один раз параллельно приводятся к размеру 128x128 и сохраняются как uint8
+в файл, отображаемый в память (numpy.memmap). Обучение читает пакеты прямо из этого файла
+через tf.data с параллельной обработкой, перемешиванием и предварительной выборкой,
+поэтому расход памяти не растёт вместе с набором изображений, а декодирование
+не повторяется при каждом запуске.
+
+Включает функции:
+- read_image_list(data_file): Читает файл разметки с путями к изображениям и названиями модов.
+- build_image_cache(image_paths, cache_path, ...): Создаёт (или переиспользует) memmap-кэш изображений.
+- load_image_cache(cache_path): Открывает memmap-кэш только для чтения.
+- to_model_input(images): Переводит изображения uint8 во входной масштаб модели.
+- make_dataset(images, indices, ...): Создаёт tf.data.Dataset для обучения автокодировщика.
+"""
+
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+
+IMAGE_SIZE = (128, 128)
+DEFAULT_CACHE_PATH = "cache/mod_images_128.npy"
+
+# Множитель пикселей на входе модели. Поставляемый autoencoder_model.keras обучен на пикселях 0–255,
+# поэтому обучение, индекс изображений и инференс подают модели значения именно в этом масштабе.
+# При переобучении в другом масштабе (например, 1 / 255) константа меняется вместе с моделью.
+PIXEL_SCALE = 1.0
+
+
+def read_image_list(data_file="mod_images_list.txt"):
+    """
+    Читает файл разметки, где в каждой строке путь к изображению и название мода.
+
+    Разделителем служит табуляция (так пишет training_data.main) или четыре пробела.
+
+    Параметры:
+        data_file (str, optional): Путь к файлу разметки. По умолчанию "mod_images_list.txt".
+
+    Возвращает:
+        tuple: (список путей к изображениям, список названий модов).
+    """
+    image_paths = []
+    text_labels = []
+    with open(data_file, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            image_path, label = re.split(r"\t| {4}", line, maxsplit=1)
+            image_paths.append(image_path)
+            text_labels.append(label)
+    return image_paths, text_labels
+
+
+def _cache_meta_path(cache_path):
+    return cache_path + ".json"
+
+
+def _sources_signature(image_paths):
+    return [[path, os.path.getmtime(path), os.path.getsize(path)] for path in image_paths]
+
+
+def _load_resized(path, size):
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB").resize(size, Image.BILINEAR), dtype=np.uint8)
+
+
+def build_image_cache(image_paths, cache_path=DEFAULT_CACHE_PATH, size=IMAGE_SIZE, max_workers=None):
+    """
+    Создаёт memmap-кэш изображений размером size в формате uint8.
+
+    Изображения декодируются и масштабируются в пуле потоков и сразу пишутся в файл кэша,
+    поэтому в памяти одновременно находятся лишь несколько изображений. Если список файлов
+    и их время изменения не поменялись, используется существующий кэш.
+
+    Параметры:
+        image_paths (list): Пути к изображениям.
+        cache_path (str, optional): Путь к файлу кэша. По умолчанию DEFAULT_CACHE_PATH.
+        size (tuple, optional): Размер изображений (ширина, высота). По умолчанию IMAGE_SIZE.
+        max_workers (int, optional): Количество потоков. По умолчанию по числу процессоров.
+
+    Возвращает:
+        np.memmap: Массив формы (N, высота, ширина, 3) только для чтения.
+    """
+    signature = {"size": list(size), "sources": _sources_signature(image_paths)}
+    meta_path = _cache_meta_path(cache_path)
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as file:
+            if json.load(file) == signature:
+                return load_image_cache(cache_path)
+
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    shape = (len(image_paths), size[1], size[0], 3)
+    temp_path = cache_path + ".tmp"
+    images = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.uint8, shape=shape)
+
+    def load(index):
+        images[index] = _load_resized(image_paths[index], size)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        # list() пробрасывает исключения из потоков
+        list(executor.map(load, range(len(image_paths))))
+
+    images.flush()
+    del images
+    os.replace(temp_path, cache_path)
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(signature, file)
+    return load_image_cache(cache_path)
+
+
+def load_image_cache(cache_path=DEFAULT_CACHE_PATH):
+    """
+    Открывает memmap-кэш изображений только для чтения.
+
+    Возвращает:
+        np.memmap: Массив формы (N, высота, ширина, 3) типа uint8.
+    """
+    return np.load(cache_path, mmap_mode="r")
+
+
+def split_indices(count, validation_split=0.2, seed=42):
+    """
+    Случайно делит номера изображений на обучающую и проверочную выборки.
+
+    Возвращает:
+        tuple: (номера для обучения, номера для проверки).
+    """
+    indices = np.random.default_rng(seed).permutation(count)
+    validation_count = int(count * validation_split)
+    return np.sort(indices[validation_count:]), np.sort(indices[:validation_count])
+
+
+def to_model_input(images):
+    """
+    Переводит изображения uint8 во входной формат модели.
+
+    Возвращает:
+        np.ndarray: Массив float32, умноженный на PIXEL_SCALE.
+    """
+    return np.asarray(images, dtype=np.float32) * PIXEL_SCALE
+
+
+def make_dataset(images, indices, batch_size=32, shuffle_buffer=1024, training=True):
+    """
+    Создаёт tf.data.Dataset пар (изображение, изображение) для обучения автокодировщика.
+
+    Номера изображений перемешиваются и группируются в пакеты, пакет целиком читается
+    из memmap одним обращением, затем параллельно переводится в float32 в масштабе PIXEL_SCALE;
+    следующий пакет готовится, пока обучается текущий.
+
+    Параметры:
+        images (np.memmap): Кэш изображений из build_image_cache.
+        indices (np.ndarray): Номера изображений, входящих в выборку.
+        batch_size (int, optional): Размер пакета. По умолчанию 32.
+        shuffle_buffer (int, optional): Размер буфера перемешивания. По умолчанию 1024.
+        training (bool, optional): Перемешивать ли выборку каждую эпоху. По умолчанию True.
+
+    Возвращает:
+        tf.data.Dataset: Набор данных.
+    """
+    import tensorflow as tf
+
+    height, width, channels = images.shape[1:]
+
+    def read_batch(batch_indices):
+        # Упорядоченные номера читаются из memmap последовательно, без лишних переходов по диску
+        return np.asarray(images[np.sort(batch_indices)])
+
+    def load_batch(batch_indices):
+        batch = tf.numpy_function(read_batch, [batch_indices], tf.uint8)
+        batch.set_shape((None, height, width, channels))
+        batch = tf.cast(batch, tf.float32) * PIXEL_SCALE
+        return batch, batch
+
+    dataset = tf.data.Dataset.from_tensor_slices(np.asarray(indices, dtype=np.int64))
+    if training:
+        dataset = dataset.shuffle(min(shuffle_buffer, len(indices)), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(load_batch, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not training)
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,198 @@
+"""
+Модуль image_index распознаёт моды по изображению карточки с помощью обученного автокодировщика.
+
+Кодировщик (первая половина autoencoder_model.keras) переводит каждое эталонное изображение
+из папки mod_images в вектор признаков. Векторы нормируются и хранятся одной матрицей,
+поэтому поиск ближайших соседей для пакета фрагментов скриншота — это одно матричное
+умножение (косинусное сходство) и выбор top-k через numpy.argpartition.
+
+Если сходство лучшего кандидата ниже порога, результат не возвращается, и вызывающий код
+может перейти к распознаванию текста через Tesseract.
+
+Включает:
+- load_encoder(model_path): Загружает модель и выделяет из неё кодировщик.
+- ImageIndex: Индекс векторов эталонных изображений.
+"""
+
+
+import os
+
+import numpy as np
+from PIL import Image
+
+from services.image_dataset import IMAGE_SIZE, PIXEL_SCALE, build_image_cache, to_model_input
+
+
+DEFAULT_MODEL_PATH = "autoencoder_model.keras"
+DEFAULT_INDEX_PATH = "cache/mod_image_index.npz"
+
+
+def load_encoder(model_path=DEFAULT_MODEL_PATH):
+    """
+    Загружает автокодировщик и возвращает его кодирующую часть.
+
+    Выходом кодировщика считается слой с наименьшим по размеру выходом (узкое место сети).
+
+    Параметры:
+        model_path (str, optional): Путь к модели. По умолчанию DEFAULT_MODEL_PATH.
+
+    Возвращает:
+        tf.keras.Model: Модель, переводящая изображения 128x128x3 в карты признаков.
+    """
+    import tensorflow as tf
+
+    autoencoder = tf.keras.models.load_model(model_path)
+    bottleneck = min(autoencoder.layers[1:], key=lambda layer: int(np.prod(layer.output.shape[1:])))
+    return tf.keras.Model(autoencoder.input, bottleneck.output)
+
+
+def _normalize(vectors):
+    vectors = vectors.reshape(len(vectors), -1).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def prepare_images(images, size=IMAGE_SIZE):
+    """
+    Приводит изображения (PIL.Image или массивы RGB) к входному формату кодировщика.
+
+    Возвращает:
+        np.ndarray: Массив формы (N, высота, ширина, 3) типа float32 в масштабе PIXEL_SCALE.
+    """
+    batch = np.empty((len(images), size[1], size[0], 3), dtype=np.float32)
+    for index, image in enumerate(images):
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(np.asarray(image, dtype=np.uint8))
+        batch[index] = np.asarray(image.convert("RGB").resize(size, Image.BILINEAR), dtype=np.float32)
+    return batch * PIXEL_SCALE
+
+
+class ImageIndex:
+    """
+    Индекс ближайших соседей по векторам изображений модов (плоский, косинусное сходство).
+
+    Параметры:
+        embeddings (np.ndarray): Нормированные векторы эталонных изображений, форма (N, D).
+        labels (list): Названия модов по строкам embeddings.
+        encoder (tf.keras.Model, optional): Кодировщик для запросов по изображениям. По умолчанию загружается
+                                            из DEFAULT_MODEL_PATH при первом обращении.
+
+    Пример использования:
+        index = ImageIndex.load_or_build(image_paths, labels)
+        for matches in index.recognize([crop_1, crop_2]):
+            print(matches[0] if matches else "Не распознано — переходим к OCR")
+    """
+
+    def __init__(self, embeddings, labels, encoder=None):
+        self.embeddings = embeddings
+        self.labels = list(labels)
+        self._encoder = encoder
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = load_encoder()
+        return self._encoder
+
+    def encode(self, batch, batch_size=64):
+        """
+        Переводит подготовленные изображения (см. prepare_images) в нормированные векторы.
+        """
+        features = self.encoder.predict(batch, batch_size=batch_size, verbose=0)
+        return _normalize(features)
+
+    @classmethod
+    def build(cls, image_paths, labels, encoder=None, batch_size=64):
+        """
+        Строит индекс по эталонным изображениям.
+
+        Параметры:
+            image_paths (list): Пути к изображениям модов.
+            labels (list): Названия модов.
+            encoder (tf.keras.Model, optional): Кодировщик. По умолчанию загружается из DEFAULT_MODEL_PATH.
+            batch_size (int, optional): Размер пакета при кодировании. По умолчанию 64.
+
+        Возвращает:
+            ImageIndex: Построенный индекс.
+        """
+        index = cls(np.empty((0, 0), dtype=np.float32), labels, encoder)
+        images = build_image_cache(image_paths)
+        parts = []
+        for start in range(0, len(images), batch_size):
+            batch = to_model_input(images[start:start + batch_size])
+            parts.append(index.encode(batch, batch_size=batch_size))
+        index.embeddings = np.concatenate(parts) if parts else index.embeddings
+        return index
+
+    @classmethod
+    def load_or_build(cls, image_paths, labels, index_path=DEFAULT_INDEX_PATH, model_path=DEFAULT_MODEL_PATH):
+        """
+        Загружает сохранённый индекс или строит его заново, если изменилась модель или набор изображений.
+
+        Возвращает:
+            ImageIndex: Индекс.
+        """
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(model_path):
+            index = cls.load(index_path)
+            if index.labels == list(labels):
+                return index
+
+        index = cls.build(image_paths, labels, encoder=load_encoder(model_path))
+        index.save(index_path)
+        return index
+
+    def save(self, index_path=DEFAULT_INDEX_PATH):
+        """
+        Сохраняет векторы и названия в файл .npz.
+        """
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        temp_path = index_path + ".tmp.npz"
+        np.savez(temp_path, embeddings=self.embeddings, labels=np.array(self.labels))
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path=DEFAULT_INDEX_PATH, encoder=None):
+        """
+        Загружает индекс из файла .npz.
+        """
+        with np.load(index_path) as data:
+            return cls(data["embeddings"], data["labels"].tolist(), encoder)
+
+    def search(self, queries, k=5):
+        """
+        Находит k ближайших эталонов для каждого вектора запроса.
+
+        Параметры:
+            queries (np.ndarray): Нормированные векторы запросов, форма (M, D).
+            k (int, optional): Количество соседей. По умолчанию 5.
+
+        Возвращает:
+            tuple: (номера эталонов формы (M, k), косинусное сходство формы (M, k)), по убыванию сходства.
+        """
+        k = min(k, len(self.embeddings))
+        scores = queries @ self.embeddings.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def recognize(self, images, k=3, min_score=0.9):
+        """
+        Распознаёт моды на фрагментах скриншота.
+
+        Параметры:
+            images (list): Фрагменты (PIL.Image или массивы RGB) с карточками модов.
+            k (int, optional): Количество кандидатов на фрагмент. По умолчанию 3.
+            min_score (float, optional): Минимальное косинусное сходство. По умолчанию 0.9.
+
+        Возвращает:
+            list: Для каждого фрагмента список пар (название мода, сходство); пустой, если уверенного совпадения нет.
+        """
+        if not len(images):
+            return []
+        queries = self.encode(prepare_images(images))
+        indices, scores = self.search(queries, k=k)
+        return [
+            [(self.labels[i], float(score)) for i, score in zip(row_indices, row_scores) if score >= min_score]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
@@ -0,0 +1,396 @@
+"""
+Модуль inference выполняет автокодировщик на CPU без загрузки полного TensorFlow при каждом запуске.
+
+Модель один раз экспортируется в TFLite (при желании — с квантованием int8, откалиброванным
+на изображениях из mod_images), после чего для выполнения достаточно лёгкого интерпретатора:
+ai-edge-litert или tflite-runtime, а если их нет — tf.lite из TensorFlow. Интерпретатор
+создаётся один раз с фиксированным размером пакета, входные данные режутся на пакеты
+(последний дополняется до полного), а MicroBatcher собирает одиночные запросы из разных потоков
+в пакеты, чтобы не выполнять модель на каждое изображение отдельно.
+
+TFLiteModel.predict совместим с keras.Model.predict, поэтому экспортированный кодировщик можно
+передать в ImageIndex(encoder=...).
+
+Включает:
+- calibration_images(): Выборка изображений mod_images для калибровки int8.
+- export_tflite(model_path, ...): Экспорт модели (или только кодировщика) в TFLite.
+- TFLiteModel: Загруженная один раз модель TFLite с пакетным выполнением.
+- MicroBatcher: Сборка одиночных запросов из разных потоков в пакеты.
+- benchmark(model_path, ...): Сравнение задержки и пропускной способности с Keras predict.
+
+Пример запуска:
+    python -m services.inference export --int8 --encoder
+    python -m services.inference bench --batch-size 32
+"""
+
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from services.image_dataset import build_image_cache, read_image_list, to_model_input
+
+
+DEFAULT_MODEL_PATH = "autoencoder_model.keras"
+DEFAULT_IMAGE_LIST = "mod_images_list.txt"
+DEFAULT_EXPORT_DIR = "cache"
+
+
+def _export_path(model_path, quantize, encoder_only, export_dir=DEFAULT_EXPORT_DIR):
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    suffix = ('_encoder' if encoder_only else '') + ('_int8' if quantize else '')
+    return os.path.join(export_dir, f"{name}{suffix}.tflite")
+
+
+def _interpreter_class():
+    """
+    Возвращает класс интерпретатора TFLite, начиная с самых лёгких пакетов.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def calibration_images(data_file=DEFAULT_IMAGE_LIST, limit=200, seed=42):
+    """
+    Выбирает изображения из mod_images для калибровки квантования.
+
+    Используется тот же список и тот же memmap-кэш, что и при обучении, поэтому изображения
+    повторно не декодируются.
+
+    Параметры:
+        data_file (str, optional): Файл разметки изображений. По умолчанию DEFAULT_IMAGE_LIST.
+        limit (int, optional): Максимальное количество изображений. По умолчанию 200.
+        seed (int, optional): Зерно случайной выборки. По умолчанию 42.
+
+    Возвращает:
+        np.ndarray: Изображения формы (N, 128, 128, 3) типа uint8.
+    """
+    image_paths, _ = read_image_list(data_file)
+    if not image_paths:
+        raise FileNotFoundError(f"В {data_file} нет изображений для калибровки")
+    images = build_image_cache(image_paths)
+    rng = np.random.default_rng(seed)
+    indices = np.sort(rng.choice(len(images), size=min(limit, len(images)), replace=False))
+    return np.asarray(images[indices])
+
+
+def export_tflite(model_path=DEFAULT_MODEL_PATH, output_path=None, quantize=False, encoder_only=False,
+                  calibration=None):
+    """
+    Экспортирует модель Keras в TFLite. Требует TensorFlow.
+
+    Параметры:
+        model_path (str, optional): Путь к модели Keras. По умолчанию DEFAULT_MODEL_PATH.
+        output_path (str, optional): Путь к файлу .tflite. По умолчанию в папке cache.
+        quantize (bool, optional): Квантовать веса и активации в int8 (вход и выход остаются float32).
+                                   По умолчанию False.
+        encoder_only (bool, optional): Экспортировать только кодировщик (для ImageIndex). По умолчанию False.
+        calibration (np.ndarray, optional): Изображения uint8 для калибровки. По умолчанию calibration_images().
+
+    Возвращает:
+        str: Путь к файлу .tflite. Если файл уже новее модели, экспорт не выполняется.
+    """
+    output_path = output_path or _export_path(model_path, quantize, encoder_only)
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(model_path):
+        return output_path
+
+    import tensorflow as tf
+
+    if encoder_only:
+        from services.image_index import load_encoder
+        model = load_encoder(model_path)
+    else:
+        model = tf.keras.models.load_model(model_path)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        samples = calibration_images() if calibration is None else calibration
+
+        def representative_dataset():
+            for image in samples:
+                # Калибровка на том же масштабе входа, что и при обучении модели
+                yield [to_model_input(image[np.newaxis])]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    content = converter.convert()
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(content)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class TFLiteModel:
+    """
+    Модель TFLite с фиксированным размером пакета.
+
+    Параметры:
+        path (str): Путь к файлу .tflite.
+        batch_size (int, optional): Размер пакета интерпретатора. По умолчанию 32.
+        num_threads (int, optional): Количество потоков CPU. По умолчанию по числу ядер.
+
+    Пример использования:
+        model = TFLiteModel(export_tflite(quantize=True, encoder_only=True))
+        index = ImageIndex.load(encoder=model)
+    """
+
+    def __init__(self, path, batch_size=32, num_threads=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.interpreter = _interpreter_class()(model_path=path, num_threads=num_threads or os.cpu_count())
+        input_details = self.interpreter.get_input_details()[0]
+        self.input_shape = tuple(input_details['shape'][1:])
+        self.interpreter.resize_tensor_input(input_details['index'], [batch_size, *self.input_shape])
+        self.interpreter.allocate_tensors()
+        # Интерпретатор нельзя вызывать из нескольких потоков одновременно
+        self._lock = threading.Lock()
+
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+
+    @staticmethod
+    def _quantize(values, details):
+        scale, zero_point = details['quantization']
+        if details['dtype'] in (np.int8, np.uint8) and scale:
+            info = np.iinfo(details['dtype'])
+            return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(details['dtype'])
+        return values.astype(details['dtype'])
+
+    @staticmethod
+    def _dequantize(values, details):
+        scale, zero_point = details['quantization']
+        if details['dtype'] in (np.int8, np.uint8) and scale:
+            return (values.astype(np.float32) - zero_point) * scale
+        return values
+
+    def _run_batch(self, batch):
+        count = len(batch)
+        if count < self.batch_size:
+            padded = np.zeros((self.batch_size, *batch.shape[1:]), dtype=batch.dtype)
+            padded[:count] = batch
+            batch = padded
+        with self._lock:
+            self.interpreter.set_tensor(self._input['index'], self._quantize(batch, self._input))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output['index'])
+        return self._dequantize(output, self._output)[:count]
+
+    def predict(self, images, batch_size=None, verbose=0):
+        """
+        Выполняет модель на изображениях (совместимо с keras.Model.predict).
+
+        Параметры:
+            images (np.ndarray): Изображения (N, 128, 128, 3): uint8 или float32, уже переведённые
+                                 во входной масштаб модели (см. image_dataset.to_model_input).
+            batch_size, verbose: Игнорируются, оставлены для совместимости с Keras.
+
+        Возвращает:
+            np.ndarray: Выход модели для каждого изображения.
+        """
+        images = np.asarray(images)
+        if images.dtype == np.uint8:
+            images = to_model_input(images)
+        outputs = [self._run_batch(images[start:start + self.batch_size])
+                   for start in range(0, len(images), self.batch_size)]
+        if not outputs:
+            return np.empty((0, *self._output['shape'][1:]), dtype=np.float32)
+        return np.concatenate(outputs)
+
+
+class MicroBatcher:
+    """
+    Собирает одиночные запросы из разных потоков в пакеты.
+
+    Фоновый поток ждёт первый запрос, затем до max_delay секунд добирает остальные
+    (но не больше max_batch) и выполняет модель одним вызовом.
+
+    Параметры:
+        model: Модель с методом predict (TFLiteModel или keras.Model).
+        max_batch (int, optional): Максимальный размер пакета. По умолчанию 32.
+        max_delay (float, optional): Сколько ждать добора пакета в секундах. По умолчанию 0.005.
+
+    Пример использования:
+        with MicroBatcher(TFLiteModel(path)) as batcher:
+            embedding = batcher.predict(crop)
+    """
+
+    def __init__(self, model, max_batch=32, max_delay=0.005):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='wfi-micro-batcher', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, image):
+        """
+        Ставит изображение в очередь.
+
+        Возвращает:
+            concurrent.futures.Future: Будущий результат модели для этого изображения.
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher закрыт")
+            self._pending.append((np.asarray(image), future))
+            self._condition.notify()
+        return future
+
+    def predict(self, image, timeout=None):
+        """
+        Выполняет модель на одном изображении и ждёт результат.
+        """
+        return self.submit(image).result(timeout)
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _run(self):
+        while (batch := self._take_batch()) is not None:
+            try:
+                outputs = self.model.predict(np.stack([image for image, _ in batch]), verbose=0)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def close(self):
+        """
+        Выполняет оставшиеся запросы и останавливает фоновый поток.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+def _measure(predict, images, batch_size, repeat, predict_single=None):
+    # Задержку одного изображения можно мерить отдельной моделью, например TFLite с пакетом 1:
+    # интерпретатор с пакетом batch_size дополнял бы каждое изображение нулями до полного пакета
+    predict_single = predict_single or predict
+    predict(images[:batch_size])  # прогрев
+    predict_single(images[:1])
+    single = []
+    for image in images[:repeat]:
+        started = time.perf_counter()
+        predict_single(image[np.newaxis])
+        single.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(max(1, repeat // 10)):
+        predict(images)
+    elapsed = (time.perf_counter() - started) / max(1, repeat // 10)
+    return {
+        'latency_p50_ms': float(np.percentile(single, 50) * 1000),
+        'latency_p95_ms': float(np.percentile(single, 95) * 1000),
+        'throughput': len(images) / elapsed,
+    }
+
+
+def benchmark(model_path=DEFAULT_MODEL_PATH, images=None, batch_size=32, repeat=50, encoder_only=False):
+    """
+    Сравнивает Keras predict, TFLite float32 и TFLite int8 по задержке одного изображения
+    и пропускной способности на пакетах. Требует TensorFlow (для Keras и экспорта).
+    Задержка TFLite измеряется на интерпретаторе с пакетом 1, пропускная способность — с пакетом batch_size.
+
+    Параметры:
+        model_path (str, optional): Путь к модели Keras. По умолчанию DEFAULT_MODEL_PATH.
+        images (np.ndarray, optional): Изображения uint8. По умолчанию calibration_images(limit=256).
+        batch_size (int, optional): Размер пакета. По умолчанию 32.
+        repeat (int, optional): Количество замеров задержки. По умолчанию 50.
+        encoder_only (bool, optional): Сравнивать только кодировщик. По умолчанию False.
+
+    Возвращает:
+        dict: {вариант: {'latency_p50_ms', 'latency_p95_ms', 'throughput', 'load_s'}}.
+    """
+    import tensorflow as tf
+
+    images = calibration_images(limit=256) if images is None else images
+    results = {}
+
+    started = time.perf_counter()
+    if encoder_only:
+        from services.image_index import load_encoder
+        keras_model = load_encoder(model_path)
+    else:
+        keras_model = tf.keras.models.load_model(model_path)
+    load_s = time.perf_counter() - started
+    floats = to_model_input(images)
+    results['keras'] = _measure(lambda batch: keras_model.predict(batch, batch_size=batch_size, verbose=0),
+                                floats, batch_size, repeat)
+    results['keras']['load_s'] = load_s
+
+    for name, quantize in (('tflite_float32', False), ('tflite_int8', True)):
+        path = export_tflite(model_path, quantize=quantize, encoder_only=encoder_only, calibration=images)
+        started = time.perf_counter()
+        model = TFLiteModel(path, batch_size=batch_size)
+        load_s = time.perf_counter() - started
+        single_model = TFLiteModel(path, batch_size=1)
+        results[name] = _measure(model.predict, images, batch_size, repeat, predict_single=single_model.predict)
+        results[name]['load_s'] = load_s
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Выполнение автокодировщика на CPU через TFLite")
+    parser.add_argument('command', choices=('export', 'bench'), help="export — экспорт в TFLite, bench — сравнение")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help="путь к модели Keras")
+    parser.add_argument('--int8', action='store_true', help="квантовать в int8 (для export)")
+    parser.add_argument('--encoder', action='store_true', help="только кодировщик")
+    parser.add_argument('--batch-size', type=int, default=32, help="размер пакета (по умолчанию 32)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        print(export_tflite(args.model, quantize=args.int8, encoder_only=args.encoder))
+        return
+
+    results = benchmark(args.model, batch_size=args.batch_size, encoder_only=args.encoder)
+    print(f"{'вариант':<16}{'загрузка, с':>12}{'p50, мс':>10}{'p95, мс':>10}{'изобр./с':>12}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['load_s']:>12.2f}{result['latency_p50_ms']:>10.2f}"
+              f"{result['latency_p95_ms']:>10.2f}{result['throughput']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Модуль market_json разбирает ответы Warframe.market, оставляя только поля, нужные для анализа.
+
+Ответ /items/{url_name}/orders содержит для каждого заказа полный профиль продавца (аватар,
+репутация, регион, время последнего визита и т.д.), а /items — ссылки на изображения и прочие
+поля, которые проекту не нужны. Здесь из каждого заказа остаются id, platinum, quantity,
+order_type, platform, last_update и user.status, а из предмета — id, url_name, item_name,
+а также tags и ducats, если они есть.
+Повторяющиеся строки (типы заказов, платформы) интернируются, а вложенный словарь user
+для каждого статуса создаётся один раз и разделяется между заказами, поэтому сокращённые
+записи занимают в несколько раз меньше памяти.
+
+Байты разбираются orjson, если он установлен, иначе стандартным json. Потоки (например,
+response.raw) при установленном ijson разбираются по мере чтения, без загрузки всего ответа
+и полного дерева объектов в память.
+
+Включает:
+- decode_orders(source): Сокращённые заказы из ответа /items/{url_name}/orders.
+- decode_items(source): Сокращённые предметы из ответа /items.
+- decode_statistics(source): Ряды закрытых сделок из ответа /items/{url_name}/statistics.
+"""
+
+
+import json
+import sys
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+ORDER_FIELDS = ('id', 'platinum', 'quantity', 'order_type', 'platform', 'last_update')
+ITEM_FIELDS = ('id', 'url_name', 'item_name')
+OPTIONAL_ITEM_FIELDS = ('tags', 'ducats')
+STATISTICS_FIELDS = ('datetime', 'volume', 'min_price', 'max_price', 'open_price', 'closed_price',
+                     'avg_price', 'median', 'mod_rank')
+
+# Общие словари user для каждого статуса; сокращённые заказы не должны их изменять
+_USERS = {}
+
+
+def _shared_user(status):
+    user = _USERS.get(status)
+    if user is None:
+        user = _USERS.setdefault(status, {'status': status})
+    return user
+
+
+def slim_order(order):
+    """
+    Оставляет в заказе только поля, нужные для анализа.
+
+    Параметры:
+        order (dict): Заказ из ответа Warframe.market.
+
+    Возвращает:
+        dict: {'id', 'platinum', 'quantity', 'order_type', 'platform', 'last_update', 'user': {'status'}}.
+    """
+    user = order.get('user') or {}
+    return {
+        'id': order.get('id'),
+        'platinum': order['platinum'],
+        'quantity': order['quantity'],
+        'order_type': sys.intern(order['order_type']),
+        'platform': sys.intern(order.get('platform') or ''),
+        'last_update': order['last_update'],
+        'user': _shared_user(user.get('status')),
+    }
+
+
+def slim_item(item):
+    """
+    Оставляет в предмете только поля ITEM_FIELDS, а также OPTIONAL_ITEM_FIELDS (если они есть).
+    """
+    slim = {field: item[field] for field in ITEM_FIELDS}
+    for field in OPTIONAL_ITEM_FIELDS:
+        if field in item:
+            slim[field] = item[field]
+    return slim
+
+
+def _decode(source, prefix, key, slim):
+    if isinstance(source, (bytes, bytearray, memoryview, str)):
+        return [slim(record) for record in _loads(source)['payload'][key]]
+    if ijson is not None:
+        # Поток разбирается по одному объекту: полный ответ в памяти не собирается
+        return [slim(record) for record in ijson.items(source, prefix, use_float=True)]
+    return [slim(record) for record in _loads(source.read())['payload'][key]]
+
+
+def decode_orders(source):
+    """
+    Разбирает ответ /items/{url_name}/orders в сокращённые заказы.
+
+    Параметры:
+        source (bytes | str | file-like): Тело ответа или поток с ним (например, response.raw).
+
+    Возвращает:
+        list: Список сокращённых заказов (см. slim_order).
+    """
+    return _decode(source, 'payload.orders.item', 'orders', slim_order)
+
+
+def decode_items(source):
+    """
+    Разбирает ответ /items в сокращённые предметы.
+
+    Параметры:
+        source (bytes | str | file-like): Тело ответа или поток с ним.
+
+    Возвращает:
+        list: Список сокращённых предметов (см. slim_item).
+    """
+    return _decode(source, 'payload.items.item', 'items', slim_item)
+
+
+def slim_statistics_row(row):
+    """
+    Оставляет в строке статистики поля STATISTICS_FIELDS; mod_rank равен None для предметов без рангов.
+    """
+    return {field: row.get(field) for field in STATISTICS_FIELDS}
+
+
+def decode_statistics(source):
+    """
+    Разбирает ответ /items/{url_name}/statistics, оставляя только закрытые сделки.
+
+    Параметры:
+        source (bytes | str | file-like): Тело ответа или поток с ним.
+
+    Возвращает:
+        dict: {'48hours': почасовые строки, '90days': дневные строки} (см. slim_statistics_row).
+    """
+    if not isinstance(source, (bytes, bytearray, memoryview, str)):
+        source = source.read()
+    closed = _loads(source)['payload'].get('statistics_closed', {})
+    return {period: [slim_statistics_row(row) for row in closed.get(period, ())] for period in ('48hours', '90days')}
@@ -0,0 +1,130 @@
+"""
+Модуль market_service отдаёт сводку цен предметов для асинхронных обработчиков бота.
+
+Одновременные запросы одного и того же предмета (например, сотни пользователей, спрашивающих
+"Mirage Prime Systems" после выпадения) объединяются в одну загрузку с Warframe.market
+(single-flight), а проанализированный результат хранится в кэше с коротким временем жизни.
+Поэтому всплеск пользователей не умножает количество обращений к API.
+
+Включает:
+- MarketPriceService: Асинхронный сервис сводок цен.
+- resolve_url_name(query, catalog, matcher): Находит url_name предмета по названию от пользователя.
+"""
+
+
+from services.business_logic import analyze_orders
+from services.utils import AsyncRateLimiter, SingleFlight, TTLCache
+from services.warframe_market_api import REQUESTS_PER_SECOND, get_item_orders_async
+
+
+DEFAULT_MARKET_URL = 'https://api.warframe.market/v1'
+
+
+class MarketPriceService:
+    """
+    Асинхронный сервис сводок цен с объединением одинаковых запросов и кэшем результатов.
+
+    Параметры:
+        base_url (str, optional): Базовый URL Warframe.market API (можно указать локальную заглушку).
+                                  По умолчанию DEFAULT_MARKET_URL.
+        cookie_auth (str, optional): Значение Cookie_Auth. По умолчанию 'seefalert'.
+        ttl (float, optional): Время жизни сводки в кэше в секундах. По умолчанию 60.
+        rate (float, optional): Максимальная частота запросов к API. По умолчанию REQUESTS_PER_SECOND.
+
+    Пример использования:
+        service = MarketPriceService()
+        summary = await service.get_summary('mirage_prime_systems')
+        print(summary['sell']['min_platinum'])
+        await service.close()
+    """
+
+    def __init__(self, base_url=DEFAULT_MARKET_URL, cookie_auth='seefalert', ttl=60, rate=REQUESTS_PER_SECOND):
+        self.base_url = base_url
+        self.cookie_auth = cookie_auth
+        self.cache = TTLCache(ttl)
+        self.flight = SingleFlight()
+        self.limiter = AsyncRateLimiter(rate)
+        self.upstream_requests = 0
+        self._session = None
+
+    async def _get_session(self):
+        # aiohttp нужен только при загрузке; resolve_url_name импортируется без него
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        return self._session
+
+    async def close(self):
+        """
+        Закрывает HTTP-сессию.
+        """
+        if self._session is not None:
+            await self._session.close()
+
+    async def _fetch_summary(self, url_name, platform):
+        await self.limiter.acquire()
+        self.upstream_requests += 1
+        session = await self._get_session()
+        orders = await get_item_orders_async(session, self.base_url, url_name, self.cookie_auth,
+                                             language='en', platform=platform)
+        if orders is None:
+            return None
+
+        summary = {
+            'sell': analyze_orders(orders, status='ingame', order_type='sell', current_year_only=False),
+            'buy': analyze_orders(orders, status='ingame', order_type='buy', current_year_only=False),
+        }
+        self.cache.set((url_name, platform), summary)
+        return summary
+
+    async def get_summary(self, url_name, platform='pc'):
+        """
+        Возвращает сводку цен предмета по заказам игроков, находящихся в игре.
+
+        Параметры:
+            url_name (str): Уникальное имя предмета в формате URL.
+            platform (str, optional): Платформа. По умолчанию 'pc'.
+
+        Возвращает:
+            dict | None: Словарь {'sell': статистика analyze_orders, 'buy': статистика analyze_orders}
+                         или None, если загрузить заказы не удалось.
+        """
+        key = (url_name, platform)
+        summary = self.cache.get(key)
+        if summary is not None:
+            return summary
+        return await self.flight.do(key, lambda: self._fetch_summary(url_name, platform))
+
+
+def resolve_url_name(query, catalog=None, matcher=None):
+    """
+    Находит url_name предмета по названию, введённому пользователем, на английском или русском.
+
+    Сначала ищется точное совпадение в каталоге, затем — ближайшее название через NameMatcher.
+    Без каталога url_name строится из английского названия по правилу Warframe.market.
+
+    Параметры:
+        query (str): Название предмета.
+        catalog (Catalog, optional): Каталог предметов. По умолчанию None.
+        matcher (NameMatcher, optional): Индекс нечёткого поиска названий. По умолчанию None.
+
+    Возвращает:
+        str | None: url_name или None, если предмет не найден.
+    """
+    query = query.strip()
+    if not query:
+        return None
+
+    # Точное название NameMatcher вернёт первым с оценкой 1.0, опечатки исправит на ближайшее название
+    names = [match.name for match in matcher.match(query, limit=1)] if matcher is not None else []
+    names.append(query)
+
+    for name in names:
+        if catalog is not None:
+            url_name = catalog.url_name_for(name)
+            if url_name:
+                return url_name
+        elif name.isascii():
+            return name.lower().replace(' ', '_').replace('&', 'and')
+    return None
@@ -0,0 +1,321 @@
+"""
+Модуль metrics собирает лёгкие метрики горячих путей: счётчики и гистограммы времени.
+
+По умолчанию сбор выключен, и каждый вызов сводится к проверке одного флага, поэтому
+инструментирование не замедляет код в обычной работе. Включается переменной окружения
+WFI_METRICS=1 или вызовом enable(). Собранные данные выгружаются в текстовом формате
+Prometheus (to_prometheus) или снимком JSON (snapshot, save_snapshot).
+
+Для поиска узких мест внутри функций есть выборочный профилировщик (SamplingProfiler): фоновый
+поток периодически снимает стеки всех потоков. Переменная окружения WFI_PROFILE=путь
+запускает его при импорте модуля и сохраняет стеки в свёрнутом формате (для flamegraph)
+при завершении процесса.
+
+Включает:
+- inc(name, value, **labels): Увеличивает счётчик.
+- observe(name, value, **labels): Добавляет значение в гистограмму.
+- timer(name, **labels): Контекстный менеджер, измеряющий время блока.
+- timed(name, **labels): Декоратор, измеряющий время вызова функции.
+- snapshot(), to_prometheus(), save_snapshot(path): Выгрузка метрик.
+- SamplingProfiler: Выборочный профилировщик.
+"""
+
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+
+# Границы гистограмм времени в секундах: от разбора JSON до медленного сетевого запроса
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PREFIX = 'wfi_'
+
+_enabled = os.environ.get('WFI_METRICS', '') not in ('', '0')
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def enabled():
+    """
+    Возвращает True, если сбор метрик включён.
+    """
+    return _enabled
+
+
+def enable(flag=True):
+    """
+    Включает или выключает сбор метрик.
+    """
+    global _enabled
+    _enabled = flag
+
+
+def reset():
+    """
+    Очищает все собранные метрики.
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def inc(name, value=1, **labels):
+    """
+    Увеличивает счётчик.
+
+    Параметры:
+        name (str): Имя метрики, например 'http_response_bytes_total'.
+        value (float, optional): Величина приращения. По умолчанию 1.
+        **labels: Метки метрики, например endpoint='orders'.
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    """
+    Добавляет значение в гистограмму.
+
+    Параметры:
+        name (str): Имя метрики, например 'http_request_seconds'.
+        value (float): Наблюдаемое значение.
+        buckets (tuple, optional): Верхние границы корзин. По умолчанию DEFAULT_BUCKETS.
+        **labels: Метки метрики.
+    """
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = {'buckets': buckets, 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        for index, bound in enumerate(histogram['buckets']):
+            if value <= bound:
+                histogram['counts'][index] += 1
+                break
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+
+class _Timer:
+    __slots__ = ('name', 'labels', 'started')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """
+    Возвращает контекстный менеджер, записывающий время выполнения блока в гистограмму name.
+
+    Пример использования:
+        with metrics.timer('json_parse_seconds', endpoint='orders'):
+            data = response.json()
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name, **labels):
+    """
+    Декоратор, записывающий время выполнения функции в гистограмму name.
+
+    Пример использования:
+        @metrics.timed('analysis_seconds', function='analyze_orders')
+        def analyze_orders(...): ...
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started, **labels)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Возвращает снимок всех метрик.
+
+    Возвращает:
+        dict: {'timestamp', 'counters': [{'name', 'labels', 'value'}],
+               'histograms': [{'name', 'labels', 'buckets': {граница: накопленное количество}, 'sum', 'count'}]}.
+    """
+    with _lock:
+        counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = []
+        for (name, labels), histogram in sorted(_histograms.items(), key=lambda item: item[0]):
+            cumulative, buckets = 0, {}
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets['+Inf'] = histogram['count']
+            histograms.append({'name': name, 'labels': dict(labels), 'buckets': buckets,
+                               'sum': histogram['sum'], 'count': histogram['count']})
+    return {'timestamp': time.time(), 'counters': counters, 'histograms': histograms}
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels.items()) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+def to_prometheus():
+    """
+    Возвращает метрики в текстовом формате Prometheus (exposition format 0.0.4).
+    """
+    data = snapshot()
+    lines = []
+    declared = set()
+    for counter in data['counters']:
+        name = PREFIX + counter['name']
+        if name not in declared:
+            lines.append(f"# TYPE {name} counter")
+            declared.add(name)
+        lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+    for histogram in data['histograms']:
+        name = PREFIX + histogram['name']
+        if name not in declared:
+            lines.append(f"# TYPE {name} histogram")
+            declared.add(name)
+        for bound, count in histogram['buckets'].items():
+            lines.append(f"{name}_bucket{_format_labels(histogram['labels'], ('le', bound))} {count}")
+        lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def save_snapshot(path, format='json'):
+    """
+    Сохраняет метрики в файл.
+
+    Параметры:
+        path (str): Путь к файлу.
+        format (str, optional): 'json' или 'prometheus'. По умолчанию 'json'.
+    """
+    content = to_prometheus() if format == 'prometheus' else json.dumps(snapshot(), ensure_ascii=False, indent=2)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик: фоновый поток раз в interval секунд снимает стеки всех потоков
+    и считает, сколько раз встретился каждый стек.
+
+    Параметры:
+        interval (float, optional): Пауза между выборками в секундах. По умолчанию 0.005.
+
+    Пример использования:
+        with SamplingProfiler() as profiler:
+            update_all_files()
+        for stack, count in profiler.top(10):
+            print(count, stack)
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='wfi-sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def top(self, limit=20):
+        """
+        Возвращает самые частые стеки.
+
+        Возвращает:
+            list: Пары (стек, количество выборок) по убыванию количества.
+        """
+        return self.samples.most_common(limit)
+
+    def save_collapsed(self, path):
+        """
+        Сохраняет стеки в свёрнутом формате ("функция;функция количество") для flamegraph.pl и speedscope.
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+if os.environ.get('WFI_PROFILE'):
+    _profiler = SamplingProfiler()
+    _profiler.start()
+
+    @atexit.register
+    def _save_profile():
+        _profiler.stop()
+        _profiler.save_collapsed(os.environ['WFI_PROFILE'])
@@ -0,0 +1,223 @@
+"""
+Модуль name_matcher сопоставляет зашумлённые строки OCR с названиями предметов и модов.
+
+Индекс строится один раз по файлам из папки other_from_game (на английском и русском языках)
+и сохраняется на диск. Поиск идёт по инвертированному индексу триграмм: количество общих
+триграмм со всеми названиями считается одним вызовом numpy.bincount, а кандидаты
+ранжируются по коэффициенту Дайса.
+
+Включает:
+- NameMatcher: Индекс нечёткого поиска названий.
+- Match: Результат поиска (название, язык, оценка сходства).
+- normalize_name(text): Приводит строку к виду, в котором хранится индекс.
+"""
+
+
+import os
+import pickle
+import re
+from collections import namedtuple
+
+import numpy as np
+
+
+DEFAULT_SOURCES = (
+    ("other_from_game/items_en", "en"),
+    ("other_from_game/mods_en", "en"),
+    ("other_from_game/items_ru", "ru"),
+    ("other_from_game/mods_ru", "ru"),
+)
+DEFAULT_INDEX_PATH = "cache/name_matcher.pkl"
+
+Match = namedtuple("Match", ["name", "language", "score"])
+
+# Частые ошибки распознавания и символы, не встречающиеся в названиях
+_OCR_REPLACEMENTS = str.maketrans({'|': 'l', 'ё': 'е', '’': "'", '`': "'"})
+_NOT_NAME_CHARS = re.compile(r"[^\w' &-]+")
+_SPACES = re.compile(r"\s+")
+_CYRILLIC = re.compile(r"[а-я]")
+_LATIN = re.compile(r"[a-z]")
+# Латинские буквы, которые OCR путает с похожими кириллическими в русском тексте
+_LATIN_TO_CYRILLIC = str.maketrans('aceopxykmhtb', 'асеорхукмнтв')
+
+
+def normalize_name(text):
+    """
+    Приводит строку к нижнему регистру, исправляет частые ошибки OCR и убирает лишние символы.
+
+    Параметры:
+        text (str): Исходная строка.
+
+    Возвращает:
+        str: Нормализованная строка.
+    """
+    text = text.casefold().translate(_OCR_REPLACEMENTS)
+    text = _NOT_NAME_CHARS.sub(' ', text)
+    if len(_CYRILLIC.findall(text)) > len(_LATIN.findall(text)):
+        text = text.translate(_LATIN_TO_CYRILLIC)
+    return _SPACES.sub(' ', text).strip()
+
+
+def _trigrams(normalized):
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    Индекс нечёткого поиска названий предметов и модов на двух языках.
+
+    Параметры:
+        names (list): Пары (название, язык).
+
+    Пример использования:
+        matcher = NameMatcher.load_or_build()
+        print(matcher.match("Mirage Pnme Systerns"))
+        for line, matches in matcher.match_lines(recognize_text_from_window(window_title)):
+            print(line, "->", matches[0].name if matches else None)
+    """
+
+    def __init__(self, names):
+        unique = dict.fromkeys((name, language) for name, language in names if name)
+        self.names = [name for name, _ in unique]
+        self.languages = [language for _, language in unique]
+        self.language_array = np.array(self.languages)
+        self.normalized = [normalize_name(name) for name in self.names]
+
+        # Точные совпадения после нормализации находятся без поиска по индексу
+        self.exact = {}
+        for index, normalized in enumerate(self.normalized):
+            self.exact.setdefault(normalized, []).append(index)
+
+        postings = {}
+        lengths = np.empty(len(self.names), dtype=np.int32)
+        for index, normalized in enumerate(self.normalized):
+            grams = _trigrams(normalized)
+            lengths[index] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.lengths = lengths
+
+    @classmethod
+    def from_files(cls, sources=DEFAULT_SOURCES):
+        """
+        Строит индекс по текстовым файлам с названиями (по одному названию в строке).
+
+        Параметры:
+            sources (tuple, optional): Пары (путь к файлу, язык). По умолчанию DEFAULT_SOURCES.
+
+        Возвращает:
+            NameMatcher: Построенный индекс.
+        """
+        names = []
+        for path, language in sources:
+            with open(path, 'r', encoding='utf-8') as file:
+                names.extend((line.strip(), language) for line in file)
+        return cls(names)
+
+    @classmethod
+    def load_or_build(cls, index_path=DEFAULT_INDEX_PATH, sources=DEFAULT_SOURCES):
+        """
+        Загружает сохранённый индекс или строит его заново, если файлы с названиями изменились.
+
+        Параметры:
+            index_path (str, optional): Путь к файлу индекса. По умолчанию DEFAULT_INDEX_PATH.
+            sources (tuple, optional): Пары (путь к файлу, язык). По умолчанию DEFAULT_SOURCES.
+
+        Возвращает:
+            NameMatcher: Индекс.
+        """
+        newest_source = max(os.path.getmtime(path) for path, _ in sources)
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= newest_source:
+            with open(index_path, 'rb') as file:
+                return pickle.load(file)
+
+        matcher = cls.from_files(sources)
+        matcher.save(index_path)
+        return matcher
+
+    def save(self, index_path=DEFAULT_INDEX_PATH):
+        """
+        Сохраняет индекс на диск.
+        """
+        os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+
+    def match(self, text, limit=3, min_score=0.4, language=None):
+        """
+        Находит названия, наиболее похожие на строку.
+
+        Параметры:
+            text (str): Строка, распознанная OCR.
+            limit (int, optional): Максимальное количество результатов. По умолчанию 3.
+            min_score (float, optional): Минимальный коэффициент сходства (0..1). По умолчанию 0.4.
+            language (str, optional): Искать только среди названий на языке 'en' или 'ru'. По умолчанию None.
+
+        Возвращает:
+            list: Список Match, отсортированный по убыванию сходства.
+        """
+        normalized = normalize_name(text)
+        if not normalized:
+            return []
+
+        exact = [index for index in self.exact.get(normalized, ())
+                 if language is None or self.languages[index] == language]
+        if exact:
+            return [Match(self.names[index], self.languages[index], 1.0) for index in exact[:limit]]
+
+        grams = _trigrams(normalized)
+        hits = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not hits:
+            return []
+
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        candidates = np.flatnonzero(counts)
+        scores = 2.0 * counts[candidates] / (len(grams) + self.lengths[candidates])
+
+        if language is not None:
+            keep = self.language_array[candidates] == language
+            candidates, scores = candidates[keep], scores[keep]
+
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+
+        order = np.argsort(-scores, kind='stable')
+        return [Match(self.names[candidates[i]], self.languages[candidates[i]], float(scores[i])) for i in order]
+
+    def match_lines(self, text, limit=3, min_score=0.4, min_length=3, language=None):
+        """
+        Сопоставляет с названиями каждую строку текста с экрана.
+
+        Параметры:
+            text (str | list): Текст, распознанный OCR, или список строк.
+            limit (int, optional): Максимальное количество результатов на строку. По умолчанию 3.
+            min_score (float, optional): Минимальный коэффициент сходства. По умолчанию 0.4.
+            min_length (int, optional): Строки короче этого числа символов пропускаются. По умолчанию 3.
+            language (str, optional): Искать только среди названий на указанном языке. По умолчанию None.
+
+        Возвращает:
+            list: Пары (строка, список Match) для строк, у которых нашлись совпадения.
+        """
+        if text is None:
+            return []
+        lines = text.splitlines() if isinstance(text, str) else text
+
+        results = []
+        seen = {}
+        for line in lines:
+            line = line.strip()
+            if len(line) < min_length:
+                continue
+            # Повторяющиеся строки на одном экране ищем один раз
+            if line not in seen:
+                seen[line] = self.match(line, limit=limit, min_score=min_score, language=language)
+            if seen[line]:
+                results.append((line, seen[line]))
+        return results
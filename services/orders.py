@@ -0,0 +1,219 @@
+"""
+Модуль orders содержит компактное представление заказов Warframe.market.
+
+Вместо списка вложенных словарей заказы предмета хранятся в OrderBook — наборе типизированных
+массивов NumPy: цена, количество, коды статуса, типа заказа и платформы (int8) и время
+последнего обновления в Unix time. На заказ уходит около 50 байт вместо сотен байт у словаря,
+поэтому в памяти помещаются книги заказов всего каталога, а analyze_orders получает готовые
+столбцы без повторного разбора.
+
+Для существующего кода OrderBook ведёт себя как список заказов: элементы — объекты Order
+с __slots__, которые поддерживают обращение как к словарю (order['platinum'],
+order['user']['status'], order.get('id')), а last_update отдают в формате ISO.
+
+Включает:
+- Order: Один заказ.
+- OrderBook: Заказы одного предмета в столбцовом виде.
+"""
+
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.business_logic import ORDER_TYPE_CODES, STATUS_CODES, UNKNOWN_CODE, OrderArrays, orders_to_arrays
+
+
+PLATFORM_CODES = {'pc': 0, 'ps4': 1, 'xbox': 2, 'switch': 3}
+
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+ORDER_TYPE_NAMES = {code: name for name, code in ORDER_TYPE_CODES.items()}
+PLATFORM_NAMES = {code: name for name, code in PLATFORM_CODES.items()}
+
+# Словари user для обращения order['user']['status'], по одному на статус
+_USERS = {code: {'status': name} for code, name in STATUS_NAMES.items()}
+_USERS[UNKNOWN_CODE] = {'status': None}
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000+00:00')
+
+
+class Order:
+    """
+    Один заказ с целочисленными кодами вместо строк.
+
+    Поддерживает обращение как к словарю заказа Warframe.market: order['platinum'],
+    order['order_type'], order['user']['status'], order['last_update'] (строка ISO), order.get('id').
+    """
+
+    __slots__ = ('id', 'platinum', 'quantity', 'status_code', 'order_type_code', 'platform_code', 'timestamp')
+
+    def __init__(self, id, platinum, quantity, status_code, order_type_code, platform_code, timestamp):
+        self.id = id
+        self.platinum = platinum
+        self.quantity = quantity
+        self.status_code = status_code
+        self.order_type_code = order_type_code
+        self.platform_code = platform_code
+        self.timestamp = timestamp
+
+    @property
+    def status(self):
+        return STATUS_NAMES.get(self.status_code)
+
+    @property
+    def order_type(self):
+        return ORDER_TYPE_NAMES.get(self.order_type_code)
+
+    @property
+    def platform(self):
+        return PLATFORM_NAMES.get(self.platform_code)
+
+    @property
+    def last_update(self):
+        return _iso(self.timestamp)
+
+    @property
+    def user(self):
+        return _USERS.get(self.status_code, _USERS[UNKNOWN_CODE])
+
+    _KEYS = ('id', 'platinum', 'quantity', 'order_type', 'platform', 'last_update', 'user')
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def keys(self):
+        return self._KEYS
+
+    def to_dict(self):
+        """
+        Возвращает заказ в виде словаря Warframe.market (с копией словаря user).
+        """
+        return {key: dict(self.user) if key == 'user' else getattr(self, key) for key in self._KEYS}
+
+    def __eq__(self, other):
+        if not isinstance(other, Order):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"Order(id={self.id!r}, platinum={self.platinum}, quantity={self.quantity}, "
+                f"order_type={self.order_type!r}, status={self.status!r}, last_update={self.last_update!r})")
+
+
+class OrderBook:
+    """
+    Заказы одного предмета в столбцовом виде.
+
+    Ведёт себя как список Order: поддерживает len(), итерацию и индексацию. Столбцы доступны
+    напрямую: ids, platinum, quantity, status, order_type, platform, last_update.
+
+    Пример использования:
+        book = OrderBook.from_records(decode_orders(response.content))
+        cheapest = book.platinum[book.order_type == ORDER_TYPE_CODES['sell']].min()
+        stats = analyze_orders(book, status='ingame', order_type='sell')
+    """
+
+    __slots__ = ('ids', 'platinum', 'quantity', 'status', 'order_type', 'platform', 'last_update')
+
+    def __init__(self, ids, platinum, quantity, status, order_type, platform, last_update):
+        self.ids = ids
+        self.platinum = platinum
+        self.quantity = quantity
+        self.status = status
+        self.order_type = order_type
+        self.platform = platform
+        self.last_update = last_update
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Собирает книгу заказов из словарей заказов (полных или сокращённых).
+
+        Параметры:
+            records (list): Заказы в формате Warframe.market.
+
+        Возвращает:
+            OrderBook: Книга заказов.
+        """
+        if isinstance(records, OrderBook):
+            return records
+        arrays = orders_to_arrays(records)
+        count = len(records)
+        return cls(
+            ids=np.array([(record.get('id') or '').encode('ascii') for record in records], dtype=np.bytes_),
+            platinum=arrays.platinum,
+            quantity=arrays.quantity,
+            status=arrays.status,
+            order_type=arrays.order_type,
+            platform=np.fromiter((PLATFORM_CODES.get(record.get('platform'), UNKNOWN_CODE) for record in records),
+                                 dtype=np.int8, count=count),
+            last_update=arrays.last_update,
+        )
+
+    def to_arrays(self, item_name=None):
+        """
+        Возвращает столбцы книги как OrderArrays без копирования (используется orders_to_arrays).
+        """
+        return OrderArrays(
+            platinum=self.platinum,
+            quantity=self.quantity,
+            status=self.status,
+            order_type=self.order_type,
+            last_update=self.last_update,
+            item=np.zeros(len(self), dtype=np.int32),
+            item_names=[item_name],
+        )
+
+    def to_dicts(self):
+        """
+        Возвращает заказы списком словарей в формате Warframe.market.
+        """
+        return [order.to_dict() for order in self]
+
+    def _order(self, index):
+        platinum = self.platinum[index]
+        return Order(
+            id=self.ids[index].decode('ascii') or None,
+            platinum=int(platinum) if platinum.is_integer() else float(platinum),
+            quantity=int(self.quantity[index]),
+            status_code=int(self.status[index]),
+            order_type_code=int(self.order_type[index]),
+            platform_code=int(self.platform[index]),
+            timestamp=int(self.last_update[index]),
+        )
+
+    def __len__(self):
+        return len(self.platinum)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._order(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return OrderBook(*(getattr(self, name)[index] for name in self.__slots__))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._order(index)
+
+    def __repr__(self):
+        return f"OrderBook({len(self)} orders)"
+
+    @property
+    def nbytes(self):
+        """
+        Объём памяти, занятый столбцами, в байтах.
+        """
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
@@ -0,0 +1,278 @@
+"""
+Модуль utils содержит вспомогательные инструменты, общие для сервисов проекта.
+
+Включает:
+- RateLimiter: Ограничитель частоты запросов по алгоритму "token bucket".
+- atomic_write_bytes(path, content): Атомарно перезаписывает файл, только если содержимое изменилось.
+- atomic_write_lines(path, lines): То же для текстового файла из списка строк.
+- StageTimer: Замер длительности этапов конвейера.
+- AsyncRateLimiter: Ограничитель частоты запросов для asyncio.
+- SingleFlight: Объединение одновременных одинаковых асинхронных запросов в один.
+- TTLCache: Кэш результатов с ограниченным временем жизни.
+"""
+
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class RateLimiter:
+    """
+    Потокобезопасный ограничитель частоты запросов (token bucket).
+
+    Ведро вмещает `capacity` токенов и пополняется со скоростью `rate` токенов в секунду.
+    Каждый запрос забирает один токен; если токенов нет, вызывающий поток ждёт.
+
+    Параметры:
+        rate (float): Количество запросов в секунду.
+        capacity (int, optional): Размер ведра (допустимый всплеск). По умолчанию равен rate.
+
+    Пример использования:
+        limiter = RateLimiter(rate=3)
+        for url in urls:
+            limiter.acquire()
+            requests.get(url)
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate должен быть положительным числом")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """
+        Забирает токены из ведра, при необходимости ожидая их пополнения.
+
+        Параметры:
+            tokens (float, optional): Количество забираемых токенов. По умолчанию 1.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, tokens=1):
+        """
+        Пытается забрать токены без ожидания.
+
+        Возвращает:
+            bool: True, если токены получены.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+
+def atomic_write_bytes(path, content):
+    """
+    Атомарно записывает байты в файл.
+
+    Содержимое сначала пишется во временный файл в той же папке, который затем
+    заменяет целевой через os.replace, поэтому сбой посреди записи не оставляет
+    полузаписанный файл. Если содержимое не изменилось, файл не трогается.
+
+    Параметры:
+        path (str): Путь к файлу.
+        content (bytes): Новое содержимое файла.
+
+    Возвращает:
+        bool: True, если файл был перезаписан.
+    """
+    mode = 0o644
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == content:
+                return False
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return True
+
+
+def atomic_write_lines(path, lines):
+    """
+    Атомарно записывает строки в текстовый файл (по одной строке на элемент) в UTF-8.
+
+    Параметры:
+        path (str): Путь к файлу.
+        lines (iterable): Строки для записи.
+
+    Возвращает:
+        bool: True, если файл был перезаписан.
+    """
+    return atomic_write_bytes(path, ''.join(line + '\n' for line in lines).encode('utf-8'))
+
+
+class StageTimer:
+    """
+    Замеряет длительность именованных этапов. Этапы могут выполняться в разных потоках.
+
+    Пример использования:
+        timer = StageTimer()
+        with timer.stage("items_en"):
+            items_en = get_items_list(cookie_auth, language='en')
+        print(timer.report())
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.durations[name] = self.durations.get(name, 0.0) + elapsed
+
+    def report(self):
+        """
+        Возвращает отчёт о длительности этапов в виде строк "этап: N.NN с".
+        """
+        return '\n'.join(f"{name}: {seconds:.2f} с" for name, seconds in self.durations.items())
+
+
+class AsyncRateLimiter:
+    """
+    Ограничитель частоты запросов (token bucket) для asyncio.
+
+    Параметры:
+        rate (float): Количество запросов в секунду.
+        capacity (int, optional): Размер ведра (допустимый всплеск). По умолчанию равен rate.
+
+    Пример использования:
+        limiter = AsyncRateLimiter(rate=3)
+        await limiter.acquire()
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate должен быть положительным числом")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Забирает токен из ведра, при необходимости ожидая его пополнения.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные асинхронные запросы с одинаковым ключом в один вызов.
+
+    Пока запрос по ключу выполняется, остальные вызывающие ждут его результат, а не
+    запускают свой. Отмена одного из ожидающих не отменяет общий запрос.
+
+    Пример использования:
+        flight = SingleFlight()
+        orders = await flight.do(url_name, lambda: fetch_orders(url_name))
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, factory):
+        """
+        Возвращает результат корутины factory() — общий для всех одновременных вызовов с ключом key.
+
+        Параметры:
+            key: Ключ запроса.
+            factory (callable): Функция без аргументов, возвращающая корутину.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+
+class TTLCache:
+    """
+    Кэш значений с ограниченным временем жизни и размером (вытесняются самые старые записи).
+
+    Параметры:
+        ttl (float): Время жизни записи в секундах.
+        max_size (int, optional): Максимальное количество записей. По умолчанию 10000.
+    """
+
+    def __init__(self, ttl, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Возвращает значение по ключу или default, если записи нет или она устарела.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key, value):
+        """
+        Сохраняет значение.
+        """
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
@@ -5,15 +5,35 @@
 - get_items_list: Получает список предметов из Warframe.market API.
 - login: Аутентифицирует пользователя на Warframe.market API.
 - get_item_orders: Получает список заказов для указанного предмета с Warframe.market API.
+- create_session: Создаёт HTTP-сессию с пулом keep-alive соединений.
+- get_items_orders_bulk: Параллельно загружает заказы для множества предметов с учётом лимита API.
+- get_items_statistics_bulk: Параллельно загружает статистику закрытых сделок для множества предметов.
+- get_item_orders_async: Асинхронно получает список заказов для предмета (aiohttp).
 """
 
 
-from config_data.config import load_config
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from services import metrics
+from services.http_cache import get_default_cache
+from services.market_json import decode_items, decode_orders, decode_statistics
+from services.orders import OrderBook
+from services.utils import RateLimiter
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+# Warframe.market допускает не более 3 запросов в секунду с одного клиента
+REQUESTS_PER_SECOND = 3
+# Коды ответов, при которых запрос имеет смысл повторить
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
-def get_items_list(cookie_auth, language='ru', platform='pc'):
+def get_items_list(cookie_auth, language='ru', platform='pc', cache=None):
     """
     Получает список предметов с Warframe.market API и возвращает его.
 
@@ -21,9 +41,10 @@ def get_items_list(cookie_auth, language='ru', platform='pc'):
         cookie_auth (str): Значение Cookie_Auth для аутентификации запросов.
         language (str, optional): Язык запроса. По умолчанию 'ru'.
         platform (str, optional): Платформа для фильтрации предметов. По умолчанию 'pc'.
+        cache (HttpCache, optional): Кэш HTTP-ответов. По умолчанию общий кэш get_default_cache().
 
     Возвращает:
-        list: Список словарей с информацией о предметах.
+        list: Список словарей с информацией о предметах (только id, url_name, item_name и tags, см. decode_items).
 
     Пример использования:
         cookie_auth = 'seefalert'
@@ -41,11 +62,11 @@ def get_items_list(cookie_auth, language='ru', platform='pc'):
     }
     url = 'https://api.warframe.market/v1'
     endpoint = '/items'
-    response = requests.get(url + endpoint, headers=headers)
+    response = (cache or get_default_cache()).get(url + endpoint, headers=headers)
 
     if response.status_code == 200:
-        data = response.json()
-        items_list = data['payload']['items']
+        with metrics.timer('json_parse_seconds', endpoint='items'):
+            items_list = decode_items(response.content)
 
         # Сортируем список предметов по алфавиту по полю 'item_name'
         items_list.sort(key=lambda item: item['item_name'])
@@ -107,7 +128,8 @@ def get_item_orders(url, url_name, cookie_auth, language='ru', platform='pc'):
         platform (str, optional): Платформа для фильтрации заказов. По умолчанию 'pc'.
 
     Возвращает:
-        list: Список словарей с данными о заказах для указанного предмета.
+        OrderBook: Заказы предмета в компактном виде. Ведёт себя как список заказов,
+                   к которым можно обращаться как к словарям (order['platinum'], order['user']['status']).
 
     Пример использования:
         base_url = 'https://api.warframe.market/v1'
@@ -128,16 +150,230 @@ def get_item_orders(url, url_name, cookie_auth, language='ru', platform='pc'):
         'Platform': platform
     }
 
-    response = requests.get(url + endpoint, headers=headers)
+    with metrics.timer('http_request_seconds', endpoint='orders'):
+        response = requests.get(url + endpoint, headers=headers, stream=True, timeout=30)
 
-    if response.status_code == 200:
-        data = response.json()
-        return data['payload']['orders']
-    else:
+    with response:
+        if response.status_code != 200:
+            return None
+        # Тело разбирается прямо из потока, без копии всего ответа в памяти
+        response.raw.decode_content = True
+        with metrics.timer('json_parse_seconds', endpoint='orders'):
+            orders = OrderBook.from_records(decode_orders(response.raw))
+        metrics.inc('http_response_bytes_total', response.raw.tell(), endpoint='orders')
+        return orders
+
+
+def create_session(pool_size=10):
+    """
+    Создаёт HTTP-сессию с пулом keep-alive соединений.
+
+    Параметры:
+        pool_size (int, optional): Максимальное количество одновременно открытых соединений. По умолчанию 10.
+
+    Возвращает:
+        requests.Session: Сессия, которую можно безопасно использовать из нескольких потоков для GET-запросов.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _fetch_with_retry(session, limiter, url, headers, max_retries, backoff, decode, endpoint):
+    """
+    Выполняет GET-запрос, повторяя его при ответах 429/5xx и сетевых ошибках.
+
+    Между попытками выдерживается экспоненциальная пауза с небольшим случайным разбросом;
+    если сервер прислал заголовок Retry-After, используется он.
+
+    Параметры:
+        decode (callable): Функция, переводящая тело успешного ответа в результат.
+        endpoint (str): Имя конечной точки для метрик.
+
+    Возвращает:
+        Результат decode или None, если все попытки исчерпаны.
+    """
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        if attempt:
+            metrics.inc('http_retries_total', endpoint=endpoint)
+        try:
+            with metrics.timer('http_request_seconds', endpoint=endpoint):
+                response = session.get(url, headers=headers, timeout=30)
+        except requests.RequestException:
+            metrics.inc('http_errors_total', endpoint=endpoint)
+            response = None
+
+        if response is not None:
+            metrics.inc('http_responses_total', endpoint=endpoint, status=response.status_code)
+            metrics.inc('http_response_bytes_total', len(response.content), endpoint=endpoint)
+            if response.status_code == 200:
+                with metrics.timer('json_parse_seconds', endpoint=endpoint):
+                    return decode(response.content)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return None
+
+        if attempt == max_retries:
+            break
+
+        delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+
+    return None
+
+
+def _decode_order_book(content):
+    return OrderBook.from_records(decode_orders(content))
+
+
+def _bulk_fetch(url, url_names, resource, decode, cookie_auth, language, platform,
+                rate, max_workers, max_retries, backoff, session):
+    """
+    Параллельно загружает ресурс /items/{url_name}/{resource} для множества предметов.
+
+    Возвращает:
+        generator: Пары (url_name, результат decode или None) в порядке завершения запросов.
+    """
+    headers = {
+        'Cookie_Auth': cookie_auth,
+        'Language': language,
+        'Platform': platform
+    }
+    # Убираем повторы, сохраняя порядок
+    url_names = list(dict.fromkeys(url_names))
+    limiter = RateLimiter(rate)
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max_workers)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_fetch_with_retry, session, limiter, f'{url}/items/{url_name}/{resource}',
+                            headers, max_retries, backoff, decode, resource): url_name
+            for url_name in url_names
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Если генератор закрыли досрочно, не дожидаемся оставшихся запросов: ещё не начатые отменяются,
+        # а выполняющиеся завершатся в фоне, и их результаты (или ошибки закрытой сессии) никто не прочитает
+        executor.shutdown(wait=False, cancel_futures=True)
+        if own_session:
+            session.close()
+
+
+def get_items_orders_bulk(url, url_names, cookie_auth, language='ru', platform='pc',
+                          rate=REQUESTS_PER_SECOND, max_workers=8, max_retries=4, backoff=0.5, session=None):
+    """
+    Параллельно загружает заказы для множества предметов с Warframe.market API.
+
+    Запросы выполняются в пуле потоков через общую сессию с keep-alive соединениями,
+    а общий ограничитель (token bucket) не даёт превысить допустимую частоту запросов.
+    Ответы 429 и 5xx повторяются с экспоненциальной паузой. Результаты отдаются по мере готовности,
+    поэтому обновление всего каталога упирается в квоту API, а не в задержку каждого запроса.
+
+    Параметры:
+        url (str): Базовый URL для запросов к Warframe.market API.
+        url_names (iterable): Уникальные имена предметов в формате URL.
+        cookie_auth (str): Значение Cookie_Auth для аутентификации запросов.
+        language (str, optional): Язык запроса. По умолчанию 'ru'.
+        platform (str, optional): Платформа для фильтрации заказов. По умолчанию 'pc'.
+        rate (float, optional): Максимальное количество запросов в секунду. По умолчанию REQUESTS_PER_SECOND.
+        max_workers (int, optional): Количество потоков. По умолчанию 8.
+        max_retries (int, optional): Количество повторов при ошибках 429/5xx. По умолчанию 4.
+        backoff (float, optional): Базовая пауза между повторами в секундах. По умолчанию 0.5.
+        session (requests.Session, optional): Готовая сессия. По умолчанию создаётся новая.
+
+    Возвращает:
+        generator: Пары (url_name, OrderBook или None) в порядке завершения запросов.
+
+    Пример использования:
+        base_url = 'https://api.warframe.market/v1'
+        url_names = ['mirage_prime_systems', 'mirage_prime_chassis']
+        for url_name, orders in get_items_orders_bulk(base_url, url_names, 'seefalert', language='en'):
+            if orders is not None:
+                print(f"{url_name}: {len(orders)} заказов")
+    """
+    yield from _bulk_fetch(url, url_names, 'orders', _decode_order_book, cookie_auth, language, platform,
+                           rate, max_workers, max_retries, backoff, session)
+
+
+def get_items_statistics_bulk(url, url_names, cookie_auth, language='ru', platform='pc',
+                              rate=REQUESTS_PER_SECOND, max_workers=8, max_retries=4, backoff=0.5, session=None):
+    """
+    Параллельно загружает статистику закрытых сделок (/items/{url_name}/statistics) для множества предметов.
+
+    Параметры те же, что у get_items_orders_bulk.
+
+    Возвращает:
+        generator: Пары (url_name, словарь рядов или None) в порядке завершения запросов,
+                   формат словаря — см. decode_statistics.
+
+    Пример использования:
+        for url_name, statistics in get_items_statistics_bulk(base_url, url_names, 'seefalert'):
+            if statistics is not None:
+                print(url_name, len(statistics['90days']))
+    """
+    yield from _bulk_fetch(url, url_names, 'statistics', decode_statistics, cookie_auth, language, platform,
+                           rate, max_workers, max_retries, backoff, session)
+
+
+async def get_item_orders_async(session, url, url_name, cookie_auth, language='ru', platform='pc'):
+    """
+    Асинхронно получает список заказов для указанного предмета с Warframe.market API.
+
+    Параметры:
+        session (aiohttp.ClientSession): Сессия aiohttp.
+        url (str): Базовый URL для запросов к Warframe.market API.
+        url_name (str): Уникальное имя предмета в формате URL.
+        cookie_auth (str): Значение Cookie_Auth для аутентификации запросов.
+        language (str, optional): Язык запроса. По умолчанию 'ru'.
+        platform (str, optional): Платформа для фильтрации заказов. По умолчанию 'pc'.
+
+    Возвращает:
+        OrderBook | None: Заказы предмета или None при ошибке.
+
+    Пример использования:
+        async with aiohttp.ClientSession() as session:
+            orders = await get_item_orders_async(session, base_url, 'mirage_prime_systems', 'seefalert')
+    """
+    endpoint = f'/items/{url_name}/orders'
+    headers = {
+        'Cookie_Auth': cookie_auth,
+        'Language': language,
+        'Platform': platform
+    }
+
+    # aiohttp нужен только асинхронному клиенту; сессия уже создана вызывающим кодом
+    import aiohttp
+
+    started = time.perf_counter()
+    try:
+        async with session.get(url + endpoint, headers=headers) as response:
+            body = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # Сетевая ошибка или таймаут сессии: вызывающий код получит None, как и при неуспешном ответе
+        metrics.inc('http_errors_total', endpoint='orders_async')
         return None
+    metrics.observe('http_request_seconds', time.perf_counter() - started, endpoint='orders_async')
+    metrics.inc('http_response_bytes_total', len(body), endpoint='orders_async')
+
+    if response.status == 200:
+        with metrics.timer('json_parse_seconds', endpoint='orders'):
+            return OrderBook.from_records(decode_orders(body))
+    return None
 
 
 if __name__ == "__main__":
+    # Конфиг нужен только для примера входа, поэтому читается здесь, а не при импорте модуля
+    from config_data.config import load_config
+
     config = load_config()
 
     # URL API Warframe.market
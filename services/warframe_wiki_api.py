@@ -4,23 +4,197 @@
 
 Включает функции:
 - get_mod_names(url): Получает список названий модов с указанной веб-страницы.
+- get_mod_names_multi(urls): Параллельно получает списки модов с нескольких категорий (например, EN и RU).
 - save_sorted_unique_elements(output_file_path, elements_list): Сохраняет отсортированный список
                                                                 уникальных элементов в файл.
 - find_common_elements(mod_names, items_file_path): Находит общие элементы между списком модов
                                                     и списком элементов из файла.
+
+Включает классы:
+- WikiCategoryCrawler: Инкрементальный обходчик страниц категорий вики.
 """
 
 
-import requests
-from bs4 import BeautifulSoup
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from services import metrics
+from services.http_cache import get_default_cache
+from services.utils import atomic_write_lines
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+DEFAULT_CRAWL_STATE_PATH = "cache/wiki_category_pages.json"
+
+# Разбираем только ссылки на элементы категории и кнопку следующей страницы
+CATEGORY_STRAINER = SoupStrainer(
+    'a', class_=re.compile(r'category-page__(member-link|pagination-next)'))
+
+# Те же узлы в сыром HTML для отпечатка страницы: остальная разметка Fandom (токены, время генерации,
+# реклама) меняется при каждой загрузке, поэтому отпечаток всей страницы почти никогда не совпадал бы
+CATEGORY_NODES = re.compile(rb'<a\b[^>]*category-page__(?:member-link|pagination-next)\b[^>]*>.*?</a>', re.S)
+
+
+class WikiCategoryCrawler:
+    """
+    Инкрементальный обходчик страниц категорий Warframe Wiki.
+
+    Страницы загружаются через общий HTTP-кэш (пул keep-alive соединений, условные запросы),
+    а разбираются только узлы элементов категории и пагинации. Для каждой страницы запоминается
+    отпечаток этих узлов (sha256) вместе с результатом разбора, поэтому страницы, у которых
+    изменилась только служебная разметка, не разбираются повторно.
 
+    Параметры:
+        cache (HttpCache, optional): Кэш HTTP-ответов. По умолчанию общий кэш get_default_cache().
+        state_path (str, optional): Файл с отпечатками страниц. None — не сохранять отпечатки на диск.
+                                    По умолчанию DEFAULT_CRAWL_STATE_PATH.
 
-def get_mod_names(url):
+    Пример использования:
+        crawler = WikiCategoryCrawler()
+        mod_names = crawler.crawl("https://warframe.fandom.com/wiki/Category:Mods")
+        crawler.save_state()
+    """
+
+    def __init__(self, cache=None, state_path=DEFAULT_CRAWL_STATE_PATH):
+        self.cache = cache or get_default_cache()
+        self.state_path = state_path
+        self.pages = {}
+        self.parsed_pages = 0
+        self.skipped_pages = 0
+        self._lock = threading.Lock()
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as file:
+                self.pages = json.load(file)
+
+    @staticmethod
+    def parse_page(content, page_url):
+        """
+        Извлекает названия элементов категории и ссылку на следующую страницу.
+
+        Параметры:
+            content (bytes): HTML страницы категории.
+            page_url (str): Адрес страницы (для разрешения относительных ссылок).
+
+        Возвращает:
+            tuple: (список названий, адрес следующей страницы или None).
+        """
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=CATEGORY_STRAINER)
+        names = []
+        next_url = None
+        for link in soup.find_all('a'):
+            classes = link.get('class', [])
+            if 'category-page__member-link' in classes:
+                names.append(link.text)
+            elif 'category-page__pagination-next' in classes and link.get('href'):
+                next_url = urljoin(page_url, link['href'])
+        return names, next_url
+
+    @staticmethod
+    def fingerprint(content):
+        """
+        Считает отпечаток страницы по узлам элементов категории и пагинации.
+
+        Параметры:
+            content (bytes): HTML страницы категории.
+
+        Возвращает:
+            str: sha256 найденных узлов в шестнадцатеричном виде.
+        """
+        digest = hashlib.sha256()
+        for node in CATEGORY_NODES.findall(content):
+            digest.update(node)
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def _page(self, url):
+        response = self.cache.get(url)
+        if response.status_code != 200:
+            return [], None
+
+        fingerprint = self.fingerprint(response.content)
+        with self._lock:
+            known = self.pages.get(url)
+            if known and known['fingerprint'] == fingerprint:
+                self.skipped_pages += 1
+                metrics.inc('wiki_pages_total', result='skipped')
+                return known['names'], known['next']
+
+        with metrics.timer('html_parse_seconds', page='wiki_category'):
+            names, next_url = self.parse_page(response.content, url)
+        metrics.inc('wiki_pages_total', result='parsed')
+        with self._lock:
+            self.parsed_pages += 1
+            self.pages[url] = {'fingerprint': fingerprint, 'names': names, 'next': next_url}
+        return names, next_url
+
+    def crawl(self, url):
+        """
+        Обходит все страницы категории, начиная с указанной.
+
+        Параметры:
+            url (str): Адрес первой страницы категории.
+
+        Возвращает:
+            list: Список названий элементов категории.
+        """
+        names = []
+        visited = set()
+        while url and url not in visited:
+            visited.add(url)
+            page_names, url = self._page(url)
+            names.extend(page_names)
+        return names
+
+    def crawl_many(self, urls, max_workers=4):
+        """
+        Параллельно обходит несколько категорий.
+
+        Параметры:
+            urls (list): Адреса первых страниц категорий.
+            max_workers (int, optional): Количество потоков. По умолчанию 4.
+
+        Возвращает:
+            dict: Словарь {адрес категории: список названий}.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(urls, executor.map(self.crawl, urls)))
+        self.save_state()
+        return results
+
+    def save_state(self):
+        """
+        Сохраняет отпечатки страниц на диск.
+        """
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        temp_path = self.state_path + '.tmp'
+        with self._lock:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.pages, file, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+
+
+def get_mod_names(url, cache=None, crawler=None):
     """
     Получает список названий модов с указанной веб-страницы.
 
     Параметры:
         url (str): URL веб-страницы с модами.
+        cache (HttpCache, optional): Кэш HTTP-ответов. По умолчанию общий кэш get_default_cache().
+        crawler (WikiCategoryCrawler, optional): Обходчик со своим состоянием. По умолчанию создаётся новый.
 
     Возвращает:
         list: Список названий модов.
@@ -30,33 +204,48 @@ def get_mod_names(url):
         mod_names_ru = get_mod_names(url_ru)
         print(mod_names_ru)
     """
-    mod_names = []
+    own_crawler = crawler is None
+    crawler = crawler or WikiCategoryCrawler(cache=cache)
+    mod_names = crawler.crawl(url)
+    if own_crawler:
+        crawler.save_state()
+    return mod_names
 
-    while url:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        mod_elements = soup.select('.category-page__member-link')
-        mod_names.extend(mod.text for mod in mod_elements)
 
-        next_button = soup.find('a', {'class': 'category-page__pagination-next'})
-        if not next_button:
-            break
+def get_mod_names_multi(urls, cache=None, state_path=DEFAULT_CRAWL_STATE_PATH):
+    """
+    Параллельно получает списки названий модов с нескольких страниц категорий.
 
-        url = next_button['href']
+    Параметры:
+        urls (list): URL страниц категорий, например английской и русской.
+        cache (HttpCache, optional): Кэш HTTP-ответов. По умолчанию общий кэш get_default_cache().
+        state_path (str, optional): Файл с отпечатками страниц. По умолчанию DEFAULT_CRAWL_STATE_PATH.
 
-    return mod_names
+    Возвращает:
+        dict: Словарь {URL категории: список названий модов}.
+
+    Пример использования:
+        mods = get_mod_names_multi([
+            "https://warframe.fandom.com/wiki/Category:Mods",
+            "https://warframe.fandom.com/ru/wiki/Категория:Моды",
+        ])
+    """
+    crawler = WikiCategoryCrawler(cache=cache, state_path=state_path)
+    return crawler.crawl_many(urls)
 
 
 def save_sorted_unique_elements(output_file_path, elements_list):
     """
     Сохраняет отсортированный список уникальных элементов в файл.
 
+    Файл перезаписывается атомарно и только в том случае, если его содержимое изменилось.
+
     Параметры:
         output_file_path (str): Путь к файлу, в который будут сохранены элементы.
         elements_list (list): Список элементов для сохранения.
 
     Возвращает:
-        None
+        bool: True, если файл был перезаписан.
     """
     # Преобразуем список во множество, чтобы удалить дубликаты
     unique_elements = set(elements_list)
@@ -64,10 +253,8 @@ def save_sorted_unique_elements(output_file_path, elements_list):
     # Преобразуем результат обратно в список и сортируем его
     result_list = sorted(list(unique_elements))
 
-    # Сохраняем результат в новый файл
-    with open(output_file_path, 'w', encoding='utf-8') as file:
-        for item in result_list:
-            file.write(item + '\n')
+    # Сохраняем результат в файл
+    return atomic_write_lines(output_file_path, result_list)
 
 
 def find_common_elements(mod_names, items_file_path):
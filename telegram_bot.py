@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import os
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+
+from config_data.config import load_config
+from handlers import common_handlers, market_handlers
+from keyboards.main_menu_kb import set_main_menu
+from services.catalog import DEFAULT_CATALOG_PATH, Catalog
+from services.market_service import MarketPriceService
+from services.name_matcher import NameMatcher
+
+logger = logging.getLogger(__name__)
+
+
+# Функция конфигурирования и запуска бота
+async def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(filename)s:%(lineno)d #%(levelname)-8s [%(asctime)s] - %(name)s - %(message)s')
+    logger.info('Starting bot')
+
+    config = load_config()
+
+    # Адрес Bot API можно подменить локальным сервером или заглушкой
+    session = None
+    if config.tg_bot.api_url:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(config.tg_bot.api_url))
+
+    bot = Bot(token=config.tg_bot.token, session=session, default=DefaultBotProperties(parse_mode='HTML'))
+    dp = Dispatcher()
+
+    # Общие для всех хэндлеров объекты передаются через workflow_data
+    price_service = MarketPriceService(base_url=config.market.api_url)
+    dp.workflow_data.update(
+        price_service=price_service,
+        catalog=Catalog.open(DEFAULT_CATALOG_PATH) if os.path.exists(DEFAULT_CATALOG_PATH) else None,
+        matcher=NameMatcher.load_or_build(),
+    )
+
+    dp.include_router(common_handlers.router)
+    dp.include_router(market_handlers.router)
+
+    await set_main_menu(bot)
+    await bot.delete_webhook(drop_pending_updates=True)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await price_service.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Проверка MarketPriceService на локальной заглушке Warframe.market API.
+
+Заглушка отвечает с задержкой, поэтому одновременные запросы одного предмета успевают
+объединиться в одну загрузку, а повторный запрос должен обслуживаться из кэша.
+"""
+
+
+import asyncio
+import json
+import socket
+
+from aiohttp import web
+
+from services.market_service import MarketPriceService
+
+
+ORDERS = {'payload': {'orders': [
+    {'id': '1', 'platinum': 20, 'quantity': 2, 'order_type': 'sell', 'platform': 'pc',
+     'last_update': '2025-01-01T00:00:00.000+00:00', 'user': {'status': 'ingame'}},
+    {'id': '2', 'platinum': 25, 'quantity': 1, 'order_type': 'sell', 'platform': 'pc',
+     'last_update': '2025-01-01T00:00:00.000+00:00', 'user': {'status': 'ingame'}},
+    {'id': '3', 'platinum': 15, 'quantity': 1, 'order_type': 'buy', 'platform': 'pc',
+     'last_update': '2025-01-01T00:00:00.000+00:00', 'user': {'status': 'ingame'}},
+]}}
+
+
+async def _start_market():
+    hits = []
+
+    async def orders(request):
+        hits.append(request.match_info['url_name'])
+        await asyncio.sleep(0.2)
+        return web.Response(body=json.dumps(ORDERS).encode('utf-8'), content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/v1/items/{url_name}/orders', orders)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f'http://127.0.0.1:{port}/v1', hits
+
+
+def test_concurrent_requests_share_one_upstream_request():
+    async def scenario():
+        runner, base_url, hits = await _start_market()
+        service = MarketPriceService(base_url=base_url, rate=100)
+        try:
+            summaries = await asyncio.gather(*(service.get_summary('mirage_prime_systems') for _ in range(20)))
+            cached = await service.get_summary('mirage_prime_systems')
+        finally:
+            await service.close()
+            await runner.cleanup()
+        return summaries, cached, service.upstream_requests, hits
+
+    summaries, cached, upstream_requests, hits = asyncio.run(scenario())
+
+    assert upstream_requests == 1
+    assert hits == ['mirage_prime_systems']
+    assert all(summary is summaries[0] for summary in summaries)
+    assert cached is summaries[0]
+    assert summaries[0]['sell']['min_platinum'] == 20
+    assert summaries[0]['buy']['max_platinum'] == 15
+
+
+def test_unreachable_market_gives_none():
+    # Свободный порт, на котором никто не слушает: соединение будет отклонено
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    async def scenario():
+        service = MarketPriceService(base_url=f'http://127.0.0.1:{port}/v1', rate=100)
+        try:
+            return await asyncio.gather(*(service.get_summary('mirage_prime_systems') for _ in range(5)))
+        finally:
+            await service.close()
+
+    assert asyncio.run(scenario()) == [None] * 5
@@ -0,0 +1,105 @@
+"""
+Проверка WikiCategoryCrawler на сохранённых страницах категории вики, которые отдаёт локальный сервер.
+
+Сервер при каждом запросе подставляет в страницы новые токены и время генерации, как это делает Fandom,
+поэтому страница со старыми элементами категории должна пропускаться без разбора.
+"""
+
+
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.http_cache import HttpCache
+from services.warframe_wiki_api import WikiCategoryCrawler
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "wiki")
+PAGES = {
+    "/wiki/Category:Mods": "category_mods_1.html",
+    "/wiki/Category:Mods?from=S": "category_mods_2.html",
+}
+
+
+def _load_pages():
+    pages = {}
+    for path, name in PAGES.items():
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as file:
+            pages[path] = file.read()
+    return pages
+
+
+@pytest.fixture
+def wiki():
+    pages = _load_pages()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = pages.get(self.path)
+            if page is None:
+                self.send_error(404)
+                return
+            # Динамическая разметка меняется при каждом запросе
+            body = page.replace("{token}", uuid.uuid4().hex).replace("{timestamp}", str(uuid.uuid4().int % 1000))
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", pages
+    server.shutdown()
+    server.server_close()
+
+
+def _crawler(tmp_path, state_path):
+    # TTL 0: каждая страница загружается заново, как после истечения срока кэша
+    return WikiCategoryCrawler(cache=HttpCache(str(tmp_path / "http"), default_ttl=0), state_path=state_path)
+
+
+def test_crawl_follows_pagination(wiki, tmp_path):
+    base_url, _ = wiki
+    crawler = _crawler(tmp_path, None)
+
+    names = crawler.crawl(base_url + "/wiki/Category:Mods")
+
+    assert names == ["Blind Rage", "Continuity", "Hornet Strike", "Serration", "Vitality"]
+    assert crawler.parsed_pages == 2
+
+
+def test_dynamic_markup_does_not_force_reparse(wiki, tmp_path):
+    base_url, _ = wiki
+    state_path = str(tmp_path / "state.json")
+    first = _crawler(tmp_path, state_path)
+    expected = first.crawl(base_url + "/wiki/Category:Mods")
+    first.save_state()
+
+    second = _crawler(tmp_path, state_path)
+    assert second.crawl(base_url + "/wiki/Category:Mods") == expected
+    assert (second.parsed_pages, second.skipped_pages) == (0, 2)
+
+
+def test_changed_members_are_parsed_again(wiki, tmp_path):
+    base_url, pages = wiki
+    crawler = _crawler(tmp_path, None)
+    crawler.crawl(base_url + "/wiki/Category:Mods")
+
+    pages["/wiki/Category:Mods?from=S"] = pages["/wiki/Category:Mods?from=S"].replace(
+        '<li class="category-page__member"><a href="/wiki/Vitality"',
+        '<li class="category-page__member"><a href="/wiki/Redirection" class="category-page__member-link" '
+        'title="Redirection">Redirection</a></li>\n<li class="category-page__member"><a href="/wiki/Vitality"')
+
+    names = crawler.crawl(base_url + "/wiki/Category:Mods")
+
+    assert "Redirection" in names
+    assert (crawler.parsed_pages, crawler.skipped_pages) == (3, 1)
@@ -3,10 +3,18 @@ import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 import base64
+import hashlib
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
 from urllib.parse import urlparse, urljoin
 import re
 from PIL import Image
 
+from services import metrics
+from services.http_cache import get_default_cache
 
 
 def get_mod_names_from_file(mods_file_path):
@@ -30,12 +38,13 @@ def get_mod_names_from_file(mods_file_path):
     return mod_names
 
 
-def get_image_url(mod_name):
+def get_image_url(mod_name, cache=None):
     """
     Получает URL изображения для указанного мода с Warframe Wiki.
 
     Параметры:
         mod_name (str): Название мода.
+        cache (HttpCache, optional): Кэш HTTP-ответов. По умолчанию общий кэш get_default_cache().
 
     Возвращает:
         str: URL изображения мода.
@@ -43,26 +52,91 @@ def get_image_url(mod_name):
     base_url = "https://warframe.fandom.com/ru/wiki/"
     mod_name_with_underscores = mod_name.replace(" ", "_")
     full_url = base_url + mod_name_with_underscores
-    response = requests.get(full_url)
+    response = (cache or get_default_cache()).get(full_url)
 
     if response.status_code == 200:
         soup = BeautifulSoup(response.content, 'html.parser')
         image_tag = soup.select_one('a.image img')
         if image_tag:
-            image_url = image_tag['src']
+            # Вики подгружает изображения лениво: в src лежит заглушка, настоящий адрес — в data-src
+            image_url = image_tag.get('data-src') or image_tag['src']
             return image_url
 
     print(f'Не удалось скачать {mod_name}')
     return None
 
 
-def download_images(mod_names, output_dir):
+MANIFEST_NAME = "manifest.json"
+
+
+def _load_manifest(manifest_path):
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    return {}
+
+
+def _save_manifest(manifest_path, manifest):
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=1)
+    os.replace(temp_path, manifest_path)
+
+
+def _fetch_image_bytes(session, image_url):
+    """
+    Возвращает байты изображения. Поддерживает ссылки data:image;base64.
+    """
+    if image_url.startswith('data:image'):
+        # Извлекаем Base64-кодированную строку из URL
+        return base64.b64decode(image_url.split(",")[1])
+
+    # Обрабатываем обычную ссылку на удаленный ресурс
+    base_url = "https://warframe.fandom.com/ru/wiki/"
+    with metrics.timer('http_request_seconds', endpoint='image'):
+        response = session.get(urljoin(base_url, image_url), timeout=30)
+    response.raise_for_status()
+    metrics.inc('http_response_bytes_total', len(response.content), endpoint='image')
+    return response.content
+
+
+def _save_image(image_bytes, image_path):
+    """
+    Декодирует изображение, конвертирует в RGB и атомарно сохраняет в JPEG.
+    """
+    image = Image.open(BytesIO(image_bytes))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    temp_path = image_path + '.tmp'
+    image.save(temp_path, format='JPEG')
+    os.replace(temp_path, image_path)
+
+
+def _link_or_copy(source_path, target_path):
+    """
+    Создаёт жёсткую ссылку на уже сохранённое изображение, а если это невозможно — копирует его.
+    """
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)
+
+
+def download_images(mod_names, output_dir, max_workers=8, cache=None):
     """
     Загружает изображения для каждого мода и сохраняет их в указанную папку.
 
+    Поиск адресов на вики и загрузка изображений выполняются в ограниченном пуле потоков.
+    Для уже скачанных изображений ни страница мода, ни само изображение не запрашиваются. Сведения о каждом изображении
+    (адрес и sha256 содержимого) записываются в manifest.json в папке изображений, поэтому
+    прерванную загрузку можно продолжить. Одинаковые изображения (с совпадающим sha256)
+    сохраняются один раз, а для остальных модов создаются жёсткие ссылки на них.
+
     Параметры:
         mod_names (list): Список названий модов.
         output_dir (str): Путь к папке, в которую будут сохранены изображения.
+        max_workers (int, optional): Количество потоков. По умолчанию 8.
+        cache (HttpCache, optional): Кэш HTTP-ответов для страниц вики. По умолчанию общий кэш.
 
     Возвращает:
         list: Список пар (название мода, путь к сохраненному изображению).
@@ -70,49 +144,98 @@ def download_images(mod_names, output_dir):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    mod_image_list = []
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+    lock = threading.Lock()
+    # sha256 -> событие "файл сохранён": первый поток с новым содержимым сохраняет его,
+    # остальные с тем же содержимым ждут и создают ссылку на его файл
+    saving = {}
+
+    # Изображения, которые уже сохранены, по хешу содержимого
+    saved_by_hash = {
+        entry['sha256']: os.path.join(output_dir, entry['file'])
+        for entry in manifest.values()
+        if entry.get('sha256') and os.path.exists(os.path.join(output_dir, entry['file']))
+    }
+
+    session = requests.Session()
+    session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=max_workers))
+
+    def download(mod_name):
+        image_path = os.path.join(output_dir, f"{mod_name}.jpg")
+        if os.path.exists(image_path):
+            metrics.inc('images_total', result='existing')
+            return image_path
+
+        image_url = get_image_url(mod_name, cache=cache)
+        if not image_url:
+            return None
+
+        image_bytes = _fetch_image_bytes(session, image_url)
+        digest = hashlib.sha256(image_bytes).hexdigest()
+
+        # Хеш резервируется под той же блокировкой, что и проверка, поэтому одинаковые
+        # изображения из разных потоков не сохраняются дважды
+        with lock:
+            duplicate_path = saved_by_hash.get(digest)
+            if duplicate_path is None:
+                saved_by_hash[digest] = image_path
+                saved = saving[digest] = threading.Event()
+            else:
+                saved = saving.get(digest)
+
+        if duplicate_path is None:
+            try:
+                _save_image(image_bytes, image_path)
+            except Exception:
+                with lock:
+                    del saved_by_hash[digest]
+                raise
+            finally:
+                saved.set()
+            metrics.inc('images_total', result='downloaded')
+        else:
+            if saved is not None:
+                saved.wait()
+            if os.path.exists(duplicate_path):
+                _link_or_copy(duplicate_path, image_path)
+                metrics.inc('images_total', result='duplicate')
+            else:
+                # Поток, сохранявший это содержимое, завершился ошибкой: сохраняем сами
+                _save_image(image_bytes, image_path)
+                metrics.inc('images_total', result='downloaded')
+
+        with lock:
+            manifest[mod_name] = {
+                'file': os.path.basename(image_path),
+                'url': image_url if not image_url.startswith('data:') else None,
+                'sha256': digest,
+            }
+        return image_path
+
+    image_paths = {}
     skipped_mods = []  # Список для хранения пропущенных модов
-    for mod_name in tqdm(mod_names, desc="Загрузка изображений"):
-        image_url = get_image_url(mod_name)
-        if image_url:
-            image_path = os.path.join(output_dir, f"{mod_name}.jpg")
-            if not os.path.exists(image_path):
-                if image_url.startswith('data:image'):
-                    # Обрабатываем Base64-кодированное изображение
-                    try:
-                        # Извлекаем Base64-кодированную строку из URL
-                        image_data = image_url.split(",")[1]
-
-                        # Декодируем Base64-строку и создаем изображение
-                        image = Image.open(BytesIO(base64.b64decode(image_data)))
-
-                        # Конвертируем изображение в режим RGB
-                        if image.mode == 'RGBA':
-                            image = image.convert('RGB')
-
-                        image.save(image_path)
-                    except Exception as e:
-                        print(f"Пропущена загрузка изображения для мода '{mod_name}'. Ошибка: {e}")
-                        skipped_mods.append(mod_name)  # Добавляем название мода в список пропущенных
-                        continue
-                else:
-                    # Обрабатываем обычную ссылку на удаленный ресурс
-                    base_url = "https://warframe.fandom.com/ru/wiki/"
-                    image_url = urljoin(base_url, image_url)
-                    try:
-                        # Загружаем изображение с помощью библиотеки Pillow
-                        image = Image.open(requests.get(image_url, stream=True).raw)
-
-                        # Конвертируем изображение в режим RGB
-                        if image.mode == 'RGBA':
-                            image = image.convert('RGB')
-
-                        image.save(image_path)
-                    except Exception as e:
-                        print(f"Пропущена загрузка изображения для мода '{mod_name}'. Ошибка: {e}")
-                        skipped_mods.append(mod_name)  # Добавляем название мода в список пропущенных
-                        continue
-            mod_image_list.append((mod_name, image_path))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(download, mod_name): mod_name for mod_name in mod_names}
+        for done, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="Загрузка изображений"), 1):
+            mod_name = futures[future]
+            try:
+                image_path = future.result()
+            except Exception as e:
+                print(f"Пропущена загрузка изображения для мода '{mod_name}'. Ошибка: {e}")
+                image_path = None
+            if image_path:
+                image_paths[mod_name] = image_path
+            else:
+                skipped_mods.append(mod_name)  # Добавляем название мода в список пропущенных
+
+            # Периодически сохраняем манифест, чтобы можно было продолжить после сбоя
+            if done % 100 == 0:
+                with lock:
+                    _save_manifest(manifest_path, manifest)
+
+    _save_manifest(manifest_path, manifest)
+    session.close()
 
     # Выводим список пропущенных модов
     if skipped_mods:
@@ -120,7 +243,7 @@ def download_images(mod_names, output_dir):
         for mod in skipped_mods:
             print(mod)
 
-    return mod_image_list
+    return [(mod_name, image_paths[mod_name]) for mod_name in mod_names if mod_name in image_paths]
 
 
 def main():